@@ -0,0 +1,3 @@
+from Wingman.bench.suite import main
+
+main()
@@ -0,0 +1,58 @@
+"""
+Lines/sec through ANSI stripping: the old two regex passes per line
+(listener re.sub, then a re.compile + sub in the receiver) vs one
+precompiled strip_ansi with a no-escape fast path, and the colour mode
+AnsiStyler (same pass, keeping style spans).
+
+    python -m Wingman.bench.ansi [--lines 1000000]
+"""
+import argparse
+import re
+import time
+from Wingman.bench.synthetic import mixed_log_lines, colourize
+from Wingman.core.ansi import strip_ansi, AnsiStyler
+
+
+def legacy_remove_noise(message):
+    return re.sub(r'\x1b\[\d+(?:;\d+)*m', '', message)
+
+
+def legacy_clean_message(input_line):
+    ansi_code_pattern = re.compile(r'\x1b\[\d+(?:;\d+)*m')
+    return ansi_code_pattern.sub('', input_line)
+
+
+def before(lines):
+    return [legacy_clean_message(legacy_remove_noise(line)) for line in lines]
+
+
+def after(lines):
+    return [strip_ansi(line) for line in lines]
+
+
+def styled(lines):
+    parse = AnsiStyler().parse
+    return [parse(line).text for line in lines]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    plain = mixed_log_lines(args.lines)
+    for label, fraction in (("colour-heavy", 1.0), ("25% coloured", 0.25), ("plain", 0.0)):
+        lines = colourize(plain, fraction=fraction)
+        print(f"{label}:")
+        for name, fn in (("before", before), ("after", after), ("styled", styled)):
+            start = time.perf_counter()
+            result = fn(lines)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>10}: {len(lines) / elapsed:>12,.0f} lines/sec ({elapsed:.2f}s)")
+        leftover = sum('\x1b' in line for line in before(lines))
+        assert result == plain
+        print(f"{'':>10}  escape codes the old pattern left in: {leftover:,} lines")
+
+
+if __name__ == "__main__":
+    main()
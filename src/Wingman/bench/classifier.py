@@ -0,0 +1,98 @@
+"""
+Lines/sec through the per-line parse step of GameSession.process_queue:
+the old "group: regex + parse_group_status + parse_xp_message" sequence
+vs the single-pass classify_line dispatch.
+
+    python -m Wingman.bench.classifier [--lines 1000000]
+"""
+import argparse
+import re
+import time
+from Wingman.bench.synthetic import mixed_log_lines
+from Wingman.core.parser import build_default_registry, LINE_XP, LINE_GROUP_ROW, LINE_GROUP_HEADER
+
+
+def legacy_parse_xp_message(text_block):
+    xp_pattern = re.compile(r'You gain\s+(\d+)(?:\s+\(\+(\d+)\))?.*experience', re.IGNORECASE)
+    total_xp = 0
+    for match in xp_pattern.finditer(text_block):
+        base = int(match.group(1))
+        bonus = int(match.group(2)) if match.group(2) else 0
+        total_xp += (base + bonus)
+    return total_xp
+
+
+def legacy_parse_group_status(text_block):
+    members = []
+    pattern = re.compile(
+        r"\[\s*(?P<cls>[A-Za-z]+)\s+(?P<lvl>\d+)\s*\]\s+(?P<status>(?:[BPDS]\s)*)(?P<name>.+?)\s+"
+        r"(?P<hp>\d+/\s*\d+).*?\s+(?P<fat>\d+/\s*\d+).*?\s+(?P<pwr>\d+/\s*\d+)",
+        re.DOTALL
+    )
+    for line in text_block.splitlines():
+        if "]" in line and "/" in line:
+            match = pattern.search(line)
+            if match:
+                data = match.groupdict()
+                if data['cls'].lower() == 'mob':
+                    continue
+                data['status'] = data['status'].strip()
+                data['name'] = data['name'].strip()
+                members.append(data)
+    return members
+
+
+def legacy(lines):
+    xp = rows = 0
+    for line in lines:
+        if "group:" in line and re.search(r"\S+'s group:", line):
+            pass
+        rows += len(legacy_parse_group_status(line))
+        xp += legacy_parse_xp_message(line)
+    return xp, rows
+
+
+def legacy_kinds_registry():
+    """The default registry cut down to the three kinds the old loop parsed."""
+    registry = build_default_registry()
+    for parser in list(registry.parsers):
+        if parser.name not in (LINE_XP, LINE_GROUP_ROW, LINE_GROUP_HEADER):
+            registry.unregister(parser.name)
+    return registry
+
+
+def single_pass(lines, registry=None):
+    registry = registry or legacy_kinds_registry()
+    xp = rows = 0
+    for line in lines:
+        for kind, value in registry.dispatch(line):
+            if kind == LINE_XP:
+                xp += value
+            elif kind == LINE_GROUP_ROW:
+                rows += 1
+    return xp, rows
+
+
+def all_parsers(lines):
+    return single_pass(lines, build_default_registry())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    lines = mixed_log_lines(args.lines)
+    results = {}
+    for name, fn in (("before", legacy), ("after", single_pass), ("after, all event parsers", all_parsers)):
+        start = time.perf_counter()
+        results[name] = fn(lines)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>25}: {len(lines) / elapsed:>12,.0f} lines/sec ({elapsed:.2f}s)")
+
+    assert results["before"] == results["after"] == results["after, all event parsers"], results
+    print(f"xp={results['after'][0]:,} group rows={results['after'][1]:,} (identical)")
+
+
+if __name__ == "__main__":
+    main()
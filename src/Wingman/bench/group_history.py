@@ -0,0 +1,81 @@
+"""
+Memory for 8-member group history over a 10-hour session.
+
+A group listing arrives every --interval seconds. Compares keeping every
+parsed listing (lists of dicts of strings, the shape latest_group_data
+has) with GroupHistory's array-backed per-member columns, both bounded
+(the default) and keeping all 10 hours.
+
+    python -m Wingman.bench.group_history [--hours 10] [--interval 2]
+
+tracemalloc makes this slow (about a minute for the defaults).
+"""
+import argparse
+import random
+import tracemalloc
+from Wingman.core.group_history import GroupHistory, DEFAULT_CAPACITY
+
+MEMBERS = [("Orc", 40, "B", "Earthquack"), ("Kenku", 70, "", "Big"), ("Sin", 74, "P D", "Beautiful"),
+           ("Kenku", 58, "", "Quacamole"), ("Elf", 50, "B", "Legolas"), ("Dwarf", 61, "", "Gimli"),
+           ("Human", 66, "S", "Aragorn"), ("Hobbit", 22, "", "Samwise")]
+
+
+def listings(count, seed=0):
+    """`count` 8-member group listings shaped like the session's group rows, with random vitals."""
+    rng = random.Random(seed)
+    maxima = [(rng.randint(300, 600), rng.randint(300, 600), rng.randint(50, 400)) for _ in MEMBERS]
+    for _ in range(count):
+        rows = []
+        for (cls, lvl, status, name), tops in zip(MEMBERS, maxima):
+            row = {'cls': cls, 'lvl': str(lvl), 'status': status, 'name': name}
+            vitals = ()
+            for key, top in zip(("hp", "fat", "pwr"), tops):
+                current = rng.randint(0, top)
+                row[key] = f"{current:>3}/{top:>4}"
+                vitals += (current, top)
+            row['vitals'] = vitals
+            rows.append(row)
+        yield rows
+
+
+def measure(label, store, count, interval):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = store(listings(count), interval)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{label:<36} {used / 1024 / 1024:>8.2f} MB")
+    return kept
+
+
+def keep_dicts(stream, _interval):
+    return [rows for rows in stream]
+
+
+def keep_history(capacity):
+    def store(stream, interval):
+        history = GroupHistory(capacity=capacity)
+        for i, rows in enumerate(stream):
+            history.record(rows, i * interval)
+        return history
+    return store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, default=10)
+    parser.add_argument("--interval", type=float, default=2, help="Seconds between group listings")
+    args = parser.parse_args(argv)
+
+    count = int(args.hours * 3600 / args.interval)
+    print(f"{count:,} listings x {len(MEMBERS)} members ({args.hours:g} h, one every {args.interval:g}s)")
+    measure("list of dicts (every listing)", keep_dicts, count, args.interval)
+    measure(f"GroupHistory, all {count:,} samples", keep_history(count), count, args.interval)
+    history = measure(f"GroupHistory, last {DEFAULT_CAPACITY:,} (default)",
+                      keep_history(DEFAULT_CAPACITY), count, args.interval)
+    print(f"GroupHistory.nbytes() (default): {history.nbytes() / 1024:,.0f} KB")
+    print(f"Power trend for {MEMBERS[2][3]}: {history.trend(MEMBERS[2][3])}")
+
+
+if __name__ == "__main__":
+    main()
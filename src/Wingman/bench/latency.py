@@ -0,0 +1,85 @@
+"""
+Cost of the pipeline latency histograms: lines/sec from TCP payload to
+parsed session (listener -> receiver -> process_queue) with no
+PipelineLatency, with one that is switched off, and with timing on; then
+the same for InputReceiver.receive() alone, where the per-line check sits.
+
+    python -m Wingman.bench.latency [--lines 500000] [--rounds 5]
+"""
+import argparse
+import gc
+import time
+from Wingman.bench.synthetic import mixed_log_lines, colourize, segment_stream
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.latency import PipelineLatency
+from Wingman.core.network_listener import NetworkListener
+from Wingman.core.pipeline import ProcessingWorker, BATCH_LINES
+from Wingman.core.session import GameSession
+
+
+def run(payloads, latency):
+    receiver = InputReceiver(max_size=len(payloads) * 20, latency=latency)
+    listener = NetworkListener(receiver)
+    session = GameSession(receiver, verbose=False)
+    worker = ProcessingWorker(session)  # Driven by hand with step(): no thread scheduling noise
+    gc.collect()  # Don't bill this run for the last one's garbage
+    start = time.perf_counter()
+    for payload in payloads:
+        listener.handle_payload(payload)
+        if receiver.depth >= BATCH_LINES:
+            worker.step()
+    while receiver.depth:
+        worker.step()
+    return time.perf_counter() - start, session
+
+
+def receive_only(lines, latency):
+    receiver = InputReceiver(max_size=len(lines) + 1, latency=latency)
+    receive = receiver.receive
+    gc.collect()
+    start = time.perf_counter()
+    for line in lines:
+        receive(line)
+    return time.perf_counter() - start, None
+
+
+def best_of(rounds, modes, fn, data):
+    """{mode name: (best seconds, latency object of that run)}."""
+    best = {}
+    for _ in range(rounds):  # Modes take turns, so drift (thermal, other load) hits them all
+        for name, make in modes:
+            latency = make()
+            elapsed, _result = fn(data, latency)
+            if elapsed < best.get(name, (float("inf"),))[0]:
+                best[name] = (elapsed, latency)
+    return best
+
+
+def report(title, best, count):
+    print(title)
+    baseline = best["no latency object"][0]
+    for name, (elapsed, _latency) in best.items():
+        print(f"{name:>18}: {count / elapsed:>12,.0f} lines/sec  ({(elapsed / baseline - 1) * 100:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=500_000)
+    parser.add_argument("--rounds", type=int, default=5, help="Best of this many runs per mode")
+    args = parser.parse_args(argv)
+
+    lines = colourize(mixed_log_lines(args.lines), fraction=0.25)
+    data = ("\r\n".join(lines) + "\r\n").encode()
+    payloads = [payload for _seq, payload in segment_stream(data)]
+
+    modes = (("no latency object", lambda: None), ("timing off", PipelineLatency),
+             ("timing on", lambda: PipelineLatency(enabled=True)))
+    best = best_of(args.rounds, modes, run, payloads)
+    report("Full pipeline:", best, len(lines))
+    report("InputReceiver.receive() only:", best_of(args.rounds, modes, receive_only, lines), len(lines))
+    print()
+    print(best["timing on"][1].report())
+
+
+if __name__ == "__main__":
+    main()
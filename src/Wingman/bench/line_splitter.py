@@ -0,0 +1,65 @@
+"""
+Microbenchmark: incremental bytearray LineSplitter vs the old
+"decode, append to str, split('\\n', 1) per line" buffer.
+
+    python -m Wingman.bench.line_splitter [--lines 20000] [--chunk 1460]
+"""
+import argparse
+import time
+from Wingman.bench.synthetic import xp_log_lines
+from Wingman.core.line_splitter import LineSplitter
+
+
+def legacy_split(chunks):
+    buffer = ""
+    count = 0
+    for payload in chunks:
+        buffer += payload.decode('utf-8', errors='replace')
+        while '\n' in buffer:
+            line, buffer = buffer.split('\n', 1)
+            line.replace('\r', '')
+            count += 1
+    return count
+
+
+def splitter_split(chunks):
+    splitter = LineSplitter(max_buffer=1 << 30)
+    count = 0
+    for payload in chunks:
+        count += len(splitter.feed(payload))
+    return count
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def timed(fn, chunks):
+    start = time.perf_counter()
+    count = fn(chunks)
+    return count, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=20_000)
+    parser.add_argument("--chunk", type=int, default=1460, help="Bytes per packet (MSS) for the streaming case")
+    args = parser.parse_args(argv)
+
+    data = ("\r\n".join(xp_log_lines(args.lines)) + "\r\n").encode()
+    cases = {
+        f"{args.chunk}-byte packets": chunked(data, args.chunk),
+        "one large dump": [data],  # Scrollback / `who` list arriving in one read
+    }
+
+    print(f"{len(data) / 1e6:.1f} MB, {args.lines:,} lines")
+    for name, chunks in cases.items():
+        old_count, old_time = timed(legacy_split, chunks)
+        new_count, new_time = timed(splitter_split, chunks)
+        assert old_count == new_count
+        print(f"{name:>20}: legacy {args.lines / old_time:>12,.0f} lines/s | "
+              f"LineSplitter {args.lines / new_time:>12,.0f} lines/s | {old_time / new_time:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Pcap read throughput: Wingman.core.pcap_reader.iter_segments vs scapy's
+rdpcap (plus the layer lookups packet_callback does on each packet).
+
+    python -m Wingman.bench.pcap_reader [--lines 100000] [--pcap existing.pcap]
+"""
+import argparse
+import os
+import tempfile
+import time
+from Wingman.bench.synthetic import xp_log_lines, build_frame, segment_stream, write_pcap, SERVER_IP, SERVER_PORT
+from Wingman.core.pcap_reader import iter_segments
+
+
+def scapy_read(path):
+    from scapy.all import rdpcap, IP, TCP
+    count = 0
+    for packet in rdpcap(path):
+        if IP in packet and TCP in packet and packet[IP].src == SERVER_IP and packet[TCP].sport == SERVER_PORT:
+            count += len(bytes(packet[TCP].payload)) > 0
+    return count
+
+
+def streaming_read(path):
+    count = 0
+    for _ts, segment in iter_segments(path, SERVER_IP, SERVER_PORT):
+        count += len(segment.payload) > 0
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--pcap", help="Benchmark an existing capture instead of a synthetic one")
+    args = parser.parse_args(argv)
+
+    tmp = None
+    path = args.pcap
+    if path is None:
+        stream = ("\r\n".join(xp_log_lines(args.lines)) + "\r\n").encode()
+        tmp = tempfile.NamedTemporaryFile(suffix=".pcap", delete=False)
+        tmp.close()
+        path = tmp.name
+        write_pcap(path, (build_frame(payload, seq) for seq, payload in segment_stream(stream)))
+
+    try:
+        size_mb = os.path.getsize(path) / 1e6
+        timings = {}
+        for name, fn in (("scapy rdpcap", scapy_read), ("pcap_reader", streaming_read)):
+            start = time.perf_counter()
+            count = fn(path)
+            timings[name] = elapsed = time.perf_counter() - start
+            print(f"{name:>13}: {count / elapsed:>12,.0f} packets/sec, {size_mb / elapsed:>8,.1f} MB/sec")
+        print(f"speedup: {timings['scapy rdpcap'] / timings['pcap_reader']:.0f}x")
+    finally:
+        if tmp is not None:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
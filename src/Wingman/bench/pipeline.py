@@ -0,0 +1,101 @@
+"""
+UI frame times while a text flood is being parsed.
+
+A producer thread feeds mixed log lines into the InputReceiver at a fixed
+rate while the main thread runs a 60 fps "UI" loop. In --mode gui-thread
+each frame parses a batch itself (the old update_gui); in --mode worker a
+ProcessingWorker parses and each frame only draws its latest snapshot.
+
+    python -m Wingman.bench.pipeline [--rate 50000] [--seconds 5] [--mode both]
+"""
+import argparse
+import statistics
+import threading
+import time
+from Wingman.bench.synthetic import mixed_log_lines
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.pipeline import ProcessingWorker, BATCH_LINES
+from Wingman.core.session import GameSession
+
+FRAME_SECONDS = 1 / 60
+
+
+def produce(receiver, lines, rate, seconds, stop):
+    """Calls receive() at `rate` lines/sec, in 1 ms slices, for `seconds`."""
+    start = time.perf_counter()
+    sent = 0
+    total = int(rate * seconds)
+    while sent < total and not stop.is_set():
+        due = min(total, int((time.perf_counter() - start) * rate))
+        while sent < due:
+            receiver.receive(lines[sent % len(lines)])
+            sent += 1
+        time.sleep(0.001)
+    return sent
+
+
+def run(mode, rate, seconds, lines):
+    receiver = InputReceiver(max_size=rate * 10)
+    session = GameSession(receiver, verbose=False)
+    worker = ProcessingWorker(session) if mode == "worker" else None
+
+    stop = threading.Event()
+    producer = threading.Thread(target=produce, args=(receiver, lines, rate, seconds, stop), daemon=True)
+    if worker is not None:
+        worker.start()
+    start = time.perf_counter()
+    producer.start()
+
+    frames = []  # Seconds from when a frame was due until it finished drawing
+    next_frame = start
+    while producer.is_alive():
+        next_frame += FRAME_SECONDS
+        delay = next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        if mode == "gui-thread":
+            session.process_queue(BATCH_LINES)
+            total_xp, group = session.total_xp, session.latest_group_data
+        else:
+            snapshot = worker.snapshot()
+            total_xp, group = snapshot.total_xp, snapshot.group
+        # Stand-in for setting the labels and table cells
+        _labels = [f"Total XP: {total_xp:,}"] + [f"{m['name']} {m['hp']}" for m in group]
+        frames.append(time.perf_counter() - next_frame)
+
+    # Let the parser catch up so throughput counts every line
+    if worker is not None:
+        while receiver.depth:
+            time.sleep(0.01)
+        worker.stop()
+    else:
+        session.process_queue()
+    elapsed = time.perf_counter() - start
+    return frames, session.lines_processed, elapsed
+
+
+def report(mode, frames, processed, elapsed):
+    frames_ms = sorted(f * 1000 for f in frames)
+    p99 = frames_ms[min(len(frames_ms) - 1, int(len(frames_ms) * 0.99))]
+    print(f"{mode:>10}: {len(frames_ms):>5} frames  "
+          f"p50={statistics.median(frames_ms):6.2f} ms  p99={p99:6.2f} ms  max={frames_ms[-1]:7.2f} ms  "
+          f"parsed {processed:,} lines at {processed / elapsed:,.0f}/sec")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rate", type=int, default=50_000, help="Lines per second to feed in")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--mode", choices=("gui-thread", "worker", "both"), default="both")
+    args = parser.parse_args(argv)
+
+    lines = mixed_log_lines(100_000)
+    modes = ("gui-thread", "worker") if args.mode == "both" else (args.mode,)
+    print(f"Feeding {args.rate:,} lines/sec for {args.seconds:g}s; frame time = lateness + draw, target "
+          f"{FRAME_SECONDS * 1000:.1f} ms period")
+    for mode in modes:
+        report(mode, *run(mode, args.rate, args.seconds, lines))
+
+
+if __name__ == "__main__":
+    main()
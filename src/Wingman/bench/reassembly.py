@@ -0,0 +1,62 @@
+"""
+Replays a synthetic, reordered and duplicated server stream through
+NetworkListener.frame_callback and checks that XP totals survive.
+
+    python -m Wingman.bench.reassembly --lines 200000 [--write-pcap out.pcap]
+"""
+import argparse
+import time
+from Wingman.bench.synthetic import xp_log_lines, build_frame, segment_stream, disorder, write_pcap
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.network_listener import NetworkListener
+from Wingman.core.parser import parse_xp_message
+
+
+def expected_xp(lines):
+    return sum(parse_xp_message(line) for line in lines)
+
+
+def replay(frames):
+    receiver = InputReceiver()
+    listener = NetworkListener(receiver)
+
+    start = time.perf_counter()
+    for frame in frames:
+        listener.frame_callback(frame)
+    elapsed = time.perf_counter() - start
+
+    xp = 0
+    while (line := receiver.remove_from_top()) is not None:
+        xp += parse_xp_message(line)
+    return xp, elapsed, listener.reassembler.get_stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--reorder", type=float, default=0.1)
+    parser.add_argument("--duplicate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--write-pcap", metavar="PATH", help="Also save the disordered stream as a pcap")
+    args = parser.parse_args(argv)
+
+    lines = xp_log_lines(args.lines, seed=args.seed)
+    stream = ("\r\n".join(lines) + "\r\n").encode()
+    segments = segment_stream(stream, seed=args.seed)
+    messy = disorder(segments, args.reorder, args.duplicate, seed=args.seed)
+    frames = [build_frame(payload, seq) for seq, payload in messy]
+    if args.write_pcap:
+        write_pcap(args.write_pcap, frames)
+
+    want = expected_xp(lines)
+    got, elapsed, stats = replay(frames)
+
+    print(f"segments:   {len(frames):,} ({len(segments):,} unique)")
+    print(f"throughput: {len(frames) / elapsed:,.0f} segments/sec, {len(stream) / elapsed / 1e6:,.1f} MB/sec")
+    print(f"reassembly: {stats}")
+    print(f"xp:         {got:,} (expected {want:,}) -> {'OK' if got == want else 'MISMATCH'}")
+    return 0 if got == want else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
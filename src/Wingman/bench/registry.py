@@ -0,0 +1,47 @@
+"""
+Per-line dispatch cost as event parsers are added to the registry.
+Extra parsers get random triggers that never occur, which is the common
+case for a specialised parser: it should cost (almost) nothing per line.
+
+    python -m Wingman.bench.registry [--lines 200000]
+"""
+import argparse
+import random
+import string
+import time
+from Wingman.bench.synthetic import mixed_log_lines
+from Wingman.core.parser import build_default_registry
+
+
+def registry_with_extra(count, seed=0):
+    rng = random.Random(seed)
+    registry = build_default_registry()
+    for i in range(count):
+        trigger = "zq" + "".join(rng.choice(string.ascii_lowercase) for _ in range(6))
+        registry.register(f"extra_{i}", trigger, trigger)
+    return registry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    lines = mixed_log_lines(args.lines)
+    for extra in (0, 10, 50, 200, 1000):
+        registry = registry_with_extra(extra)
+        registry.dispatch("")  # Build the scanner outside the timed loop
+        start = time.perf_counter()
+        for line in lines:
+            registry.dispatch(line)
+        elapsed = time.perf_counter() - start
+        print(f"{len(registry.parsers):>5} parsers: {len(lines) / elapsed:>10,.0f} lines/sec")
+
+    print("\nPer-parser stats (last run, built-ins only):")
+    for name, stats in registry.get_stats().items():
+        if not name.startswith("extra_"):
+            print(f"  {name:<14} checks={stats['checks']:>8,} hits={stats['hits']:>8,} time={stats['time_ms']:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
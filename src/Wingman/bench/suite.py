@@ -0,0 +1,229 @@
+"""
+Benchmark suite: throughput and per-call latency of each pipeline stage on
+deterministic synthetic MUD traffic, written as JSON so runs of different
+versions can be compared.
+
+Stages measured (one call each):
+    packet_callback    NetworkListener.packet_callback, one dissected TCP packet
+    receive            InputReceiver.receive, one raw (coloured) line
+    parse_xp_message   one plain line
+    parse_group_status one complete `group` listing
+    process_queue      GameSession.process_queue, one batch of --batch queued lines
+
+Throughput is the best of --rounds untimed passes; percentiles come from one
+more pass that reads the clock around every call (which adds ~50-100 ns to
+each, so mind that for the sub-microsecond stages).
+
+    python -m Wingman.bench [--lines 200000] [--rounds 3] [--batch 100] [--output bench-results.json]
+                            [--xp 0.15] [--group-every 200] [--colour 0.25]
+                            [--min-chunk 40] [--max-chunk 600] [--seed 0]
+                            [--only receive ...] [--label v0.2.6]
+                            [--compare OLD.json] [--threshold 10]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import NamedTuple
+from time import perf_counter, perf_counter_ns
+from Wingman.bench.synthetic import TrafficMix, mud_traffic, traffic_segments, group_table_lines, build_frame
+from Wingman.core.ansi import strip_ansi
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.latency import LatencyHistogram
+from Wingman.core.network_listener import NetworkListener
+from Wingman.core.parser import parse_xp_message, parse_group_status
+from Wingman.core.session import GameSession
+
+RESULTS_VERSION = 1  # Bump if the layout of the JSON changes
+
+
+class SuiteConfig(NamedTuple):
+    lines: int = 200_000  # Lines of traffic generated
+    rounds: int = 3  # Throughput is the best of this many passes
+    batch: int = 100  # Lines per process_queue call (the worker takes up to BATCH_LINES)
+    seed: int = 0
+    mix: TrafficMix = TrafficMix()
+
+
+# --- Measuring ---
+
+def measure(make, inputs, lines, rounds):
+    """
+    make() -> a fresh callable (with fresh state) taking one input.
+    Returns the result row: calls/sec and lines/sec from the best untimed
+    pass, and percentiles from one pass with every call timed. The garbage
+    collector is off while timing (as timeit does), so one stage's leftovers
+    can't land in another's numbers.
+    """
+    best = float("inf")
+    histogram = LatencyHistogram()
+    record = histogram.record
+    for timed in [False] * rounds + [True]:
+        call = make()
+        gc.collect()
+        gc.disable()
+        try:
+            if timed:
+                for item in inputs:
+                    start = perf_counter_ns()
+                    call(item)
+                    record(perf_counter_ns() - start)
+            else:
+                start = perf_counter()
+                for item in inputs:
+                    call(item)
+                best = min(best, perf_counter() - start)
+        finally:
+            gc.enable()
+
+    row = {'calls': len(inputs), 'lines': lines, 'seconds': round(best, 6),
+           'calls_per_sec': round(len(inputs) / best, 1), 'lines_per_sec': round(lines / best, 1)}
+    row.update(histogram.summary())
+    return row
+
+
+# --- Stages ---
+
+def bench_packet_callback(lines, config):
+    from scapy.all import Ether  # Dissect outside the timed loop: sniff() hands over ready-made packets
+    packets = [Ether(build_frame(payload, seq)) for seq, payload in traffic_segments(lines, config.mix, config.seed)]
+
+    def make():
+        return NetworkListener(InputReceiver(max_size=len(lines) + 1)).packet_callback
+    return measure(make, packets, len(lines), config.rounds)
+
+
+def bench_receive(lines, config):
+    def make():
+        return InputReceiver(max_size=len(lines) + 1).receive
+    return measure(make, lines, len(lines), config.rounds)
+
+
+def bench_parse_xp_message(lines, config):
+    plain = [strip_ansi(line) for line in lines]
+    return measure(lambda: parse_xp_message, plain, len(plain), config.rounds)
+
+
+def bench_parse_group_status(lines, config):
+    rng = random.Random(config.seed)
+    listings = ["\n".join(group_table_lines(rng)) for _ in range(max(1, len(lines) // 100))]
+    return measure(lambda: parse_group_status, listings, sum(text.count("\n") + 1 for text in listings),
+                   config.rounds)
+
+
+def bench_process_queue(lines, config):
+    def make():
+        receiver = InputReceiver(max_size=len(lines) + 1)
+        for line in lines:
+            receiver.receive(line)
+        session = GameSession(receiver, verbose=False)
+        return lambda _batch: session.process_queue(config.batch)
+    queued = sum(1 for line in lines if strip_ansi(line).strip())  # receive() drops escape-only lines
+    return measure(make, range(-(-queued // config.batch)), queued, config.rounds)
+
+
+STAGES = {
+    'packet_callback': bench_packet_callback,
+    'receive': bench_receive,
+    'parse_xp_message': bench_parse_xp_message,
+    'parse_group_status': bench_parse_group_status,
+    'process_queue': bench_process_queue,
+}
+
+
+def run_suite(config=SuiteConfig(), only=None, label=None):
+    """Every stage (or just `only`) on the same generated traffic, as a JSON-able dict."""
+    lines = mud_traffic(config.lines, config.mix, config.seed)
+    results = {}
+    for name, bench in STAGES.items():
+        if only and name not in only:
+            continue
+        results[name] = bench(lines, config)
+    settings = config._asdict()
+    settings.update(settings.pop('mix')._asdict())
+    return {
+        'format': RESULTS_VERSION,
+        'label': label,
+        'written_at': time.time(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'config': settings,
+        'results': results,
+    }
+
+
+# --- Reporting ---
+
+def report(data):
+    print(f"{'stage':<20}{'calls/sec':>14}{'lines/sec':>14}{'p50 us':>10}{'p99 us':>10}{'max us':>10}")
+    for name, row in data['results'].items():
+        print(f"{name:<20}{row['calls_per_sec']:>14,.0f}{row['lines_per_sec']:>14,.0f}"
+              f"{row['p50_us']:>10,.1f}{row['p99_us']:>10,.1f}{row['max_us']:>10,.1f}")
+
+
+def compare(baseline, data, threshold=10.0):
+    """
+    Prints lines/sec and p99 changes against a baseline run and returns the
+    stages that got more than threshold% slower on either.
+    """
+    if baseline.get('config') != data.get('config'):
+        print("Warning: the baseline was run with different settings:", baseline.get('config'))
+    regressions = []
+    print(f"\nAgainst {baseline.get('label') or 'baseline'}:")
+    for name, row in data['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if old is None:
+            continue
+        throughput = (row['lines_per_sec'] / old['lines_per_sec'] - 1) * 100
+        p99 = (row['p99_us'] / old['p99_us'] - 1) * 100 if old['p99_us'] else 0.0
+        slower = throughput < -threshold or p99 > threshold
+        if slower:
+            regressions.append(name)
+        print(f"{name:<20} lines/sec {throughput:+7.1f}%   p99 {p99:+7.1f}%{'   REGRESSION' if slower else ''}")
+    return regressions
+
+
+def main(argv=None):
+    defaults = SuiteConfig()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=defaults.lines, help="Lines of traffic to generate")
+    parser.add_argument("--rounds", type=int, default=defaults.rounds, help="Best of this many passes for throughput")
+    parser.add_argument("--batch", type=int, default=defaults.batch, help="Lines per process_queue call")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--xp", type=float, default=defaults.mix.xp, help="Share of XP lines")
+    parser.add_argument("--group-every", type=int, default=defaults.mix.group_every,
+                        help="One group listing per this many lines on average (0: none)")
+    parser.add_argument("--colour", type=float, default=defaults.mix.colour, help="Share of coloured lines")
+    parser.add_argument("--min-chunk", type=int, default=defaults.mix.min_chunk, help="Smallest TCP payload")
+    parser.add_argument("--max-chunk", type=int, default=defaults.mix.max_chunk, help="Largest TCP payload")
+    parser.add_argument("--only", nargs="+", choices=tuple(STAGES), help="Run just these stages")
+    parser.add_argument("--output", "-o", default="bench-results.json", help="JSON results file ('' for none)")
+    parser.add_argument("--label", help="Name for this run, e.g. a version or commit")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results file of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent slower (throughput or p99) that counts as a regression")
+    args = parser.parse_args(argv)
+
+    mix = TrafficMix(args.xp, args.group_every, args.colour, args.min_chunk, args.max_chunk)
+    config = SuiteConfig(args.lines, args.rounds, args.batch, args.seed, mix)
+    data = run_suite(config, args.only, args.label)
+    report(data)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, data, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
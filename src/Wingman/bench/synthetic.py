@@ -0,0 +1,164 @@
+import random
+import struct
+import socket
+from typing import Iterable, List, NamedTuple, Tuple
+
+SERVER_IP = '18.119.153.121'
+SERVER_PORT = 4000
+CLIENT_IP = '10.0.0.2'
+CLIENT_PORT = 50123
+
+_ETH_HEADER = b"\x00\x11\x22\x33\x44\x55" + b"\x66\x77\x88\x99\xaa\xbb" + b"\x08\x00"
+
+
+def xp_log_lines(count: int, seed=0, xp=0.15) -> List[str]:
+    """A deterministic mix of combat spam and XP lines (`xp` of them XP gains)."""
+    rng = random.Random(seed)
+    attacks, hits = xp + (1 - xp) * 0.35 / 0.85, xp + (1 - xp) * 0.65 / 0.85  # Combat keeps its 35:30:20 split
+    lines = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < xp:
+            base = rng.randint(100, 30000)
+            lines.append(f"You gain {base} (+{base * 2}) experience points.")
+        elif roll < attacks:
+            lines.append(f"A golden sphinx attacks you for {rng.randint(1, 200)} damage!")
+        elif roll < hits:
+            lines.append(f"You hit the golden sphinx for {rng.randint(1, 300)} damage.")
+        else:
+            lines.append("A golden sphinx dies!")
+    return lines
+
+
+GROUP_MEMBERS = [
+    ("Orc", 40, "B", "Earthquack"),
+    ("Kenku", 70, "", "Big"),
+    ("Sin", 74, "P D", "Beautiful"),
+    ("Kenku", 58, "", "Quacamole"),
+]
+
+
+def group_table_lines(rng: random.Random, leader="Earthquack") -> List[str]:
+    """One `group` command listing, header and column titles included."""
+    lines = [f"{leader}'s group:",
+             "[ Class         Lvl] Status      Name                 Hits                Fat                Power"]
+    for cls, lvl, status, name in GROUP_MEMBERS:
+        vitals = []
+        for maximum in (rng.randint(300, 600), rng.randint(300, 600), rng.randint(50, 400)):
+            current = rng.randint(0, maximum)
+            vitals.append(f"{current:>4}/{maximum:>4} ({current * 100 // maximum:>3}%)")
+        lines.append(f"[{cls:<14} {lvl}]  {status:<8} {name:<20} " + "    ".join(vitals))
+    return lines
+
+
+def mixed_log_lines(count: int, seed=0, group_every=200, xp=0.15) -> List[str]:
+    """xp_log_lines with a full group listing spliced in every group_every lines (0: never)."""
+    rng = random.Random(seed)
+    lines = []
+    for line in xp_log_lines(count, seed, xp):
+        if group_every and rng.randrange(group_every) == 0:
+            lines.extend(group_table_lines(rng))
+        lines.append(line)
+    return lines[:count]
+
+
+_SGR_COLOURS = ("\x1b[0m", "\x1b[1m", "\x1b[31m", "\x1b[1;31m", "\x1b[32m", "\x1b[1;33m", "\x1b[36m",
+                "\x1b[1;37;44m")
+
+
+def colourize(lines: List[str], seed=0, fraction=1.0) -> List[str]:
+    """
+    Wraps `fraction` of the lines in SGR colour codes the way MUDs send them
+    (a colour per few words, a reset at the end), with the odd erase-line
+    or screen clear thrown in.
+    """
+    rng = random.Random(seed)
+    out = []
+    for line in lines:
+        if rng.random() >= fraction:
+            out.append(line)
+            continue
+        words = line.split(" ")
+        for i in range(0, len(words), 3):
+            words[i] = rng.choice(_SGR_COLOURS) + words[i]
+        coloured = " ".join(words) + "\x1b[0m"
+        roll = rng.random()
+        if roll < 0.05:
+            coloured += "\x1b[K"
+        elif roll < 0.06:
+            coloured = "\x1b[2J\x1b[H" + coloured
+        out.append(coloured)
+    return out
+
+
+def build_frame(payload: bytes, seq: int, flags=0x18, src=SERVER_IP, sport=SERVER_PORT,
+                dst=CLIENT_IP, dport=CLIENT_PORT) -> bytes:
+    """Ethernet/IPv4/TCP frame with zeroed checksums (nothing we parse checks them)."""
+    ip_header = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 40 + len(payload), 0, 0x4000, 64, 6, 0,
+                            socket.inet_aton(src), socket.inet_aton(dst))
+    tcp_header = struct.pack("!HHIIBBHHH", sport, dport, seq & 0xFFFFFFFF, 0, 5 << 4, flags, 65535, 0, 0)
+    return _ETH_HEADER + ip_header + tcp_header + payload
+
+
+def segment_stream(data: bytes, isn=1000, min_size=40, max_size=600, seed=0) -> List[Tuple[int, bytes]]:
+    """Cuts a byte stream into (seq, payload) segments of random size."""
+    rng = random.Random(seed)
+    segments = []
+    offset = 0
+    while offset < len(data):
+        size = rng.randint(min_size, max_size)
+        segments.append(((isn + offset) & 0xFFFFFFFF, data[offset:offset + size]))
+        offset += size
+    return segments
+
+
+def disorder(segments: List[Tuple[int, bytes]], reorder=0.1, duplicate=0.05, window=4, seed=0):
+    """
+    Simulates a messy network path: swaps segments within a small window
+    and re-sends a fraction of them (exact retransmits).
+    """
+    rng = random.Random(seed)
+    out = list(segments)
+    for i in range(len(out)):
+        if rng.random() < reorder:
+            j = min(len(out) - 1, i + rng.randint(1, window))
+            out[i], out[j] = out[j], out[i]
+    result = []
+    for seg in out:
+        result.append(seg)
+        if rng.random() < duplicate:
+            result.append(seg)
+    return result
+
+
+class TrafficMix(NamedTuple):
+    """What generated MUD traffic looks like. Everything that isn't XP or a group listing is combat spam."""
+    xp: float = 0.15  # Share of lines that are XP gains
+    group_every: int = 200  # On average one `group` listing per this many lines (0: none)
+    colour: float = 0.25  # Share of lines wrapped in SGR colour codes
+    min_chunk: int = 40  # TCP payload sizes the stream is cut into
+    max_chunk: int = 600
+
+
+def mud_traffic(count: int, mix=TrafficMix(), seed=0) -> List[str]:
+    """`count` lines as the server sends them (colour codes included), the same for the same seed."""
+    return colourize(mixed_log_lines(count, seed, mix.group_every, mix.xp), seed, mix.colour)
+
+
+def traffic_segments(lines: List[str], mix=TrafficMix(), seed=0) -> List[Tuple[int, bytes]]:
+    """The lines as a telnet byte stream, cut into (seq, payload) segments that split lines anywhere."""
+    data = ("\r\n".join(lines) + "\r\n").encode()
+    return segment_stream(data, min_size=mix.min_chunk, max_size=mix.max_chunk, seed=seed)
+
+
+def write_pcap(path: str, frames: Iterable[bytes], start_time=0.0, interval=0.001):
+    """Writes Ethernet frames as a classic (microsecond) pcap file."""
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+        ts = start_time
+        for frame in frames:
+            sec = int(ts)
+            usec = int(round((ts - sec) * 1_000_000))
+            f.write(struct.pack("<IIII", sec, usec, len(frame), len(frame)))
+            f.write(frame)
+            ts += interval
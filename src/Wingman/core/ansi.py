@@ -0,0 +1,210 @@
+import re
+from typing import Dict, NamedTuple, Tuple, Union
+
+ESC = '\x1b'
+
+# Every ANSI / VT100 escape we might get from a MUD, not just SGR colours.
+# The order matters: CSI and OSC must be tried before the generic two-byte form,
+# which would otherwise eat just the '[' or ']'.
+ANSI_PATTERN = re.compile(
+    r"\x1b(?:"
+    r"\[[0-?]*[ -/]*(?:[@-~]|$)"  # CSI: colours (m), cursor moves (H, A..D), erase (J, K), ...
+    r"|\][^\x07\x1b]*(?:\x07|\x1b\\|$)"  # OSC: window title etc., ended by BEL or ST
+    r"|[PX^_][^\x1b]*(?:\x1b\\|$)"  # DCS / SOS / PM / APC strings, ended by ST
+    r"|[ -/]*[0-~]"  # Two-byte and charset escapes: ESC 7, ESC M, ESC ( B, ...
+    r")?"  # A lone ESC at the end of a line
+)
+
+_sub = ANSI_PATTERN.sub
+
+# The same, with SGR (colour) sequences split out first: split() gives
+# [text, sgr params or None, text, sgr params or None, ..., text]
+_SGR_SPLIT = re.compile(r"\x1b\[([0-9;:]*)m|" + ANSI_PATTERN.pattern).split
+
+
+def strip_ansi(line: str) -> str:
+    """Removes every escape sequence. Lines without an ESC (most of them) are returned as they are."""
+    if ESC not in line:
+        return line
+    return _sub('', line)
+
+
+# --- Colour-preserving mode ---
+# Instead of throwing SGR codes away, AnsiStyler turns a line into its plain
+# text (what the parsers see) plus style spans over that text (what a
+# coloured mirror draws), in the same single regex pass as strip_ansi.
+
+class Style(NamedTuple):
+    """
+    Text attributes after some SGR codes. fg / bg are palette indexes
+    (0-7 normal, 8-15 bright, 16-255 xterm 256-colour) or '#rrggbb' for
+    24-bit colour, None for the terminal default.
+    """
+    fg: Union[int, str, None] = None
+    bg: Union[int, str, None] = None
+    bold: bool = False
+    italic: bool = False
+    underline: bool = False
+    reverse: bool = False
+
+
+DEFAULT_STYLE = Style()
+
+
+class Span(NamedTuple):
+    """Characters [start, end) of a StyledLine's text are drawn in style."""
+    start: int
+    end: int
+    style: Style
+
+
+class StyledLine(NamedTuple):
+    text: str
+    spans: Tuple[Span, ...]  # Default-styled stretches have no span
+
+
+def _apply_sgr(style: Style, params: str) -> Style:
+    """The style after ESC [ params m."""
+    fg, bg, bold, italic, underline, reverse = style
+    try:
+        codes = [int(code) if code else 0 for code in params.replace(':', ';').split(';')]
+    except ValueError:
+        return style  # Private sequence (e.g. ESC [ > 4 m), not a colour
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        if code == 0:
+            fg, bg, bold, italic, underline, reverse = DEFAULT_STYLE
+        elif code == 1:
+            bold = True
+        elif code == 3:
+            italic = True
+        elif code == 4:
+            underline = True
+        elif code == 7:
+            reverse = True
+        elif code == 22:
+            bold = False
+        elif code == 23:
+            italic = False
+        elif code == 24:
+            underline = False
+        elif code == 27:
+            reverse = False
+        elif 30 <= code <= 37:
+            fg = code - 30
+        elif 40 <= code <= 47:
+            bg = code - 40
+        elif 90 <= code <= 97:
+            fg = code - 90 + 8
+        elif 100 <= code <= 107:
+            bg = code - 100 + 8
+        elif code == 39:
+            fg = None
+        elif code == 49:
+            bg = None
+        elif code in (38, 48) and i + 1 < len(codes):
+            # Extended colour: 38;5;n (palette) or 38;2;r;g;b (24-bit)
+            if codes[i + 1] == 5 and i + 2 < len(codes):
+                colour = codes[i + 2] & 0xFF
+                i += 2
+            elif codes[i + 1] == 2 and i + 4 < len(codes):
+                r, g, b = (min(value, 255) for value in codes[i + 2:i + 5])
+                colour = f"#{r:02x}{g:02x}{b:02x}"
+                i += 4
+            else:
+                break  # Malformed: ignore the rest
+            if code == 38:
+                fg = colour
+            else:
+                bg = colour
+        i += 1
+    return Style(fg, bg, bold, italic, underline, reverse)
+
+
+class AnsiStyler:
+    """
+    Streaming SGR decoder: parse(line) -> StyledLine. The style carries over
+    from one line to the next, the way a terminal's does.
+
+    Built to run on every line without churning memory: each distinct Style
+    is created once (transitions are cached per (style, params)), spans are
+    interned so a repeated coloured message reuses the same Span objects,
+    and lines with no escape share one empty spans tuple. Each cache holds
+    at most max_cached entries and is emptied when it fills up, so a stream
+    of ever-changing 24-bit colours can't grow it without end.
+    """
+
+    def __init__(self, max_cached=4096):
+        self.max_cached = max_cached
+        self.style = DEFAULT_STYLE
+        self._transitions: Dict[Tuple[Style, str], Style] = {}
+        self._styles: Dict[Style, Style] = {DEFAULT_STYLE: DEFAULT_STYLE}
+        self._spans: Dict[Tuple[int, int, Style], Span] = {}
+
+    def reset(self):
+        """Back to the default style (new connection)."""
+        self.style = DEFAULT_STYLE
+
+    @property
+    def styles(self) -> int:
+        """Distinct styles cached right now."""
+        return len(self._styles)
+
+    def _next_style(self, style, params):
+        key = (style, params)
+        new = self._transitions.get(key)
+        if new is None:
+            new = _apply_sgr(style, params)
+            styles = self._styles
+            if new not in styles and len(styles) >= self.max_cached:
+                # Transitions and spans hold the old Style objects: start them over too
+                styles.clear()
+                self._transitions.clear()
+                self._spans.clear()
+                styles[DEFAULT_STYLE] = DEFAULT_STYLE
+                styles[style] = style  # Keep the current one, so `is` comparisons still hold
+            new = styles.setdefault(new, new)  # One object per distinct style
+            if len(self._transitions) >= self.max_cached:
+                self._transitions.clear()
+            self._transitions[key] = new
+        return new
+
+    def _span(self, start, end, style):
+        key = (start, end, style)
+        span = self._spans.get(key)
+        if span is None:
+            if len(self._spans) >= self.max_cached:
+                self._spans.clear()
+            span = self._spans[key] = Span(start, end, style)
+        return span
+
+    def parse(self, line: str) -> StyledLine:
+        style = self.style
+        if ESC not in line:
+            if style is DEFAULT_STYLE or not line:
+                return StyledLine(line, ())
+            return StyledLine(line, (self._span(0, len(line), style),))
+
+        pieces = _SGR_SPLIT(line)
+        texts = pieces[::2]
+        spans = []
+        length = 0  # Plain text emitted so far
+        span_start = 0  # Where the current style started in the plain text
+        for i in range(1, len(pieces), 2):
+            length += len(texts[i >> 1])
+            params = pieces[i]
+            if params is None:
+                continue  # Cursor moves, erases, titles: dropped like strip_ansi does
+            new = self._next_style(style, params)
+            if new is not style:
+                if length > span_start and style is not DEFAULT_STYLE:
+                    spans.append(self._span(span_start, length, style))
+                style = new
+                span_start = length
+        length += len(texts[-1])
+        if length > span_start and style is not DEFAULT_STYLE:
+            spans.append(self._span(span_start, length, style))
+
+        self.style = style
+        return StyledLine("".join(texts), tuple(spans))
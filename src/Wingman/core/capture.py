@@ -0,0 +1,155 @@
+import socket
+import struct
+import time
+from typing import NamedTuple, Optional
+
+# --- Link-layer types (pcap DLT numbers) ---
+DLT_NULL = 0  # BSD loopback, host byte order family
+DLT_EN10MB = 1  # Ethernet
+DLT_RAW = 101  # Raw IP, no link header
+DLT_LOOP = 108  # OpenBSD loopback, network byte order family
+DLT_LINUX_SLL = 113  # Linux "cooked" capture (any interface)
+DLT_IPV4 = 228  # Raw IPv4, what scapy reports for a bare IP layer (e.g. tun interfaces)
+DLT_IPV6 = 229  # Raw IPv6
+DLT_LINUX_SLL2 = 276
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_VLAN = 0x8100
+IPPROTO_TCP = 6
+
+# --- TCP flag bits ---
+TCP_FIN = 0x01
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_PSH = 0x08
+TCP_ACK = 0x10
+
+_unpack_u16 = struct.Struct("!H").unpack_from
+_unpack_tcp_head = struct.Struct("!HHI").unpack_from  # sport, dport, seq
+
+
+class TcpSegment(NamedTuple):
+    src: str
+    sport: int
+    dst: str
+    dport: int
+    seq: int
+    flags: int
+    payload: memoryview
+
+
+def build_bpf_filter(host: str, port: int) -> str:
+    """
+    Builds a BPF expression matching only server -> client game traffic,
+    so the kernel (or Npcap) discards everything else before Python sees it.
+    """
+    return f"tcp and src host {host} and src port {int(port)}"
+
+
+def _ip_offset(frame, linktype: int) -> int:
+    """Returns the offset of the IPv4 header in the frame, or -1 if it isn't IPv4."""
+    if linktype == DLT_EN10MB:
+        if len(frame) < 14:
+            return -1
+        ethertype = _unpack_u16(frame, 12)[0]
+        offset = 14
+        # Skip (possibly stacked) 802.1Q VLAN tags
+        while ethertype == ETHERTYPE_VLAN and len(frame) >= offset + 4:
+            ethertype = _unpack_u16(frame, offset + 2)[0]
+            offset += 4
+        return offset if ethertype == ETHERTYPE_IPV4 else -1
+    if linktype == DLT_LINUX_SLL:
+        if len(frame) < 16:
+            return -1
+        return 16 if _unpack_u16(frame, 14)[0] == ETHERTYPE_IPV4 else -1
+    if linktype == DLT_LINUX_SLL2:
+        if len(frame) < 20:
+            return -1
+        return 20 if _unpack_u16(frame, 0)[0] == ETHERTYPE_IPV4 else -1
+    if linktype in (DLT_NULL, DLT_LOOP):
+        if len(frame) < 4:
+            return -1
+        # AF_INET is 2 on every platform; check either byte order
+        family = bytes(frame[0:4])
+        return 4 if family in (b"\x02\x00\x00\x00", b"\x00\x00\x00\x02") else -1
+    if linktype in (DLT_RAW, DLT_IPV4, DLT_IPV6):
+        return 0  # parse_frame checks the IP version itself
+    return -1
+
+
+def parse_frame(frame, linktype: int = DLT_EN10MB) -> Optional[TcpSegment]:
+    """
+    Slices the IPv4/TCP headers out of a raw frame by hand.
+    Returns None for anything that isn't a (first-fragment) IPv4 TCP segment.
+    The payload is a memoryview into the frame, so no bytes are copied.
+    """
+    ip = _ip_offset(frame, linktype)
+    if ip < 0 or len(frame) < ip + 20:
+        return None
+
+    version_ihl = frame[ip]
+    if version_ihl >> 4 != 4 or frame[ip + 9] != IPPROTO_TCP:
+        return None
+    # Non-first fragments carry no TCP header
+    if _unpack_u16(frame, ip + 6)[0] & 0x1FFF:
+        return None
+
+    ihl = (version_ihl & 0x0F) * 4
+    total_len = _unpack_u16(frame, ip + 2)[0]
+    # Ethernet pads short frames; trust the IP length, not the frame length
+    ip_end = min(ip + total_len, len(frame))
+
+    tcp = ip + ihl
+    if ip_end < tcp + 20:
+        return None
+    sport, dport, seq = _unpack_tcp_head(frame, tcp)
+    data_offset = (frame[tcp + 12] >> 4) * 4
+    flags = frame[tcp + 13]
+    start = tcp + data_offset
+    if start > ip_end:
+        return None
+
+    view = frame if isinstance(frame, memoryview) else memoryview(frame)
+    return TcpSegment(
+        socket.inet_ntoa(bytes(frame[ip + 12:ip + 16])), sport,
+        socket.inet_ntoa(bytes(frame[ip + 16:ip + 20])), dport,
+        seq, flags, view[start:ip_end]
+    )
+
+
+class CaptureStats:
+    """Counters for the capture engine. Only the capture thread writes to these."""
+
+    def __init__(self):
+        self.received = 0  # Frames handed to us by the kernel / driver
+        self.handled = 0  # Segments from the game server passed on to reassembly (flag-only ones included)
+        self.ignored = 0  # Frames that slipped past the filter (malformed, other flows)
+        self.kernel_dropped = 0  # Frames the OS dropped because we fell behind
+        self.started = time.monotonic()
+
+        self._last_report_time = self.started
+        self._last_report_handled = 0
+
+    def packets_per_sec(self) -> float:
+        """Average handled packets/sec since capture started."""
+        elapsed = time.monotonic() - self.started
+        return self.handled / elapsed if elapsed > 0 else 0.0
+
+    def interval_report(self) -> str:
+        """One-line summary covering the time since the previous report."""
+        now = time.monotonic()
+        elapsed = now - self._last_report_time
+        rate = (self.handled - self._last_report_handled) / elapsed if elapsed > 0 else 0.0
+        self._last_report_time = now
+        self._last_report_handled = self.handled
+        return (f"{rate:,.1f} pkt/s handled, {self.handled:,} handled, "
+                f"{self.ignored:,} ignored, {self.kernel_dropped:,} dropped")
+
+    def as_dict(self) -> dict:
+        return {
+            'received': self.received,
+            'handled': self.handled,
+            'ignored': self.ignored,
+            'dropped': self.kernel_dropped,
+            'packets_per_sec': self.packets_per_sec(),
+        }
@@ -0,0 +1,195 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from Wingman.core.group_history import VITAL_FIELDS
+from Wingman.core.pipeline import ProcessingWorker, SessionSnapshot
+from Wingman.core.rates import window_label
+
+DEFAULT_HOST = "127.0.0.1"  # Local only: the numbers are nobody else's business
+DEFAULT_PORT = 9405
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+JSON_CONTENT_TYPE = "application/json"
+
+
+# --- Rendering (pure functions of a snapshot) ---
+
+def _label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _metric(out, name, kind, help_text, samples):
+    """samples: [(labels dict or None, value)]."""
+    out.append(f"# HELP {name} {help_text}")
+    out.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        if labels:
+            label_text = ",".join(f'{key}="{_label_value(val)}"' for key, val in labels.items())
+            out.append(f"{name}{{{label_text}}} {value}")
+        else:
+            out.append(f"{name} {value}")
+
+
+def render_prometheus(snapshot: SessionSnapshot, lines_per_second: float = 0.0) -> str:
+    """The snapshot in Prometheus text exposition format."""
+    out = []
+    _metric(out, "wingman_xp_total", "counter", "Experience gained this session.",
+            [(None, snapshot.total_xp)])
+    _metric(out, "wingman_xp_per_hour", "gauge", "Average XP per hour of active time.",
+            [(None, snapshot.xp_per_hour_at(snapshot.taken_at))])
+    _metric(out, "wingman_xp_per_hour_window", "gauge", "XP per hour over a recent window of active time.",
+            [({"window": window_label(window)}, rate) for window, rate in snapshot.rolling_rates.items()])
+    _metric(out, "wingman_active_seconds", "gauge", "Session time, not counting pauses.",
+            [(None, round(snapshot.active_seconds, 3))])
+    _metric(out, "wingman_paused", "gauge", "1 while the session is paused.",
+            [(None, int(snapshot.paused))])
+    _metric(out, "wingman_events_total", "counter", "Parsed events by kind.",
+            [({"kind": kind}, count) for kind, count in sorted(snapshot.event_counts.items())])
+
+    members = [m for m in snapshot.group if m.get('vitals') is not None]
+    _metric(out, "wingman_member_level", "gauge", "Group member level.",
+            [({"name": m['name'], "cls": m['cls']}, int(m['lvl'])) for m in members])
+    for index, field in enumerate(VITAL_FIELDS):
+        _metric(out, f"wingman_member_{field}", "gauge", f"Group member {field.replace('_', ' ')}.",
+                [({"name": m['name'], "cls": m['cls']}, m['vitals'][index]) for m in members])
+
+    _metric(out, "wingman_lines_processed_total", "counter", "Lines parsed.",
+            [(None, snapshot.lines_processed)])
+    _metric(out, "wingman_lines_per_second", "gauge", "Lines parsed per second since the previously served snapshot.",
+            [(None, round(lines_per_second, 1))])
+    _metric(out, "wingman_queue_depth", "gauge", "Lines waiting to be parsed.",
+            [(None, snapshot.queue_depth)])
+    _metric(out, "wingman_lines_dropped_total", "counter", "Lines dropped because the queue was full.",
+            [(None, snapshot.lines_dropped)])
+    _metric(out, "wingman_parse_batches_total", "counter", "Parse batches run.",
+            [(None, snapshot.batches)])
+    _metric(out, "wingman_parse_seconds_total", "counter", "Time spent parsing.",
+            [(None, round(snapshot.parse_seconds, 6))])
+    _metric(out, "wingman_parse_batch_seconds", "gauge", "Time the most recent parse batch took.",
+            [(None, round(snapshot.last_batch_seconds, 6))])
+    _metric(out, "wingman_snapshot_timestamp_seconds", "gauge", "When the served snapshot was taken.",
+            [(None, round(snapshot.taken_at, 3))])
+    return "\n".join(out) + "\n"
+
+
+def snapshot_to_dict(snapshot: SessionSnapshot, lines_per_second: float = 0.0) -> dict:
+    """The snapshot as plain JSON-able data."""
+    group = []
+    for member in snapshot.group:
+        row = dict(member)
+        vitals = row.pop('vitals', None)
+        if vitals is not None:
+            row['vitals'] = dict(zip(VITAL_FIELDS, vitals))
+        group.append(row)
+    return {
+        'taken_at': snapshot.taken_at,
+        'total_xp': snapshot.total_xp,
+        'xp_per_hour': snapshot.xp_per_hour_at(snapshot.taken_at),
+        'rolling_xp_per_hour': {window_label(window): rate for window, rate in snapshot.rolling_rates.items()},
+        'duration': snapshot.duration_str_at(snapshot.taken_at),
+        'active_seconds': snapshot.active_seconds,
+        'paused': snapshot.paused,
+        'group': group,
+        'events': dict(snapshot.event_counts),
+        'oob': dict(snapshot.oob),
+        'pipeline': {
+            'lines_processed': snapshot.lines_processed,
+            'lines_per_second': round(lines_per_second, 1),
+            'queue_depth': snapshot.queue_depth,
+            'lines_dropped': snapshot.lines_dropped,
+            'batches': snapshot.batches,
+            'parse_seconds': snapshot.parse_seconds,
+            'last_batch_seconds': snapshot.last_batch_seconds,
+        },
+    }
+
+
+# --- HTTP ---
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "Wingman"
+
+    def do_GET(self):
+        exporter = self.server.exporter
+        path = self.path.split('?', 1)[0]
+        if path == "/metrics":
+            body, content_type = exporter.render()[0], PROMETHEUS_CONTENT_TYPE
+        elif path == "/metrics.json":
+            body, content_type = exporter.render()[1], JSON_CONTENT_TYPE
+        else:
+            self.send_error(404, "Try /metrics or /metrics.json")
+            return
+        exporter.requests += 1
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # A scrape every few seconds would flood the console
+
+
+class MetricsExporter:
+    """
+    Serves the worker's latest snapshot over local HTTP, for dashboards,
+    overlays and Prometheus:
+
+        /metrics        Prometheus text format
+        /metrics.json   the same numbers (plus group rows and OOB data) as JSON
+
+    Bodies are rendered once per new snapshot and served from that cache
+    after; scrapes only read the immutable snapshot, so they never wait on
+    (or slow down) parsing.
+    """
+
+    def __init__(self, worker: ProcessingWorker, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.worker = worker
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._cache = (None, b"", b"")  # (snapshot, prometheus body, JSON body)
+        self._lines_per_second = 0.0
+
+        # --- Counters ---
+        self.requests = 0
+        self.renders = 0
+
+    def render(self):
+        """(Prometheus body, JSON body) for the current snapshot, rendered only if it changed."""
+        snapshot = self.worker.peek()
+        with self._lock:
+            cached, prometheus, as_json = self._cache
+            if snapshot is cached:
+                return prometheus, as_json
+            if cached is not None and snapshot.taken_at > cached.taken_at:
+                self._lines_per_second = ((snapshot.lines_processed - cached.lines_processed)
+                                          / (snapshot.taken_at - cached.taken_at))
+            prometheus = render_prometheus(snapshot, self._lines_per_second).encode()
+            as_json = json.dumps(snapshot_to_dict(snapshot, self._lines_per_second), default=str).encode()
+            self._cache = (snapshot, prometheus, as_json)
+            self.renders += 1
+            return prometheus, as_json
+
+    @property
+    def address(self):
+        """(host, port) actually bound (port 0 picks a free one)."""
+        return self._server.server_address if self._server is not None else (self.host, self.port)
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.exporter = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsExporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
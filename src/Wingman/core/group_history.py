@@ -0,0 +1,126 @@
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Order of the numbers in a member's 'vitals' tuple (see parser._group_row_from_match)
+VITAL_FIELDS = ("hp", "hp_max", "fat", "fat_max", "pwr", "pwr_max")
+
+DEFAULT_CAPACITY = 3600  # Samples kept per member (an hour of once-a-second group listings)
+DEFAULT_MAX_MEMBERS = 16  # Members remembered; whoever was seen longest ago is forgotten first
+
+_SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def parse_vital(text: str) -> Tuple[int, int]:
+    """'227/ 394' -> (227, 394)."""
+    current, _, maximum = text.partition('/')
+    return int(current), int(maximum)
+
+
+class MemberHistory:
+    """
+    One member's vitals over time, as a ring of `capacity` samples in
+    array('i') columns (4 bytes per number instead of a dict of strings
+    per listing). A sample is only stored when something changed.
+    """
+    __slots__ = ('name', 'cls', 'lvl', 'status', 'capacity', 'times', 'columns', 'count', '_next',
+                 'last_seen')
+
+    def __init__(self, name: str, capacity: int = DEFAULT_CAPACITY):
+        self.name = name
+        self.cls = ""
+        self.lvl = 0
+        self.status = ""
+        self.capacity = capacity
+        self.times = array('i', bytes(4 * capacity))  # Seconds since the session started
+        self.columns = tuple(array('i', bytes(4 * capacity)) for _ in VITAL_FIELDS)
+        self.count = 0
+        self._next = 0
+        self.last_seen = 0
+
+    def latest(self) -> Optional[Tuple[int, ...]]:
+        if not self.count:
+            return None
+        i = self._next - 1
+        return tuple(column[i] for column in self.columns)
+
+    def append(self, t: float, vitals: Tuple[int, ...]):
+        self.last_seen = int(t)
+        if vitals == self.latest():
+            return
+        i = self._next
+        self.times[i] = int(t)
+        for column, value in zip(self.columns, vitals):
+            column[i] = value
+        self._next = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def _ordered(self, values: array, last: Optional[int]) -> List[int]:
+        count = self.count if last is None else min(last, self.count)
+        start = self._next - count
+        if start >= 0:
+            return values[start:self._next].tolist()
+        return values[start:].tolist() + values[:self._next].tolist()
+
+    def series(self, field: str, last: Optional[int] = None) -> List[int]:
+        """The last `last` (default: all kept) values of a VITAL_FIELDS field, oldest first."""
+        return self._ordered(self.columns[VITAL_FIELDS.index(field)], last)
+
+    def sample_times(self, last: Optional[int] = None) -> List[int]:
+        return self._ordered(self.times, last)
+
+    def percent_series(self, field: str, last: Optional[int] = None) -> List[int]:
+        """e.g. percent_series('pwr') -> power as % of max power, oldest first."""
+        values = self.series(field, last)
+        maxima = self.series(field + "_max", last)
+        return [value * 100 // maximum if maximum else 0 for value, maximum in zip(values, maxima)]
+
+    def trend(self, field: str = "pwr", last: int = 8) -> str:
+        """A tiny text sparkline of the field's % of max, e.g. '█▇▅▃▂' for a healer running dry."""
+        return "".join(_SPARK_CHARS[min(percent, 100) * (len(_SPARK_CHARS) - 1) // 100]
+                       for percent in self.percent_series(field, last))
+
+    def nbytes(self) -> int:
+        return (sys.getsizeof(self) + sys.getsizeof(self.times)
+                + sum(sys.getsizeof(column) for column in self.columns))
+
+
+class GroupHistory:
+    """Per-member MemberHistory for everyone seen in group listings, bounded in members and samples."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, max_members: int = DEFAULT_MAX_MEMBERS):
+        self.capacity = capacity
+        self.max_members = max_members
+        self.members: Dict[str, MemberHistory] = OrderedDict()
+
+    def record(self, rows: Iterable[dict], t: float):
+        """Adds one group listing (parsed rows with a 'vitals' tuple) taken at time t."""
+        members = self.members
+        for row in rows:
+            vitals = row.get('vitals')
+            if vitals is None:
+                continue  # e.g. a group restored from an older journal
+            name = row['name']
+            history = members.get(name)
+            if history is None:
+                history = members[name] = MemberHistory(name, self.capacity)
+                if len(members) > self.max_members:
+                    members.popitem(last=False)
+            else:
+                members.move_to_end(name)
+            history.cls = row['cls']
+            history.lvl = int(row['lvl'])
+            history.status = row['status']
+            history.append(t, tuple(vitals))
+
+    def get(self, name: str) -> Optional[MemberHistory]:
+        return self.members.get(name)
+
+    def trend(self, name: str, field: str = "pwr", last: int = 8) -> str:
+        history = self.members.get(name)
+        return history.trend(field, last) if history is not None else ""
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.members) + sum(h.nbytes() for h in self.members.values())
@@ -1,43 +1,236 @@
-import re
+import threading
+from collections import deque
+from time import perf_counter_ns
+from Wingman.core.ansi import strip_ansi
+from Wingman.core.latency import STAGE_STRIP, STAGE_QUEUE_WAIT
+
+# --- Overflow policies (what receive() does when the queue is full) ---
+DROP_OLDEST = "drop_oldest"  # Evict the oldest queued line to make room
+DROP_NEWEST = "drop_newest"  # Count the new line as dropped and discard it
+BLOCK = "block"  # Wait (up to block_timeout) for the consumer to make room, then drop
+
 
 class InputReceiver:
+    """
+    Queue of cleaned lines between the sniffer thread and the GUI.
+
+    receive() is the one place ANSI escapes are stripped: the listener and
+    replay hand over lines as they came off the wire.
+
+    Thread-safety contract: one producer thread calls receive(), one consumer
+    thread calls drain() / remove_from_top(). deque.append and deque.popleft
+    are atomic, so neither side takes a lock on the hot path; only the BLOCK
+    policy waits on a Condition.
+
+    on_new_line_callback is the consumer's wakeup: it runs on the producer
+    thread for the first line after each drain, not for every line, so a
+    burst costs one wakeup however many lines it holds.
+    """
     last_received = None
     scrubbed_message = None
     stack = None
 
-    stack_log_file = 'stack_log.txt'  # File to store stack logs
+    def __init__(self, on_new_line_callback=None, max_size=100_000, overflow_policy=DROP_OLDEST,
+                 block_timeout=1.0, raw_capture=None, styler=None, mirror_size=1000, latency=None):
+        if overflow_policy not in (DROP_OLDEST, DROP_NEWEST, BLOCK):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy!r}")
 
-    def __init__(self, on_new_line_callback=None):
         self.last_received = ""
-        self.stack = []
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        # With DROP_OLDEST the deque itself evicts from the left when full
+        self.stack = deque(maxlen=max_size if overflow_policy == DROP_OLDEST else None)
+        # Structured out-of-band events (telnet GMCP / MSDP), kept apart so the line path stays str-only
+        self.oob = deque(maxlen=max_size)
         self.on_new_line_callback = on_new_line_callback  # Optional callback function
+        self._wakeup_armed = True  # Cleared once the callback fires, re-set by the consumer draining
+
+        # --- Counters ---
+        self.received = 0
+        self.dropped = 0
+        self.high_water = 0
+        self.wakeups = 0
+
+        self._not_full = threading.Condition() if overflow_policy == BLOCK else None
 
-        # Clear the log file when the instance is initialized
-        with open(self.stack_log_file, 'w') as f:
-            f.write('')  # Clear the contents of the file
+        # Optional RawLineCapture: gets every line exactly as it arrived, before cleaning
+        self.raw_capture = raw_capture
+
+        # Colour mode: with an ansi.AnsiStyler set, lines are stripped by it instead, and the
+        # StyledLines also go to `mirror` (the newest mirror_size) for a coloured view of the game
+        self.styler = styler
+        self.mirror = deque(maxlen=mirror_size)
+
+        # Optional latency.PipelineLatency, shared with the listener, worker and GUI through us.
+        # While it's enabled every queued line gets a (capture ns, queued ns) stamp in `stamps`;
+        # stamped lines are always the newest ones (drains clear the deque once timing stops)
+        self.latency = latency
+        self.stamps = deque(maxlen=max_size if overflow_policy == DROP_OLDEST else None)
+        self.capture_ns = None  # Set by the listener: when the segment being split arrived
+        self.oldest_capture_ns = None  # Capture stamp of the oldest line the last drain returned
 
     @staticmethod
     def clean_message(input_line):
-        # UPDATED: Now includes \x1b to catch the Escape character too
-        ansi_code_pattern = re.compile(r'\x1b\[\d+(?:;\d+)*m')
-        return ansi_code_pattern.sub('', input_line)
+        """Removes ANSI escape codes (see core.ansi.strip_ansi)."""
+        return strip_ansi(input_line)
 
     def receive(self, input_line):
-        if not input_line.strip():
+        if self.raw_capture is not None:
+            self.raw_capture.put(input_line)
+        latency = self.latency
+        timed = latency is not None and latency.enabled
+        if timed:
+            start = perf_counter_ns()
+
+        styler = self.styler
+        if styler is None:
+            cleaned_input = strip_ansi(input_line)
+        else:
+            styled = styler.parse(input_line)  # Same single pass, keeping the colours
+            cleaned_input = styled.text
+        if timed:
+            now = perf_counter_ns()
+            latency.record(STAGE_STRIP, now - start)
+        # Also drops lines that were nothing but escape codes (e.g. a bare screen clear)
+        if not cleaned_input.strip():
             return
+        if styler is not None:
+            self.mirror.append(styled)
 
         self.last_received = input_line
-        cleaned_input = self.clean_message(input_line)
-        self._add_to_stack(cleaned_input)
+        self._add_to_stack(cleaned_input, (self.capture_ns or start, now) if timed else None)
         # debugging line as needed print("receiver received " + cleaned_input)
 
-    def _add_to_stack(self, cleaned_input):
-        self.stack.append(cleaned_input)
+    def _add_to_stack(self, cleaned_input, stamp=None):
+        stack = self.stack
+        self.received += 1
+
+        if len(stack) >= self.max_size:
+            if self.overflow_policy == DROP_OLDEST:
+                self.dropped += 1  # append() below evicts the oldest line
+            elif self.overflow_policy == DROP_NEWEST or not self._wait_for_room():
+                self.dropped += 1
+                return
+
+        stack.append(cleaned_input)
+        if stamp is not None:
+            self.stamps.append(stamp)
+        depth = len(stack)
+        if depth > self.high_water:
+            self.high_water = depth
+
+        if self._wakeup_armed and self.on_new_line_callback is not None:
+            self._wake_consumer()
+
+    def _wake_consumer(self):
+        self._wakeup_armed = False
+        self.wakeups += 1
+        self.on_new_line_callback()
+
+    def receive_oob(self, event):
+        """Queues a structured out-of-band event (e.g. a telnet.OobEvent) for the consumer."""
+        self.oob.append(event)
+        if self._wakeup_armed and self.on_new_line_callback is not None:
+            self._wake_consumer()
+
+    def drain_oob(self):
+        """Pops every queued out-of-band event, oldest first."""
+        oob = self.oob
+        if not oob:
+            return []
+        self._wakeup_armed = True
+        popleft = oob.popleft
+        return [popleft() for _ in range(len(oob))]
+
+    def drain_mirror(self):
+        """Pops every queued StyledLine (colour mode), oldest first. For the mirror's reader only."""
+        mirror = self.mirror
+        popleft = mirror.popleft
+        lines = []
+        try:
+            for _ in range(len(mirror)):
+                lines.append(popleft())
+        except IndexError:
+            pass  # The producer evicted some (mirror full) while we were popping
+        return lines
+
+    def _wait_for_room(self):
+        with self._not_full:
+            return self._not_full.wait_for(lambda: len(self.stack) < self.max_size, self.block_timeout)
 
     def remove_from_top(self):
-        removed = self.stack.pop(0) if self.stack else None
+        self._wakeup_armed = True
+        depth = len(self.stack)
+        try:
+            removed = self.stack.popleft()
+        except IndexError:
+            return None
+        if self.stamps:
+            self._pop_stamps(1, depth)
+        self._notify_not_full()
         return removed
 
+    def drain(self, max_items=None):
+        """
+        Pops up to max_items lines (all queued lines if None) in FIFO order.
+        Lines appended while draining are left for the next call.
+        """
+        # Re-arm before popping: a line that lands mid-drain must still wake the consumer
+        self._wakeup_armed = True
+        stack = self.stack
+        count = len(stack) if max_items is None else min(max_items, len(stack))
+        if not count:
+            return []
+        depth = len(stack)
+        popleft = stack.popleft
+        items = [popleft() for _ in range(count)]
+        if self.stamps:
+            self._pop_stamps(count, depth)
+        elif self.oldest_capture_ns is not None:
+            self.oldest_capture_ns = None
+        self._notify_not_full()
+        return items
+
+    def _pop_stamps(self, count, depth):
+        """Records queue waits for the stamped lines among the `count` just popped from `depth` queued."""
+        stamps = self.stamps
+        if not self.latency.enabled:
+            # Timing stopped: lines queued since have no stamps, so these no longer line up
+            stamps.clear()
+            self.oldest_capture_ns = None
+            return
+        # Unstamped lines (queued before timing started) are all in front of the stamped ones
+        stamped = min(len(stamps), max(0, count - (depth - len(stamps))))
+        if not stamped:
+            self.oldest_capture_ns = None
+            return
+        now = perf_counter_ns()
+        record = self.latency.histograms[STAGE_QUEUE_WAIT].record
+        popleft = stamps.popleft
+        capture_ns, queued_ns = popleft()
+        self.oldest_capture_ns = capture_ns
+        record(now - queued_ns)
+        for _ in range(stamped - 1):
+            record(now - popleft()[1])
+
+    def _notify_not_full(self):
+        if self._not_full is not None:
+            with self._not_full:
+                self._not_full.notify()
+
+    @property
+    def depth(self):
+        return len(self.stack)
+
+    def get_stats(self):
+        return {
+            'depth': len(self.stack),
+            'high_water': self.high_water,
+            'received': self.received,
+            'dropped': self.dropped,
+        }
+
     def get_last_received(self):
         return self.last_received
 
@@ -0,0 +1,105 @@
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+# --- Record kinds. Each journal line is a compact JSON array: [kind, timestamp, *fields] ---
+REC_SNAPSHOT = "snap"  # [snap, ts, state]   full session state; always the first line
+REC_XP = "xp"  # [xp, ts, amount]
+REC_GROUP = "group"  # [group, ts, members]
+REC_PAUSE = "pause"  # [pause, ts]
+REC_RESUME = "resume"  # [resume, ts]
+
+
+class SessionJournal:
+    """
+    Append-only, newline-delimited JSON log of session events.
+
+    Writes go through a buffered file and are flushed at most every
+    flush_interval_ms (checked on each write and on poll()). Every
+    snapshot_every events or snapshot_interval seconds the journal is
+    compacted: a fresh file starting with a full-state snapshot replaces the
+    old one, so resuming never replays more than one snapshot's worth of events.
+    """
+
+    def __init__(self, path, flush_interval_ms=500, snapshot_every=5000, snapshot_interval=60.0,
+                 clock=time.monotonic):
+        self.path = path
+        self.flush_interval = flush_interval_ms / 1000
+        self.snapshot_every = snapshot_every
+        self.snapshot_interval = snapshot_interval
+        self.clock = clock
+
+        self._file = None
+        self._dirty = False
+        self._last_flush = clock()
+        self._last_snapshot = clock()
+        self.events_since_snapshot = 0
+
+    # --- Writing ---
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8', buffering=1 << 16)
+        return self._file
+
+    def record(self, kind: str, timestamp: float, *fields):
+        self._open().write(json.dumps([kind, round(timestamp, 3), *fields], separators=(',', ':')) + "\n")
+        self._dirty = True
+        self.events_since_snapshot += 1
+        self._flush_if_due()
+
+    def _flush_if_due(self):
+        now = self.clock()
+        if self._dirty and now - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._file is not None and self._dirty:
+            self._file.flush()
+            self._dirty = False
+        self._last_flush = self.clock()
+
+    def snapshot_due(self) -> bool:
+        return (self.events_since_snapshot >= self.snapshot_every
+                or self.clock() - self._last_snapshot >= self.snapshot_interval)
+
+    def write_snapshot(self, timestamp: float, state: Dict[str, Any]):
+        """Compacts the journal down to a single snapshot (atomically replaces the file)."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps([REC_SNAPSHOT, round(timestamp, 3), state], separators=(',', ':')) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        self._dirty = False
+        self.events_since_snapshot = 0
+        self._last_snapshot = self._last_flush = self.clock()
+
+    def poll(self):
+        """Called periodically by the owner so buffered events reach disk even when idle."""
+        self._flush_if_due()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # --- Reading ---
+    def read(self) -> List[list]:
+        """All intact records. A torn final line (crash mid-write) is ignored."""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return records
+
@@ -0,0 +1,139 @@
+import json
+import time
+from array import array
+from typing import Dict
+
+# --- Pipeline stages ---
+STAGE_DECODE = "decode"  # Telnet decoding + line framing, per TCP payload
+STAGE_STRIP = "strip"  # ANSI stripping, per line
+STAGE_QUEUE_WAIT = "queue_wait"  # InputReceiver: queued -> drained by the worker, per line
+STAGE_PARSE = "parse"  # One process_queue batch on the worker
+STAGE_GUI_APPLY = "gui_apply"  # The window drawing one snapshot
+STAGE_END_TO_END = "packet_to_pixel"  # Segment reached the listener -> the window drew it (oldest line per frame)
+STAGES = (STAGE_DECODE, STAGE_STRIP, STAGE_QUEUE_WAIT, STAGE_PARSE, STAGE_GUI_APPLY, STAGE_END_TO_END)
+
+# Histogram layout: values (ns) below 2**SUB_BITS get a bucket each; above that every
+# power of two is split into 2**SUB_BITS buckets, so each is within ~3% of its value
+SUB_BITS = 5
+SUB_BUCKETS = 1 << SUB_BITS
+MAX_BITS = 45  # ~9.8 hours in ns; anything longer lands in the last bucket
+BUCKETS = (MAX_BITS - SUB_BITS + 1) * SUB_BUCKETS
+
+
+def bucket_index(ns: int) -> int:
+    if ns < SUB_BUCKETS:
+        return max(0, ns)
+    shift = min(ns.bit_length(), MAX_BITS) - SUB_BITS - 1
+    return min((shift << SUB_BITS) + (ns >> shift), BUCKETS - 1)
+
+
+def bucket_upper(index: int) -> int:
+    """Largest value (ns) that falls in bucket `index`."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> SUB_BITS) - 1
+    return (((index & (SUB_BUCKETS - 1)) + SUB_BUCKETS + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram: log-linear buckets in one fixed array, so
+    recording is an index computation and an increment, and percentiles are
+    accurate to a few percent from nanoseconds to hours.
+    """
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = array('q', bytes(8 * BUCKETS))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, ns: int):
+        self.counts[bucket_index(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, percent: float) -> int:
+        """Upper bound (ns) of the value percent% of samples are at or below; 0 if empty."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * percent // 100))  # ceil
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                if seen >= rank:
+                    return min(bucket_upper(index), self.max)
+        return self.max
+
+    def reset(self):
+        self.counts = array('q', bytes(8 * BUCKETS))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def summary(self) -> Dict[str, float]:
+        """count, plus mean / p50 / p90 / p99 / p99.9 / max in microseconds."""
+        us = 1000
+        return {
+            'count': self.count,
+            'mean_us': round(self.total / self.count / us, 2) if self.count else 0,
+            'p50_us': round(self.percentile(50) / us, 2),
+            'p90_us': round(self.percentile(90) / us, 2),
+            'p99_us': round(self.percentile(99) / us, 2),
+            'p999_us': round(self.percentile(99.9) / us, 2),
+            'max_us': round(self.max / us, 2),
+        }
+
+
+class PipelineLatency:
+    """
+    One histogram per pipeline stage, shared by every stage through the
+    InputReceiver (receiver.latency). Off by default: while `enabled` is
+    False the stages don't read the clock at all, they only check the flag.
+    Each histogram is written by a single thread (the one running its stage).
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.since = time.time()
+
+    def record(self, stage: str, ns: int):
+        self.histograms[stage].record(ns)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        self.since = time.time()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+    def report(self) -> str:
+        """Fixed-width table, one row per stage, in microseconds."""
+        lines = [f"{'stage':<16}{'count':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'max':>10}"]
+        for stage, row in self.summary().items():
+            lines.append(f"{stage:<16}{row['count']:>10,}{row['p50_us']:>10,.1f}{row['p90_us']:>10,.1f}"
+                         f"{row['p99_us']:>10,.1f}{row['p999_us']:>10,.1f}{row['max_us']:>10,.1f}")
+        return "\n".join(lines)
+
+    def dump(self, path: str):
+        """Writes the summaries and the raw (non-empty) buckets as JSON, for comparing runs."""
+        data = {
+            'since': self.since,
+            'written_at': time.time(),
+            'unit': "us",
+            'stages': self.summary(),
+            'buckets_ns': {stage: {bucket_upper(index): count for index, count in enumerate(h.counts) if count}
+                           for stage, h in self.histograms.items()},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
@@ -0,0 +1,68 @@
+from typing import List
+
+
+class LineSplitter:
+    """
+    Incremental line framing over raw bytes.
+
+    Data is appended to a bytearray and scanned from where the previous scan
+    stopped, so each byte is looked at once no matter how the stream is
+    chunked. Only complete lines are decoded, which means a UTF-8
+    character split across two packets is reassembled before decoding.
+    """
+
+    def __init__(self, max_buffer=64 * 1024, encoding='utf-8'):
+        self.max_buffer = max_buffer  # Longest partial line we hold before force-splitting it
+        self.encoding = encoding
+        self.overflows = 0
+
+        self._buf = bytearray()
+        self._scan = 0  # Everything before this offset is known to contain no newline
+
+    @property
+    def pending(self) -> bytes:
+        """The incomplete trailing line still waiting for its newline."""
+        return bytes(self._buf)
+
+    def reset(self):
+        self._buf.clear()
+        self._scan = 0
+
+    def feed(self, data) -> List[str]:
+        """Appends a chunk and returns every line it completed, without the line ending."""
+        buf = self._buf
+        buf += data
+
+        end = buf.rfind(b'\n', self._scan)
+        if end == -1:
+            lines = []
+        else:
+            # Decode every complete line in one go and split in C; a newline
+            # byte never occurs inside a multibyte UTF-8 sequence
+            lines = self._decode(buf, 0, end).split('\n')
+            # One compaction per feed keeps this linear, unlike re-slicing per line
+            del buf[:end + 1]
+
+        while len(buf) > self.max_buffer:
+            lines.append(self._force_split())
+
+        self._scan = len(buf)
+        return lines
+
+    def _decode(self, buf, start, end):
+        # Strip carriage returns: MUDs send \r\n, and some send a stray \r mid-line
+        return buf[start:end].decode(self.encoding, errors='replace').replace('\r', '')
+
+    def _force_split(self):
+        """Emits an over-long partial line, cutting on a UTF-8 character boundary."""
+        buf = self._buf
+        cut = self.max_buffer
+        # Back up over continuation bytes (0b10xxxxxx) so a character isn't split
+        while cut > 0 and (buf[cut] & 0xC0) == 0x80:
+            cut -= 1
+        if cut == 0:
+            cut = self.max_buffer
+        self.overflows += 1
+        line = self._decode(buf, 0, cut)
+        del buf[:cut]
+        return line
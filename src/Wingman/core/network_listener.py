@@ -1,62 +1,195 @@
+import struct
 import threading
-import re
-from scapy.all import sniff, IP, TCP
+import time
+from time import perf_counter_ns
+from scapy.all import sniff, IP, TCP, conf
 from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.ansi import strip_ansi
+from Wingman.core.latency import STAGE_DECODE
+from Wingman.core.capture import build_bpf_filter, parse_frame, CaptureStats, TcpSegment, DLT_EN10MB
+from Wingman.core.reassembly import TcpReassembler
+from Wingman.core.line_splitter import LineSplitter
+from Wingman.core.telnet import TelnetDecoder, GMCP, MSDP, parse_gmcp, parse_msdp
+
+# Linux-only: getsockopt(SOL_PACKET, PACKET_STATISTICS) returns (packets, drops) and resets them
+SOL_PACKET = 263
+PACKET_STATISTICS = 6
+
+STOP_POLL_SECONDS = 0.5  # Longest the raw capture loop waits for a frame before checking whether it was stopped
+
 
 class NetworkListener:
-    def __init__(self, input_receiver: InputReceiver):
+    def __init__(self, input_receiver: InputReceiver, capture_mode="raw", iface=None, stats_interval=60):
         self.receiver = input_receiver
         # Update this if your game server IP changes
         self.target_ip = '18.119.153.121'
         self.target_port = 4000
         self.is_running = False
 
-        # Persistent buffer to hold split packet data
-        self._buffer = ""
+        # "raw": BPF-filtered L2 socket + manual header slicing (no scapy dissection)
+        # "scapy": the original sniff() path, kept as a fallback
+        self.capture_mode = capture_mode
+        self.iface = iface
+        self.stats = CaptureStats()
+        self.stats_interval = stats_interval  # Seconds between console reports (None = off)
+
+        # Puts each server->client flow back in sequence order before line splitting
+        self.reassembler = TcpReassembler(on_data=self._on_stream_data, on_reset=self._on_stream_reset,
+                                          on_gap=self._on_stream_gap)
+
+        # Strips telnet negotiation from the stream; GMCP / MSDP payloads go to the receiver as events
+        self.telnet = TelnetDecoder(on_subnegotiation=self._on_subnegotiation)
+
+        # Persistent byte buffer to hold split packet data
+        self.splitter = LineSplitter()
 
     def remove_noise(self, message):
         """
-        Removes ANSI color codes.
+        Removes ANSI escape codes. The stream no longer needs this: the receiver strips every line once.
         """
-        return re.sub(r'\x1b\[\d+(?:;\d+)*m', '', message)
+        return strip_ansi(message)
+
+    def bpf_filter(self):
+        return build_bpf_filter(self.target_ip, self.target_port)
 
     def packet_callback(self, packet):
+        """Scapy path: receives fully dissected packets from sniff()."""
         if IP in packet and TCP in packet:
-            if packet[IP].src == self.target_ip and packet[TCP].sport == self.target_port:
-                if len(packet[TCP].payload) > 0:
-                    try:
-                        payload_bytes = bytes(packet[TCP].payload)
+            ip, tcp = packet[IP], packet[TCP]
+            if ip.src == self.target_ip and tcp.sport == self.target_port:
+                self.stats.handled += 1
+                self.handle_segment(ip.src, tcp.sport, ip.dst, tcp.dport,
+                                    tcp.seq, int(tcp.flags), bytes(tcp.payload))
+
+    def frame_callback(self, frame, linktype=DLT_EN10MB):
+        """Raw path: receives undissected link-layer frames."""
+        self.stats.received += 1
+        segment = parse_frame(frame, linktype)
+        if segment is None:
+            self.stats.ignored += 1
+            return
+        self.segment_callback(segment)
+
+    def segment_callback(self, segment: TcpSegment):
+        """Already-sliced segments (raw capture, pcap_reader). The payload may be a memoryview."""
+        if segment.sport != self.target_port or segment.src != self.target_ip:
+            self.stats.ignored += 1
+            return
+        self.stats.handled += 1
+        self.handle_segment(segment.src, segment.sport, segment.dst, segment.dport,
+                            segment.seq, segment.flags, segment.payload)
 
-                        # Decode and append to buffer immediately
-                        chunk = payload_bytes.decode('utf-8', errors='replace')
-                        self._buffer += chunk
+    def handle_segment(self, src, sport, dst, dport, seq, flags, payload):
+        """Runs a matched segment through reassembly; in-order data reaches handle_payload."""
+        latency = self.receiver.latency
+        if latency is not None and latency.enabled:
+            self.receiver.capture_ns = perf_counter_ns()  # Lines split from this segment count from now
+        self.reassembler.feed((src, sport, dst, dport), seq, flags, payload)
 
-                        # Process buffer: extract complete lines only
-                        while '\n' in self._buffer:
-                            # Split at the first newline
-                            line, self._buffer = self._buffer.split('\n', 1)
+    def _on_stream_data(self, _flow, chunk):
+        self.handle_payload(chunk)
 
-                            # Clean up carriage returns common in MUDs
-                            line = line.replace('\r', '')
+    def _on_stream_reset(self, _flow):
+        # A new (or torn down) connection: any half line belongs to the old stream
+        self.telnet.reset()
+        self.splitter.reset()
+        styler = self.receiver.styler  # Read once: the Tk thread may switch colour mode off meanwhile
+        if styler is not None:
+            styler.reset()
 
-                            # Remove color codes
-                            cleaned = self.remove_noise(line)
+    def _on_stream_gap(self, _flow):
+        # Bytes were lost: a half line or half-read telnet command before the hole doesn't go with what follows
+        self.telnet.resync()
+        self.splitter.reset()
+        styler = self.receiver.styler
+        if styler is not None:
+            styler.reset()
 
-                            # Send to app if it has content
-                            # Note: We use strip() to avoid sending blank lines,
-                            # but the regex in parser.py handles whitespace fine.
-                            if cleaned.strip():
-                                self.receiver.receive(cleaned)
+    def _on_subnegotiation(self, option, payload):
+        if option == GMCP:
+            self.receiver.receive_oob(parse_gmcp(payload))
+        elif option == MSDP:
+            for event in parse_msdp(payload):
+                self.receiver.receive_oob(event)
 
-                    except Exception as e:
-                        print(f"Error decoding packet: {e}")
+    def handle_payload(self, payload_bytes):
+        """Decodes a chunk of server payload and forwards every complete line."""
+        try:
+            # Telnet commands come out first; then only complete lines are
+            # decoded, so multibyte characters split across packets survive intact
+            # Colour codes are left in: receive() strips them (once) after raw capture has seen the line
+            receive = self.receiver.receive
+            latency = self.receiver.latency
+            if latency is not None and latency.enabled:
+                start = perf_counter_ns()
+                lines = self.splitter.feed(self.telnet.feed(payload_bytes))
+                latency.record(STAGE_DECODE, perf_counter_ns() - start)
+            else:
+                lines = self.splitter.feed(self.telnet.feed(payload_bytes))
+            for line in lines:
+                if line:
+                    receive(line)
+        except Exception as e:
+            print(f"Error decoding packet: {e}")
+
+    def get_capture_stats(self):
+        return self.stats.as_dict()
 
     def start(self):
         self.is_running = True
         print(f"Listening for traffic from {self.target_ip}:{self.target_port}...")
-        t = threading.Thread(target=self._sniff_thread, daemon=True)
+        t = threading.Thread(target=self._sniff_thread, name="NetworkListener", daemon=True)
         t.start()
 
+    def stop(self):
+        self.is_running = False
+
     def _sniff_thread(self):
+        if self.capture_mode == "raw":
+            try:
+                self._raw_capture_loop()
+                return
+            except Exception as e:
+                print(f"Raw capture unavailable ({e}), falling back to scapy sniff.")
+
         # store=0 prevents memory leaks from keeping packet history
-        sniff(prn=self.packet_callback, filter="tcp", store=0)
\ No newline at end of file
+        sniff(prn=self.packet_callback, filter=self.bpf_filter(), store=0,
+              iface=self.iface, stop_filter=lambda _: not self.is_running)
+
+    def _raw_capture_loop(self):
+        """
+        Reads frames straight off a BPF-filtered capture socket.
+        The kernel (or Npcap) does the host/port filtering, and we slice
+        the IP/TCP headers ourselves instead of building scapy layers.
+        """
+        sock = conf.L2listen(iface=self.iface, filter=self.bpf_filter())
+        linktypes = {}  # Layer class -> DLT number, looked up once per class
+        next_report = time.monotonic() + self.stats_interval if self.stats_interval else None
+        try:
+            while self.is_running:
+                # Wait with a timeout (select works for both Linux sockets and Npcap) so stop() takes effect
+                # even when no packets arrive
+                if sock.select([sock], STOP_POLL_SECONDS):
+                    layer, frame, _ts = sock.recv_raw()
+                    if frame is not None:
+                        linktype = linktypes.get(layer)
+                        if linktype is None:
+                            linktype = linktypes[layer] = conf.l2types.layer2num.get(layer, DLT_EN10MB)
+                        self.frame_callback(frame, linktype)
+
+                if next_report is not None and time.monotonic() >= next_report:
+                    self._poll_kernel_drops(sock)
+                    print(f"[Capture] {self.stats.interval_report()}")
+                    next_report = time.monotonic() + self.stats_interval
+        finally:
+            self._poll_kernel_drops(sock)
+            sock.close()
+
+    def _poll_kernel_drops(self, sock):
+        """Adds the kernel's drop counter to our stats, where the platform exposes it."""
+        try:
+            raw = sock.ins.getsockopt(SOL_PACKET, PACKET_STATISTICS, 8)
+            _packets, drops = struct.unpack("II", raw)
+            self.stats.kernel_dropped += drops
+        except (AttributeError, OSError, struct.error):
+            pass
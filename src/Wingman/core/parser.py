@@ -1,60 +1,201 @@
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from Wingman.core.registry import ParserRegistry
+from Wingman.core.group_history import parse_vital
 
+# --- Precompiled patterns (built once at import, not per call) ---
 
-def parse_xp_message(text_block: str) -> int:
-    """Parses text for XP gains."""
-    # Use finditer to find ALL occurrences in the block
-    xp_pattern = re.compile(r'You gain\s+(\d+)(?:\s+\(\+(\d+)\))?.*experience', re.IGNORECASE)
+XP_PATTERN = re.compile(r'You gain\s+(\d+)(?:\s+\(\+(\d+)\))?.*experience', re.IGNORECASE)
 
-    total_xp = 0
-    for match in xp_pattern.finditer(text_block):
-        base = int(match.group(1))
-        bonus = int(match.group(2)) if match.group(2) else 0
-        total_xp += (base + bonus)
+# Regex Breakdown:
+# 1. Capture Class and Level inside brackets: [Orc 40]
+# 2. Capture optional Status (if present)
+# 3. Capture Name
+# 4. Capture HP, Fat, Power (e.g. "227/ 394") ignoring the percentages
+GROUP_ROW_PATTERN = re.compile(
+    r"\[\s*(?P<cls>[A-Za-z]+)\s+(?P<lvl>\d+)\s*\]"  # [Class Lvl]
+    r"\s+"  # Space after bracket
+    r"(?P<status>(?:[BPDS]\s)*)"  # Status: Only B, P, D, S followed by space
+    r"(?P<name>.+?)"  # Name: Capture anything (lazy match)
+    r"\s+"  # Space before HP (anchors the name end)
+    r"(?P<hp>\d+/\s*\d+)"  # HP
+    r".*?"  # Skip percent
+    r"\s+(?P<fat>\d+/\s*\d+)"  # Fat
+    r".*?"  # Skip percent
+    r"\s+(?P<pwr>\d+/\s*\d+)",  # Power
+    re.DOTALL
+)
+
+# Timestamps may precede the name, so this isn't anchored to the start
+GROUP_HEADER_PATTERN = re.compile(r"(?P<leader>\S+)'s group:")
+
+# Combat / loot / magic lines. An optional "<10:00:00>" timestamp may lead the line.
+DEATH_PATTERN = re.compile(r"^(?:<[^>]*>\s*)?(?P<mob>.+?) dies!")
+DAMAGE_TAKEN_PATTERN = re.compile(r"^(?:<[^>]*>\s*)?(?P<source>.+?) attacks you for (?P<amount>\d+) damage")
+DAMAGE_DEALT_PATTERN = re.compile(r"You hit (?P<target>.+?) for (?P<amount>\d+) damage")
+LOOT_PATTERN = re.compile(r"You get (?P<item>.+?)(?: from (?P<source>.+?))?\.\s*$")
+SPELL_PATTERN = re.compile(r"You cast (?P<spell>.+?)(?: on (?P<target>.+?))?[.!]\s*$")
+
+# --- Event kinds emitted by the default registry ---
+LINE_GROUP_HEADER = "group_header"
+LINE_GROUP_ROW = "group_row"
+LINE_XP = "xp"
+LINE_DEATH = "death"
+LINE_DAMAGE_TAKEN = "damage_taken"
+LINE_DAMAGE_DEALT = "damage_dealt"
+LINE_LOOT = "loot"
+LINE_SPELL = "spell"
 
+
+def _xp_total(text: str, pos=0) -> int:
+    total_xp = 0
+    for match in XP_PATTERN.finditer(text, pos):
+        total_xp += _xp_from_match(match)
     return total_xp
 
 
-def parse_group_status(text_block: str) -> List[Dict[str, Any]]:
+def _xp_from_match(match) -> int:
+    base = int(match.group(1))
+    bonus = int(match.group(2)) if match.group(2) else 0
+    return base + bonus
+
+
+def _xp_event(match, line) -> Optional[int]:
+    # The registry already found the first gain; only look past it for more
+    return (_xp_from_match(match) + _xp_total(line, match.end())) or None
+
+
+def _group_row(line: str) -> Optional[Dict[str, Any]]:
+    match = GROUP_ROW_PATTERN.search(line)
+    return _group_row_from_match(match, line) if match else None
+
+
+def _group_row_from_match(match, _line) -> Optional[Dict[str, Any]]:
+    data = match.groupdict()
+
+    # Exclude pets/mobs immediately
+    if data['cls'].lower() == 'mob':
+        return None
+
+    data['status'] = data['status'].strip()
+    data['name'] = data['name'].strip()
+    # Numbers parsed once here, so nothing downstream re-parses "227/ 394"
+    data['vitals'] = parse_vital(data['hp']) + parse_vital(data['fat']) + parse_vital(data['pwr'])
+    return data
+
+
+def _damage(match, _line):
+    data = match.groupdict()
+    data['amount'] = int(data['amount'])
+    return data
+
+
+def build_default_registry(group_rows=True) -> ParserRegistry:
     """
-    Parses a text block for group member status.
-    Returns a list of dictionaries for valid rows found.
+    A registry with every built-in event parser. Callers (e.g. GameSession)
+    can register more on the returned instance. group_rows=False leaves
+    member rows to a GroupBlockParser, which only looks for them right
+    after a group header.
     """
-    members = []
+    registry = ParserRegistry()
+    registry.register(LINE_GROUP_HEADER, "'s group:", GROUP_HEADER_PATTERN, lambda m, _: m.group('leader'))
+    if group_rows:
+        registry.register(LINE_GROUP_ROW, "]", GROUP_ROW_PATTERN, _group_row_from_match)
+    # The XP pattern is case-insensitive; triggers always are
+    registry.register(LINE_XP, "experience", XP_PATTERN, _xp_event)
+    # Triggers deliberately don't end in a space so none can overlap another (see ParserRegistry)
+    registry.register(LINE_DEATH, " dies!", DEATH_PATTERN, lambda m, _: m.group('mob'))
+    registry.register(LINE_DAMAGE_TAKEN, " attacks you for", DAMAGE_TAKEN_PATTERN, _damage)
+    registry.register(LINE_DAMAGE_DEALT, "you hit", DAMAGE_DEALT_PATTERN, _damage)
+    registry.register(LINE_LOOT, "you get", LOOT_PATTERN)
+    registry.register(LINE_SPELL, "you cast", SPELL_PATTERN)
+    return registry
 
-    # Regex Breakdown:
-    # 1. Capture Class and Level inside brackets: [Orc 40]
-    # 2. Capture optional Status (if present)
-    # 3. Capture Name
-    # 4. Capture HP, Fat, Power (e.g. "227/ 394") ignoring the percentages
-
-    pattern = re.compile(
-        r"\[\s*(?P<cls>[A-Za-z]+)\s+(?P<lvl>\d+)\s*\]"  # [Class Lvl]
-        r"\s+"  # Space after bracket
-        r"(?P<status>(?:[BPDS]\s)*)"  # Status: Only B, P, D, S followed by space
-        r"(?P<name>.+?)"  # Name: Capture anything (lazy match)
-        r"\s+"  # Space before HP (anchors the name end)
-        r"(?P<hp>\d+/\s*\d+)"  # HP
-        r".*?"  # Skip percent
-        r"\s+(?P<fat>\d+/\s*\d+)"  # Fat
-        r".*?"  # Skip percent
-        r"\s+(?P<pwr>\d+/\s*\d+)",  # Power
-        re.DOTALL
-    )
 
-    for line in text_block.splitlines():
-        if "]" in line and "/" in line:
-            match = pattern.search(line)
+_CLASSIFIER = build_default_registry()
+
+
+class GroupBlockParser:
+    """
+    Streaming recogniser for one `group` listing:
+
+        Earthquack's group:                                  header (found by the registry)
+        [ Class   Lvl] Status  Name   Hits   Fat   Power     column titles (optional)
+        [Orc      40]  B       Earthquack  227/ 394 ...      one row per member
+
+    start() opens a block at the header; feed() takes the lines after it and
+    returns False at the first one that isn't part of the listing. Only then
+    does finish() hand over the whole group, so a listing split across
+    batches is never seen half-done. Outside a block nothing here runs, so
+    stray bracketed lines never reach GROUP_ROW_PATTERN.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.leader = None
+        self.rows: List[Dict[str, Any]] = []
+        self.last_line_at = 0.0  # When the block last got a line (for timing out a listing nothing follows)
+        self._seen_row = False
+
+    def start(self, leader: str, now: float):
+        self.active = True
+        self.leader = leader
+        self.rows = []
+        self.last_line_at = now
+        self._seen_row = False
+
+    def feed(self, line: str, now: float) -> bool:
+        """True if the line belongs to the open listing (and was consumed)."""
+        if not self._seen_row and "Lvl]" in line:
+            self.last_line_at = now
+            return True  # Column titles
+        if "/" in line and "[" in line:
+            match = GROUP_ROW_PATTERN.search(line)
             if match:
-                data = match.groupdict()
+                self._seen_row = True
+                self.last_line_at = now
+                member = _group_row_from_match(match, line)
+                if member is not None:  # Pets are part of the listing but not of the group
+                    self.rows.append(member)
+                return True
+        return False
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Closes the block and returns its members."""
+        self.active = False
+        rows, self.rows = self.rows, []
+        return rows
+
+
+def classify_line(line: str) -> Tuple[Optional[str], Any]:
+    """
+    Returns the first event found in a single line as (kind, value),
+    or (None, None) for noise. For the built-in kinds:
+      LINE_GROUP_HEADER -> group leader's name
+      LINE_GROUP_ROW    -> member dict (parse_group_status's, plus a 'vitals' tuple)
+      LINE_XP           -> XP gained (int)
+    """
+    for event in _CLASSIFIER.dispatch(line):
+        return event
+    return None, None
 
-                # NEW: Exclude pets/mobs immediately
-                if data['cls'].lower() == 'mob':
-                    continue
 
-                data['status'] = data['status'].strip()
-                data['name'] = data['name'].strip()
-                members.append(data)
+def parse_xp_message(text_block: str) -> int:
+    """Parses text for XP gains."""
+    # Use finditer to find ALL occurrences in the block
+    return _xp_total(text_block)
 
+
+def parse_group_status(text_block: str) -> List[Dict[str, Any]]:
+    """
+    Parses a text block for group member status.
+    Returns a list of dictionaries for valid rows found.
+    """
+    members = []
+    for line in text_block.splitlines():
+        if "]" in line and "/" in line:
+            member = _group_row(line)
+            if member is not None:
+                del member['vitals']  # Only the event path (classify_line, sessions) carries these
+                members.append(member)
     return members
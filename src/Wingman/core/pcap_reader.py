@@ -0,0 +1,143 @@
+import mmap
+import struct
+from typing import Iterator, Optional, Tuple
+from Wingman.core.capture import TcpSegment, parse_frame
+
+PCAPNG_SHB = 0x0A0D0D0A  # Section Header Block
+PCAPNG_IDB = 0x00000001  # Interface Description Block
+PCAPNG_SPB = 0x00000003  # Simple Packet Block
+PCAPNG_EPB = 0x00000006  # Enhanced Packet Block
+PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+IF_TSRESOL = 9  # IDB option: timestamp resolution
+
+# Classic pcap magic (as read little-endian) -> (byte order, seconds per timestamp fraction unit)
+_PCAP_MAGICS = {
+    0xA1B2C3D4: ("<", 1e-6),
+    0xD4C3B2A1: (">", 1e-6),
+    0xA1B23C4D: ("<", 1e-9),
+    0x4D3CB2A1: (">", 1e-9),
+}
+
+# (timestamp, linktype, frame)
+Frame = Tuple[float, int, memoryview]
+
+
+class PcapFormatError(ValueError):
+    pass
+
+
+def iter_frames(path) -> Iterator[Frame]:
+    """
+    Walks the record headers of a pcap or pcapng file through a memory map.
+    Frames are memoryviews into the map, so nothing is copied; they stay
+    valid for as long as the caller holds on to them.
+    """
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            return
+    try:
+        data = memoryview(mm)
+        if len(data) < 4:
+            return
+        if struct.unpack_from("<I", data, 0)[0] == PCAPNG_SHB:
+            yield from _iter_pcapng(data)
+        else:
+            yield from _iter_pcap(data)
+    finally:
+        data.release()
+        try:
+            mm.close()
+        except BufferError:
+            pass  # The caller still holds frames; the map closes when they're gone
+
+
+def _iter_pcap(data) -> Iterator[Frame]:
+    if len(data) < 24:
+        raise PcapFormatError("Truncated pcap header")
+    magic = struct.unpack_from("<I", data, 0)[0]
+    if magic not in _PCAP_MAGICS:
+        raise PcapFormatError(f"Not a pcap file (magic {magic:#010x})")
+    order, resolution = _PCAP_MAGICS[magic]
+    linktype = struct.unpack_from(order + "I", data, 20)[0] & 0x0FFFFFFF  # Upper bits hold FCS info
+
+    record = struct.Struct(order + "IIII").unpack_from
+    offset = 24
+    end = len(data)
+    while offset + 16 <= end:
+        sec, frac, incl_len, _orig_len = record(data, offset)
+        offset += 16
+        if offset + incl_len > end:
+            break  # Truncated final record (capture still being written)
+        yield sec + frac * resolution, linktype, data[offset:offset + incl_len]
+        offset += incl_len
+
+
+def _iter_pcapng(data) -> Iterator[Frame]:
+    order = "<"
+    interfaces = []  # (linktype, snaplen, seconds per timestamp unit) per interface id
+    offset = 0
+    end = len(data)
+    while offset + 12 <= end:
+        block_type = struct.unpack_from(order + "I", data, offset)[0]
+
+        if block_type == PCAPNG_SHB:
+            # Each section declares its own byte order and interface list
+            magic = struct.unpack_from("<I", data, offset + 8)[0]
+            order = "<" if magic == PCAPNG_BYTE_ORDER_MAGIC else ">"
+            interfaces = []
+
+        block_len = struct.unpack_from(order + "I", data, offset + 4)[0]
+        if block_len < 12 or offset + block_len > end:
+            break
+        body = offset + 8
+
+        if block_type == PCAPNG_EPB:
+            iface, ts_high, ts_low, cap_len, _orig_len = struct.unpack_from(order + "IIIII", data, body)
+            linktype, _snaplen, resolution = interfaces[iface]
+            start = body + 20
+            yield ((ts_high << 32) | ts_low) * resolution, linktype, data[start:start + cap_len]
+
+        elif block_type == PCAPNG_SPB:
+            linktype, snaplen, _resolution = interfaces[0]
+            orig_len = struct.unpack_from(order + "I", data, body)[0]
+            cap_len = min(orig_len, snaplen) if snaplen else orig_len
+            yield 0.0, linktype, data[body + 4:body + 4 + cap_len]
+
+        elif block_type == PCAPNG_IDB:
+            linktype, _reserved, snaplen = struct.unpack_from(order + "HHI", data, body)
+            resolution = _idb_resolution(data, body + 8, offset + block_len - 4, order)
+            interfaces.append((linktype, snaplen, resolution))
+
+        offset += block_len
+
+
+def _idb_resolution(data, offset, end, order) -> float:
+    """Reads if_tsresol from an IDB's options (default: microseconds)."""
+    while offset + 4 <= end:
+        code, length = struct.unpack_from(order + "HH", data, offset)
+        if code == 0:
+            break
+        if code == IF_TSRESOL and length >= 1:
+            value = data[offset + 4]
+            return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+        offset += 4 + ((length + 3) & ~3)
+    return 1e-6
+
+
+def iter_segments(path, server: Optional[str] = None, port: Optional[int] = None) -> Iterator[Tuple[float, TcpSegment]]:
+    """
+    Yields (timestamp, segment) for every TCP segment in the capture, or only
+    those sent from server:port when given. segment.payload is a memoryview
+    into the file; feed it to NetworkListener.segment_callback as-is.
+    """
+    for timestamp, linktype, frame in iter_frames(path):
+        segment = parse_frame(frame, linktype)
+        if segment is None:
+            continue
+        if port is not None and segment.sport != port:
+            continue
+        if server is not None and segment.src != server:
+            continue
+        yield timestamp, segment
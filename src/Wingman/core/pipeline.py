@@ -0,0 +1,225 @@
+import queue
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, NamedTuple, Optional, Tuple
+from Wingman.core.session import GameSession, format_duration
+from Wingman.core.latency import STAGE_PARSE
+
+# Lines parsed between snapshots / command checks, so a flood can't starve either
+BATCH_LINES = 5000
+
+# XP graph published with each snapshot: GRAPH_POINTS buckets of GRAPH_STEP seconds (10 minutes)
+GRAPH_STEP = 5
+GRAPH_POINTS = 120
+
+
+class SessionSnapshot(NamedTuple):
+    """Read-only view of a GameSession, published by the worker after each batch."""
+    taken_at: float  # session.clock() when the snapshot was taken
+    total_xp: int
+    active_seconds: float  # Active (unpaused) time as of taken_at
+    paused: bool
+    group: Tuple[Mapping[str, Any], ...]
+    group_version: int
+    event_counts: Mapping[str, int]
+    lines_processed: int
+    rolling_rates: Mapping[float, int]  # {window seconds: XP/hr} as of taken_at
+    graph_step: int  # Seconds per graph bucket
+    graph_end: int  # Absolute index (active seconds // graph_step) of the newest bucket
+    graph: Tuple[int, ...]  # XP per bucket, oldest first; the last one is still filling
+    oob: Mapping[str, Any]  # Latest GMCP / MSDP payload per package or variable name
+    # --- Pipeline counters ---
+    queue_depth: int  # Lines waiting in the InputReceiver
+    lines_dropped: int  # Lines the InputReceiver had to drop (queue full)
+    batches: int
+    parse_seconds: float  # Total time spent in process_queue
+    last_batch_seconds: float  # Time the most recent batch took
+    # perf_counter_ns() when the oldest line parsed for this snapshot reached the listener
+    # (only while latency timing is on; None otherwise)
+    capture_ns: Optional[int]
+
+    def active_at(self, now: float) -> float:
+        """Active time at `now`, extrapolated from the snapshot (frozen while paused)."""
+        if self.paused:
+            return self.active_seconds
+        return max(0.0, self.active_seconds + now - self.taken_at)
+
+    def xp_per_hour_at(self, now: float) -> int:
+        # Same rules as GameSession.get_xp_per_hour
+        elapsed = self.active_at(now)
+        if self.total_xp == 0 or elapsed < 1:
+            return 0
+        return int(self.total_xp / (elapsed / 3600))
+
+    def duration_str_at(self, now: float) -> str:
+        return format_duration(self.active_at(now))
+
+
+class ProcessingWorker:
+    """
+    Owns a GameSession on a background thread.
+
+    The worker drains the InputReceiver and runs the parsers; other threads
+    never touch the session directly. They read the latest SessionSnapshot
+    (an immutable object swapped in with one assignment) and send changes
+    (pause, reset, ...) through submit(), which the worker runs between batches.
+
+    on_snapshot runs on the worker thread after a new snapshot is published,
+    at most once until the reader calls snapshot() again, so a slow GUI gets
+    one wakeup per frame rather than one per batch.
+    """
+
+    def __init__(self, session: GameSession, on_snapshot: Optional[Callable[[], None]] = None,
+                 batch_lines=BATCH_LINES):
+        self.session = session
+        self.on_snapshot = on_snapshot
+        self.batch_lines = batch_lines
+        self.holding = False  # True while paused: lines stay queued until resume()
+        self.graph_step = GRAPH_STEP
+        self.graph_points = GRAPH_POINTS
+
+        # --- Counters ---
+        self.batches = 0
+        self.parse_seconds = 0.0
+        self.last_batch_seconds = 0.0
+
+        self._wake = threading.Event()
+        self._commands = queue.SimpleQueue()
+        self._running = False
+        self._thread = None
+        self._notify_armed = True
+        self._group_cache = (None, ())  # (group_version, frozen group) so unchanged groups aren't copied
+
+        self._snapshot = self._take_snapshot()
+        # The sniffer only sets an Event: it never waits on parsing or the GUI
+        session.receiver.on_new_line_callback = self._wake.set
+
+    # --- Reader side (GUI, exporters) ---
+    def snapshot(self) -> SessionSnapshot:
+        self._notify_armed = True
+        return self._snapshot
+
+    def peek(self) -> SessionSnapshot:
+        """The latest snapshot, without re-arming on_snapshot (for readers that aren't the GUI)."""
+        return self._snapshot
+
+    def submit(self, func: Callable, *args):
+        """Runs func(*args) on the worker thread before the next batch."""
+        self._commands.put((func, args))
+        self._wake.set()
+
+    def pause(self):
+        self.submit(self._set_holding, True)
+
+    def resume(self):
+        self.submit(self._set_holding, False)
+
+    def reset(self):
+        self.submit(self.session.reset)
+
+    def set_graph(self, step: int, points: int = GRAPH_POINTS):
+        """Changes the span snapshots' graph covers (step * points seconds)."""
+        self.submit(self._set_graph, step, points)
+
+    def refresh(self):
+        """Asks for a new snapshot even if no lines arrive (e.g. so rolling rates decay while idle)."""
+        self._wake.set()
+
+    # --- Lifecycle ---
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="ProcessingWorker", daemon=True)
+        self._thread.start()
+        self._wake.set()  # Lines may have arrived before we hooked the receiver
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stops the thread; queued commands still run, queued lines are left for the next owner."""
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # --- Worker thread ---
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self._run_commands()
+            if not self._running:
+                return
+            self.step()
+            if not self.holding and self.session.receiver.depth:
+                self._wake.set()  # More than one batch queued: loop again (commands get a look-in first)
+
+    def step(self):
+        """One batch: parse up to batch_lines queued lines, then publish. Also usable without the thread."""
+        if not self.holding:
+            start = time.perf_counter_ns()
+            self.session.process_queue(self.batch_lines)
+            elapsed = time.perf_counter_ns() - start
+            self.last_batch_seconds = elapsed / 1e9
+            self.parse_seconds += self.last_batch_seconds
+            self.batches += 1
+            latency = self.session.receiver.latency
+            if latency is not None and latency.enabled:
+                latency.record(STAGE_PARSE, elapsed)
+        self._publish()
+
+    def _run_commands(self):
+        while True:
+            try:
+                func, args = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            func(*args)
+
+    def _set_holding(self, holding):
+        self.holding = holding
+        if holding:
+            self.session.pause_clock()
+        else:
+            self.session.resume_clock()
+
+    def _set_graph(self, step, points):
+        self.graph_step = step
+        self.graph_points = points
+
+    def _publish(self):
+        self._snapshot = self._take_snapshot()
+        if self._notify_armed and self.on_snapshot is not None:
+            self._notify_armed = False
+            self.on_snapshot()
+
+    def _take_snapshot(self) -> SessionSnapshot:
+        session = self.session
+        version = session.group_version
+        if self._group_cache[0] != version:
+            history = session.group_history
+            group = tuple(MappingProxyType(dict(m, trend=history.trend(m['name'])))
+                          for m in session.latest_group_data)
+            self._group_cache = (version, group)
+        graph_end, graph = session.get_xp_series(self.graph_step, self.graph_points)
+        return SessionSnapshot(
+            taken_at=session.clock(),
+            total_xp=session.total_xp,
+            active_seconds=session.get_active_duration(),
+            paused=session.pause_start_time is not None,
+            group=self._group_cache[1],
+            group_version=version,
+            event_counts=MappingProxyType(dict(session.event_counts)),
+            lines_processed=session.lines_processed,
+            rolling_rates=MappingProxyType(session.get_rolling_xp_per_hour()),
+            graph_step=self.graph_step,
+            graph_end=graph_end,
+            graph=tuple(graph),
+            oob=MappingProxyType(dict(session.oob_latest)),
+            queue_depth=session.receiver.depth,
+            lines_dropped=session.receiver.dropped,
+            batches=self.batches,
+            parse_seconds=self.parse_seconds,
+            last_batch_seconds=self.last_batch_seconds,
+            capture_ns=session.receiver.oldest_capture_ns,
+        )
@@ -0,0 +1,153 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional, Tuple
+
+DEFAULT_INTERVAL = 0.005  # Seconds between samples (200 Hz)
+DEFAULT_DURATION = 60.0  # A forgotten profiler stops itself after this long
+MAX_DEPTH = 200  # Frames kept per stack (from the leaf up); deeper recursion is cut off
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+def frame_label(code) -> str:
+    """e.g. "receive (input_receiver.py:78)": the function's first line, so all its samples merge."""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for every thread in the process (sniffer, Tk,
+    processing worker, exporter...). A thread of its own wakes every
+    `interval`, reads all the other threads' stacks with sys._current_frames()
+    and counts each distinct stack. The profiled code is never instrumented,
+    and nothing exists at all until start(), so there's no cost while it's off.
+
+    Stops after `duration` seconds (or on stop()), writes the samples as
+    <prefix>.collapsed (Brendan Gregg's folded stacks, for flamegraph.pl and
+    most flame graph viewers) and <prefix>.speedscope.json (speedscope.app),
+    then calls on_finish(paths) on the profiler thread. on_finish is called
+    even if writing fails: paths is None then, and `error` says why.
+    """
+
+    def __init__(self, directory=".", prefix="wingman_profile", interval=DEFAULT_INTERVAL,
+                 duration=DEFAULT_DURATION, on_finish: Optional[Callable[[Optional[Tuple[str, str]]], None]] = None):
+        self.directory = directory
+        self.prefix = prefix
+        self.interval = interval
+        self.duration = duration
+        self.on_finish = on_finish
+
+        # (thread name, code objects root -> leaf) -> times seen
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.elapsed = 0.0
+        self.paths = None  # (collapsed, speedscope) once written
+        self.error: Optional[Exception] = None  # Why they couldn't be
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # --- Lifecycle ---
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Ends the window early and waits (up to timeout) for the files; timeout=0 just asks."""
+        self._stop.set()
+        if timeout and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    # --- Profiler thread ---
+    def _run(self):
+        self.started_at = time.time()
+        start = time.perf_counter()
+        deadline = start + self.duration
+        while not self._stop.is_set() and time.perf_counter() < deadline:
+            self.sample()
+            self._stop.wait(self.interval)
+        self.elapsed = time.perf_counter() - start
+        try:
+            self.paths = self.write()
+        except Exception as e:  # Disk full, no permission...: the caller still has to hear we're done
+            self.error = e
+        finally:
+            if self.on_finish is not None:
+                self.on_finish(self.paths)
+
+    def sample(self):
+        """Records one stack per thread (except our own)."""
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = self.stacks
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            codes = []
+            while frame is not None and len(codes) < MAX_DEPTH:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            codes.reverse()
+            stacks[(names.get(ident, f"thread-{ident}"), tuple(codes))] += 1
+        self.samples += 1
+
+    # --- Output ---
+    def collapsed(self) -> str:
+        """One "thread;outer;...;inner count" line per distinct stack."""
+        labels: Dict[object, str] = {}
+        lines = []
+        for (thread, codes), count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+            frames = [labels.get(code) or labels.setdefault(code, frame_label(code)) for code in codes]
+            lines.append(";".join([thread.replace(";", ":"), *frames]) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict:
+        """The samples in speedscope's file format: one sampled profile per thread, weights in seconds."""
+        # The time a sample stands for: what we got, which under load is more than we asked for
+        period = self.elapsed / self.samples if self.samples and self.elapsed else self.interval
+        frame_index: Dict[object, int] = {}
+        frames = []
+        profiles: Dict[str, dict] = {}
+        for (thread, codes), count in self.stacks.items():
+            stack = []
+            for code in codes:
+                index = frame_index.get(code)
+                if index is None:
+                    index = frame_index[code] = len(frames)
+                    frames.append({'name': code.co_name, 'file': code.co_filename, 'line': code.co_firstlineno})
+                stack.append(index)
+            profile = profiles.get(thread)
+            if profile is None:
+                profile = profiles[thread] = {'type': "sampled", 'name': thread, 'unit': "seconds",
+                                              'startValue': 0, 'endValue': 0, 'samples': [], 'weights': []}
+            profile['samples'].append(stack)
+            profile['weights'].append(round(count * period, 6))
+            profile['endValue'] = round(profile['endValue'] + count * period, 6)
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': f"Wingman {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at or time.time()))}",
+            'exporter': "Wingman",
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': sorted(profiles.values(), key=lambda p: -p['endValue']),  # Busiest thread first
+        }
+
+    def write(self) -> Tuple[str, str]:
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at or time.time()))
+        base = os.path.join(self.directory, f"{self.prefix}-{stamp}")
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        with open(base + ".speedscope.json", "w", encoding="utf-8") as f:
+            json.dump(self.speedscope(), f)
+        return base + ".collapsed", base + ".speedscope.json"
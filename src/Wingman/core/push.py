@@ -0,0 +1,310 @@
+import asyncio
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+from Wingman.core.journal import REC_GROUP
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PUSH_PORT = 9406
+
+MAX_PENDING = 256  # Messages queued per subscriber; past that the oldest are dropped
+STALL_TIMEOUT = 5.0  # A subscriber that has been dropping messages this long is disconnected
+MAX_INBOX = 10_000  # Events waiting for the event loop, should it ever fall behind
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_OP_TEXT, _OP_CLOSE, _OP_PING, _OP_PONG = 0x1, 0x8, 0x9, 0xA
+
+
+# --- Encoding ---
+
+def encode_event(kind: str, timestamp: float, total_xp: int, fields: tuple) -> bytes:
+    """
+    Compact JSON array: [kind, timestamp, total XP, *fields], e.g.
+    ["xp",1718000000.5,1250,150] or ["pause",1718000100.0,1250].
+    Every message carries the running total, so a client that missed some
+    (dropped as too slow) is still right. Group members are rows of
+    [name, cls, lvl, status, hp, hp_max, fat, fat_max, pwr, pwr_max].
+    """
+    if kind == REC_GROUP:
+        fields = ([_member_row(member) for member in fields[0]],)
+    return json.dumps([kind, round(timestamp, 3), total_xp, *fields], separators=(',', ':')).encode()
+
+
+def _member_row(member):
+    vitals = member.get('vitals')
+    return [member['name'], member['cls'], int(member['lvl']), member['status'], *(vitals or ())]
+
+
+def websocket_accept(key: str) -> str:
+    """Sec-WebSocket-Accept for a client's Sec-WebSocket-Key (RFC 6455)."""
+    return base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+
+
+def websocket_frame(payload: bytes, opcode=_OP_TEXT) -> bytes:
+    """One unmasked (server-to-client) frame."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def read_websocket_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """(opcode, payload) of the next frame, masked or not."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack("!Q", await reader.readexactly(8))
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask is not None:
+        payload = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+    return first & 0x0F, payload
+
+
+# --- Subscribers ---
+
+class Subscriber:
+    """
+    One connected client: its own bounded queue and its own writer task,
+    so a slow reader only ever delays itself. When the queue is full the
+    oldest message is dropped (the client gets a thinned-out feed); if it
+    stays full for STALL_TIMEOUT the client is disconnected.
+    """
+    __slots__ = ('writer', 'peer', 'pending', 'ready', 'max_pending', 'stall_timeout', 'overflowing_since',
+                 'sent', 'dropped')
+
+    def __init__(self, writer, max_pending=MAX_PENDING, stall_timeout=STALL_TIMEOUT):
+        self.writer = writer
+        self.peer = writer.get_extra_info('peername') if writer is not None else None
+        self.pending = deque()
+        self.ready = asyncio.Event()
+        self.max_pending = max_pending
+        self.stall_timeout = stall_timeout
+        self.overflowing_since = None
+        self.sent = 0
+        self.dropped = 0
+
+    def offer(self, frame: bytes, now: float) -> bool:
+        """Queues a frame. False if the subscriber has been stuck too long and should be dropped."""
+        pending = self.pending
+        if len(pending) >= self.max_pending:
+            pending.popleft()
+            self.dropped += 1
+            if self.overflowing_since is None:
+                self.overflowing_since = now
+            elif now - self.overflowing_since >= self.stall_timeout:
+                return False
+        else:
+            self.overflowing_since = None
+        pending.append(frame)
+        self.ready.set()
+        return True
+
+    async def run_writer(self):
+        writer = self.writer
+        pending = self.pending
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            while pending:
+                writer.write(pending.popleft())
+                self.sent += 1
+                await writer.drain()  # Waits on this client's socket only
+
+
+# --- Publisher ---
+
+class EventPublisher:
+    """
+    Pushes the session's events (XP gains, group listings, pause/resume) to
+    local subscribers: WebSocket clients on ws://host:port/ and, optionally,
+    a UDP target (e.g. a multicast group) that gets one datagram per event.
+
+    publish() is called on the processing worker's thread and only appends
+    to a deque (waking the event loop once per burst); encoding, framing and
+    sending all happen on the publisher's own asyncio thread, once per event
+    however many subscribers there are.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port: Optional[int] = DEFAULT_PUSH_PORT,
+                 udp_target: Optional[Tuple[str, int]] = None, max_pending=MAX_PENDING,
+                 stall_timeout=STALL_TIMEOUT, clock=time.monotonic):
+        self.host = host
+        self.port = port  # None: no WebSocket server (UDP only)
+        self.udp_target = udp_target
+        self.max_pending = max_pending
+        self.stall_timeout = stall_timeout
+        self.clock = clock
+
+        self.subscribers = set()
+        self._inbox = deque(maxlen=MAX_INBOX)
+        self._wake_armed = True
+        self._last_group = None  # Frame of the newest group listing, for clients that connect later
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._udp = None
+        self._started = threading.Event()
+        self._error: Optional[Exception] = None  # Why _open() failed, for start() to raise
+
+        # --- Counters ---
+        self.published = 0
+        self.disconnected = 0
+        self.udp_sent = 0
+
+    # --- Any thread ---
+    def publish(self, kind: str, timestamp: float, total_xp: int, *fields):
+        loop = self._loop
+        if loop is None:
+            return
+        self._inbox.append((kind, timestamp, total_xp, fields))
+        if self._wake_armed:
+            self._wake_armed = False
+            try:
+                loop.call_soon_threadsafe(self._dispatch)
+            except RuntimeError:
+                pass  # Loop closed: we're stopping
+
+    @property
+    def address(self):
+        """(host, port) the WebSocket server actually bound (port 0 picks a free one)."""
+        if self._server is not None:
+            return self._server.sockets[0].getsockname()[:2]
+        return self.host, self.port
+
+    def start(self):
+        """Returns once the server is listening; raises what opening it raised (e.g. OSError: port in use)."""
+        self._error = None
+        self._started.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="EventPublisher", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._error
+        return self
+
+    def stop(self, timeout=5.0):
+        loop = self._loop
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout)
+        self._loop = None
+        self._thread = None
+
+    # --- Event loop thread ---
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            try:
+                loop.run_until_complete(self._open())
+            except Exception as e:  # Port in use, unknown host...: hand it to start() instead of dying here
+                self._error = e
+                loop.run_until_complete(self._shutdown())
+                return
+            self._loop = loop
+            self._started.set()
+            loop.run_forever()
+        finally:
+            self._started.set()  # Don't leave start() waiting if opening failed
+            loop.close()
+
+    async def _open(self):
+        if self.port is not None:
+            self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        if self.udp_target is not None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)  # Multicast stays on this network
+            self._udp, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                asyncio.DatagramProtocol, sock=sock)
+
+    async def _shutdown(self):
+        if self._server is not None:
+            self._server.close()
+        for subscriber in list(self.subscribers):
+            subscriber.writer.close()
+        self.subscribers.clear()
+        if self._udp is not None:
+            self._udp.close()
+
+    def _dispatch(self):
+        self._wake_armed = True  # Re-arm first: an event published while we work must wake us again
+        inbox = self._inbox
+        now = self.clock()
+        while inbox:
+            kind, timestamp, total_xp, fields = inbox.popleft()
+            message = encode_event(kind, timestamp, total_xp, fields)
+            self.published += 1
+            if self._udp is not None:
+                self._udp.sendto(message, self.udp_target)
+                self.udp_sent += 1
+            frame = websocket_frame(message)
+            if kind == REC_GROUP:
+                self._last_group = frame
+            for subscriber in list(self.subscribers):
+                if not subscriber.offer(frame, now):
+                    self._drop(subscriber)
+
+    def _drop(self, subscriber):
+        self.subscribers.discard(subscriber)
+        self.disconnected += 1
+        subscriber.writer.transport.abort()  # Don't wait for a client that isn't reading
+
+    async def _handle_client(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5.0)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        headers = {}
+        for line in request.decode('latin-1').split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get('sec-websocket-key')
+        if key is None or 'websocket' not in headers.get('upgrade', '').lower():
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            writer.close()
+            return
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {websocket_accept(key)}\r\n\r\n").encode())
+
+        subscriber = Subscriber(writer, self.max_pending, self.stall_timeout)
+        if self._last_group is not None:
+            subscriber.offer(self._last_group, self.clock())
+        self.subscribers.add(subscriber)
+        sender = asyncio.ensure_future(subscriber.run_writer())
+        try:
+            await self._read_client(reader, subscriber)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            sender.cancel()
+            self.subscribers.discard(subscriber)
+            writer.close()
+
+    async def _read_client(self, reader, subscriber):
+        """Clients only talk to say ping or goodbye; anything else is ignored."""
+        while True:
+            opcode, payload = await read_websocket_frame(reader)
+            if opcode == _OP_CLOSE:
+                subscriber.pending.clear()
+                subscriber.writer.write(websocket_frame(payload[:2], _OP_CLOSE))
+                return
+            if opcode == _OP_PING:
+                subscriber.writer.write(websocket_frame(payload, _OP_PONG))
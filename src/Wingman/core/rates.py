@@ -0,0 +1,85 @@
+from typing import Dict, Iterable
+
+# Default rolling windows, in seconds: 5 min, 15 min, 1 h
+DEFAULT_WINDOWS = (300, 900, 3600)
+
+
+def window_label(seconds) -> str:
+    """300 -> '5m', 3600 -> '1h'."""
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+
+class RollingRate:
+    """
+    XP/hr over the last `window` seconds, kept in a ring of fixed-width buckets.
+
+    Times are on the session's active-time axis (get_active_duration()), so
+    pauses simply don't exist as far as the window is concerned. Adding and
+    querying touch one bucket plus any that expired since the last call, at
+    most `buckets` of them, so both are O(1) and memory never grows.
+    """
+    __slots__ = ('window', 'width', '_buckets', '_head', '_sum')
+
+    def __init__(self, window: float, buckets: int = 60):
+        self.window = window
+        self.width = window / buckets
+        self._buckets = [0] * buckets
+        self._head = 0  # Absolute index (time // width) of the newest bucket
+        self._sum = 0
+
+    def _advance(self, t: float):
+        index = int(t // self.width)
+        gap = index - self._head
+        if gap <= 0:
+            return
+        buckets = self._buckets
+        size = len(buckets)
+        if gap >= size:
+            buckets[:] = [0] * size
+            self._sum = 0
+        else:
+            for i in range(self._head + 1, index + 1):
+                slot = i % size
+                self._sum -= buckets[slot]
+                buckets[slot] = 0
+        self._head = index
+
+    def add(self, amount: int, t: float):
+        self._advance(t)
+        index = int(t // self.width)
+        size = len(self._buckets)
+        if self._head - index >= size:
+            return  # Older than the whole window
+        self._buckets[index % size] += amount
+        self._sum += amount
+
+    def total(self, t: float) -> int:
+        """XP gained in the window ending at t."""
+        self._advance(t)
+        return self._sum
+
+    def per_hour(self, t: float) -> int:
+        self._advance(t)
+        # Time actually covered: the full buckets behind the newest, plus the newest one so far
+        covered = min(t, (len(self._buckets) - 1) * self.width + (t - self._head * self.width))
+        if self._sum == 0 or covered < 1:
+            return 0
+        return int(self._sum * 3600 / covered)
+
+
+class RollingRates:
+    """One RollingRate per window, fed together."""
+
+    def __init__(self, windows: Iterable[float] = DEFAULT_WINDOWS, buckets: int = 60):
+        self.rates = {window: RollingRate(window, buckets) for window in windows}
+
+    def add(self, amount: int, t: float):
+        for rate in self.rates.values():
+            rate.add(amount, t)
+
+    def per_hour(self, t: float) -> Dict[float, int]:
+        return {window: rate.per_hour(t) for window, rate in self.rates.items()}
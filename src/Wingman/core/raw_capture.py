@@ -0,0 +1,159 @@
+import gzip
+import os
+import queue
+import threading
+from typing import Optional
+
+_STOP = object()
+
+
+class RawLineCapture:
+    """
+    Saves the raw line stream to rotating (optionally gzip-compressed) files.
+
+    put() only enqueues, so the sniffer thread never waits on disk; a
+    background thread does all the writing. If the writer falls more than
+    max_queue lines behind, new lines are counted in `dropped` and discarded
+    rather than blocking. If writing fails (disk full, no permission), the
+    capture stops: the error is printed and kept in `error`, and put()
+    discards every line after it.
+    """
+
+    def __init__(self, directory=".", prefix="wingman_raw", max_bytes=10 * 1024 * 1024, backups=5,
+                 compress=False, max_queue=100_000):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes  # Uncompressed bytes per file before rotating
+        self.backups = backups
+        self.compress = compress
+        self.max_queue = max_queue
+
+        self.written = 0
+        self.dropped = 0
+        self.error: Optional[OSError] = None  # Why the writer stopped early
+
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._file_bytes = 0
+        self._thread = threading.Thread(target=self._run, name="RawLineCapture", daemon=True)
+
+    # --- Producer side (sniffer thread) ---
+    def put(self, line):
+        if self.error is not None or self._queue.qsize() >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.put(line)
+
+    # --- Lifecycle ---
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread.start()
+        return self
+
+    def close(self, timeout=5.0):
+        """Writes out everything queued so far, then stops the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    # --- Writer thread ---
+    def path_for(self, index=0):
+        suffix = ".log.gz" if self.compress else ".log"
+        name = self.prefix + (f".{index}" if index else "") + suffix
+        return os.path.join(self.directory, name)
+
+    def _open(self):
+        path = self.path_for()
+        if self.compress:
+            self._file = gzip.open(path, 'at', encoding='utf-8')
+        else:
+            self._file = open(path, 'a', encoding='utf-8', buffering=1 << 16)
+        self._file_bytes = self._existing_bytes(path)
+
+    def _existing_bytes(self, path):
+        """Uncompressed size of a file we're appending to, so rotation still happens after a restart."""
+        if not os.path.exists(path):
+            return 0
+        if not self.compress:
+            return os.path.getsize(path)
+        size = 0
+        try:
+            with gzip.open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(1 << 20)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+        except (OSError, EOFError):
+            # Truncated by a crash: at least count what's on disk
+            size = max(size, os.path.getsize(path))
+        return size
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        # The oldest backup goes, then wingman_raw.4.log -> .5, ..., wingman_raw.log -> .1
+        oldest = self.path_for(self.backups)
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for index in range(self.backups - 1, -1, -1):
+            src = self.path_for(index)
+            if os.path.exists(src):
+                os.replace(src, self.path_for(index + 1))
+
+    def _run(self):
+        get = self._queue.get
+        while True:
+            # Block for the first line, then take whatever else is already waiting
+            batch = [get()]
+            try:
+                while len(batch) < 4096:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            # close() puts one _STOP, but put() can still race in lines after it
+            stop = _STOP in batch
+            if stop:
+                batch = [line for line in batch if line is not _STOP]
+            try:
+                if batch:
+                    self._write(batch)
+                if stop:
+                    if self._file is not None:
+                        self._file.close()
+                        self._file = None
+                    return
+                if self._file is not None:
+                    self._file.flush()
+            except OSError as e:
+                self._fail(e, len(batch))
+                return
+
+    def _fail(self, error, lost):
+        self.error = error
+        self.dropped += lost
+        print(f"Raw capture stopped, could not write to {self.directory}: {error}")
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass  # Same disk, same problem
+            self._file = None
+        # Nothing more will be written: let go of what's still queued
+        try:
+            while True:
+                if self._queue.get_nowait() is not _STOP:
+                    self.dropped += 1
+        except queue.Empty:
+            pass
+
+    def _write(self, lines):
+        if self._file is None:
+            self._open()
+        text = "\n".join(lines) + "\n"
+        self._file.write(text)
+        self.written += len(lines)
+        self._file_bytes += len(text.encode('utf-8'))
+        if self._file_bytes >= self.max_bytes:
+            self._rotate()
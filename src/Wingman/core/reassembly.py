@@ -0,0 +1,216 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+from Wingman.core.capture import TCP_FIN, TCP_SYN, TCP_RST
+
+# (src, sport, dst, dport)
+FlowKey = Tuple[str, int, str, int]
+
+_SEQ_MASK = 0xFFFFFFFF
+_SEQ_HALF = 0x80000000
+
+
+def seq_delta(seq: int, base: int) -> int:
+    """Signed distance from base to seq in 32-bit wrapping sequence space."""
+    delta = (seq - base) & _SEQ_MASK
+    return delta - 0x100000000 if delta >= _SEQ_HALF else delta
+
+
+class StreamReassembler:
+    """
+    Rebuilds the in-order byte stream of a single TCP flow.
+    Retransmits and duplicates are trimmed/dropped, out-of-order segments are
+    held (up to max_pending) until the gap before them is filled.
+    """
+
+    def __init__(self, max_pending=64):
+        self.max_pending = max_pending
+        self.isn: Optional[int] = None
+        self.next_seq: Optional[int] = None  # None until we sync on a SYN or the first data segment
+        self.fin_seq: Optional[int] = None
+        self._pending: Dict[int, bytes] = {}  # seq -> payload, for segments ahead of next_seq
+
+        # --- Counters ---
+        self.delivered_bytes = 0
+        self.duplicates = 0
+        self.out_of_order = 0
+        self.gaps = 0  # Times we gave up waiting and skipped missing bytes
+
+    @property
+    def finished(self):
+        return self.fin_seq is not None and self.next_seq == self.fin_seq
+
+    def sync(self, isn: int):
+        """Restarts the stream at a new initial sequence number (SYN seen)."""
+        self.isn = isn
+        self.next_seq = (isn + 1) & _SEQ_MASK
+        self.fin_seq = None
+        self._pending.clear()
+
+    def feed(self, seq: int, payload: bytes, on_data: Callable[[bytes], None], fin=False):
+        """Accepts one segment and calls on_data for every newly in-order chunk."""
+        if fin:
+            self.fin_seq = (seq + len(payload)) & _SEQ_MASK
+
+        if not payload:
+            return
+        if self.next_seq is None:
+            # We attached mid-stream (no SYN seen): trust the first segment
+            self.next_seq = seq
+
+        delta = seq_delta(seq, self.next_seq)
+        if delta < 0:
+            # Starts before what we've already delivered: retransmit or overlap
+            if -delta >= len(payload):
+                self.duplicates += 1
+                return
+            payload = payload[-delta:]
+            delta = 0
+
+        if delta > 0:
+            self._hold(seq, payload)
+            return
+
+        self._deliver(payload, on_data)
+        self._drain(on_data)
+
+    def _deliver(self, payload, on_data):
+        self.next_seq = (self.next_seq + len(payload)) & _SEQ_MASK
+        self.delivered_bytes += len(payload)
+        on_data(payload)
+
+    def _hold(self, seq, payload):
+        existing = self._pending.get(seq)
+        if existing is not None and len(existing) >= len(payload):
+            self.duplicates += 1
+            return
+        self.out_of_order += 1
+        # Copy: the payload may be a view into a capture buffer that gets reused
+        self._pending[seq] = bytes(payload)
+
+    def _drain(self, on_data):
+        """Delivers held segments that have become contiguous."""
+        pending = self._pending
+        while pending:
+            payload = pending.pop(self.next_seq, None)
+            if payload is None:
+                # No exact match: look for a held segment that overlaps next_seq
+                for seq in list(pending):
+                    delta = seq_delta(seq, self.next_seq)
+                    if delta < 0:
+                        held = pending.pop(seq)
+                        if -delta < len(held):
+                            payload = held[-delta:]
+                            break
+                        self.duplicates += 1
+                if payload is None:
+                    break
+            self._deliver(payload, on_data)
+
+    def skip_gap_if_full(self, on_data, on_gap: Optional[Callable[[], None]] = None):
+        """
+        Bounds memory: if too many segments are waiting on a hole that never
+        gets filled (lost packet), jump over the hole and carry on.
+        on_gap() runs before anything after the hole is delivered.
+        """
+        if len(self._pending) <= self.max_pending:
+            return
+        self.gaps += 1
+        self.next_seq = min(self._pending, key=lambda s: seq_delta(s, self.next_seq))
+        if on_gap is not None:
+            on_gap()
+        self._drain(on_data)
+
+
+class TcpReassembler:
+    """
+    Per-flow reassembly keyed by the TCP 4-tuple.
+    on_data(key, chunk) receives the in-order stream, on_reset(key) fires
+    when a flow (re)starts or is torn down so callers can drop partial lines,
+    and on_gap(key) when bytes were lost and skipped over (the data that
+    follows doesn't continue what came before).
+    """
+
+    def __init__(self, on_data: Callable[[FlowKey, bytes], None],
+                 on_reset: Optional[Callable[[FlowKey], None]] = None,
+                 max_pending=64, max_flows=8, max_closed=32,
+                 on_gap: Optional[Callable[[FlowKey], None]] = None):
+        self.on_data = on_data
+        self.on_reset = on_reset
+        self.on_gap = on_gap
+        self.max_pending = max_pending
+        self.max_flows = max_flows
+        self.flows: Dict[FlowKey, StreamReassembler] = {}
+        # Recently closed flows -> the sequence number their stream ended at (None if it never synced),
+        # so late retransmits after a FIN/RST aren't taken for a new stream and delivered twice
+        self.max_closed = max_closed
+        self.closed: "OrderedDict[FlowKey, Optional[int]]" = OrderedDict()
+
+        # Counters for flows we've already discarded
+        self._retired = {'delivered_bytes': 0, 'duplicates': 0, 'out_of_order': 0, 'gaps': 0}
+        self.resets = 0
+
+    def feed(self, key: FlowKey, seq: int, flags: int, payload: bytes):
+        stream = self.flows.get(key)
+
+        if flags & TCP_RST:
+            if stream is not None:
+                self._close(key)
+            return
+
+        if stream is None:
+            if key in self.closed and not flags & TCP_SYN:
+                end = self.closed[key]
+                if end is not None and seq_delta(seq, end) <= 0:
+                    self._retired['duplicates'] += 1  # Retransmit of data (or the FIN) we already had
+                    return
+                if end is None and not payload:
+                    return  # Bare FIN/ACK for a flow that never carried data
+            self.closed.pop(key, None)
+            stream = self._open(key)
+
+        if flags & TCP_SYN:
+            # Ignore retransmitted SYNs for the stream we're already following
+            if stream.isn != seq:
+                if stream.next_seq is not None:
+                    self._reset(key)
+                stream.sync(seq)
+            seq = (seq + 1) & _SEQ_MASK  # SYN occupies one sequence number
+
+        deliver = lambda chunk: self.on_data(key, chunk)
+        stream.feed(seq, payload, deliver, fin=bool(flags & TCP_FIN))
+        stream.skip_gap_if_full(deliver, (lambda: self.on_gap(key)) if self.on_gap is not None else None)
+
+        if stream.finished:
+            self._close(key)
+
+    def _open(self, key):
+        if len(self.flows) >= self.max_flows:
+            # Evict the least recently opened flow
+            self._close(next(iter(self.flows)))
+        stream = self.flows[key] = StreamReassembler(self.max_pending)
+        self._reset(key)
+        return stream
+
+    def _close(self, key):
+        stream = self.flows.pop(key)
+        self.closed.pop(key, None)
+        if len(self.closed) >= self.max_closed:
+            self.closed.popitem(last=False)
+        self.closed[key] = stream.fin_seq if stream.fin_seq is not None else stream.next_seq
+        for name in self._retired:
+            self._retired[name] += getattr(stream, name)
+        self._reset(key)
+
+    def _reset(self, key):
+        self.resets += 1
+        if self.on_reset is not None:
+            self.on_reset(key)
+
+    def get_stats(self):
+        stats = dict(self._retired)
+        for stream in self.flows.values():
+            for name in stats:
+                stats[name] += getattr(stream, name)
+        stats['flows'] = len(self.flows)
+        stats['resets'] = self.resets
+        return stats
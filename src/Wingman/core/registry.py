@@ -0,0 +1,173 @@
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Union
+
+# handler(match, line) -> event value, or None to emit nothing
+Handler = Callable[[re.Match, str], Any]
+
+
+class ParsedEvent(NamedTuple):
+    kind: str
+    value: Any
+
+
+def _default_handler(match, _line):
+    return match.groupdict() or match.group(0)
+
+
+class EventParser:
+    """One registered event type: literal trigger(s) + a compiled pattern + a value builder."""
+    __slots__ = ('name', 'triggers', 'pattern', 'handler', 'order', 'checks', 'hits', 'time_ns')
+
+    def __init__(self, name: str, triggers: Iterable[str], pattern: Pattern, handler: Handler, order: int):
+        self.name = name
+        self.triggers = tuple(t.lower() for t in triggers)
+        self.pattern = pattern
+        self.handler = handler
+        self.order = order
+
+        # --- Counters ---
+        self.checks = 0  # Times a trigger fired and the pattern was run
+        self.hits = 0  # Times an event was emitted
+        self.time_ns = 0  # Time spent in pattern + handler
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """
+    Builds a regex that walks a character trie of the words, e.g.
+    ["you gain", "you get"] -> "you\\ g(?:ain|et)". The regex engine then
+    branches on one character at a time instead of retrying every word.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A word ends here but longer ones continue: make the rest optional (greedy = longest first)
+        return f'(?:{body})?' if '' in node else body
+
+    return emit(trie)
+
+
+def _partially_overlap(a: str, b: str) -> bool:
+    """True if a suffix of a is a prefix of b, i.e. b could start inside a match of a."""
+    return any(a.endswith(b[:k]) for k in range(1, min(len(a), len(b))))
+
+
+class ParserRegistry:
+    """
+    Dispatches lines to registered EventParsers.
+
+    All triggers are compiled into a single trie-shaped scanner, so finding
+    which parsers a line might interest costs one C-level pass over the
+    lowercased line however many parsers are registered. Only the parsers
+    whose trigger occurs in the line get to run their (heavier) pattern.
+    Triggers that can overlap each other (one ending with the start of
+    another) force a slower position-by-position scan, so avoid them.
+    """
+
+    def __init__(self):
+        self.parsers: List[EventParser] = []
+        self._by_name: Dict[str, EventParser] = {}
+        self._scanner: Optional[Pattern] = None
+        self._by_trigger: Dict[str, List[EventParser]] = {}
+        self._always: List[EventParser] = []  # Parsers registered without a trigger
+        self._dirty = True
+
+    def register(self, name: str, trigger: Union[str, Iterable[str], None], pattern: Union[str, Pattern],
+                 handler: Optional[Handler] = None) -> EventParser:
+        """
+        Adds a parser. trigger is a literal (or several) that must occur in the
+        line, case-insensitively, before pattern is tried; None runs it on every line.
+        """
+        if name in self._by_name:
+            raise ValueError(f"Parser {name!r} is already registered")
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        triggers = () if trigger is None else (trigger,) if isinstance(trigger, str) else tuple(trigger)
+
+        parser = EventParser(name, triggers, pattern, handler or _default_handler, len(self.parsers))
+        self.parsers.append(parser)
+        self._by_name[name] = parser
+        self._dirty = True
+        return parser
+
+    def unregister(self, name: str):
+        self.parsers.remove(self._by_name.pop(name))
+        self._dirty = True
+
+    def _build(self):
+        by_trigger: Dict[str, List[EventParser]] = {}
+        self._always = []
+        for parser in self.parsers:
+            if not parser.triggers:
+                self._always.append(parser)
+            for trigger in parser.triggers:
+                by_trigger.setdefault(trigger, []).append(parser)
+
+        # The scanner reports non-overlapping matches, so a trigger also stands
+        # for every other trigger it contains (e.g. "you hit" inside "you hit hard")
+        self._by_trigger = {}
+        for trigger in by_trigger:
+            parsers = {p for t, ps in by_trigger.items() if t in trigger for p in ps}
+            self._by_trigger[trigger] = sorted(parsers, key=lambda p: p.order)
+
+        scanner = trie_regex(by_trigger)
+        if any(_partially_overlap(a, b) for a in by_trigger for b in by_trigger if a != b):
+            # One trigger can begin inside another: test every position (slower, exact)
+            scanner = f"(?=({scanner}))"
+        self._scanner = re.compile(scanner) if by_trigger else None
+        self._dirty = False
+
+    def candidates(self, line: str) -> List[EventParser]:
+        """Parsers whose trigger occurs in the line, in registration order."""
+        if self._dirty:
+            self._build()
+        found = self._scanner.findall(line.lower()) if self._scanner is not None else ()
+
+        if not found:
+            return self._always
+        if len(found) == 1 and not self._always:
+            return self._by_trigger[found[0]]
+
+        by_trigger = self._by_trigger
+        parsers = set(self._always)
+        for trigger in found:
+            parsers.update(by_trigger[trigger])
+        return sorted(parsers, key=lambda p: p.order)
+
+    def dispatch(self, line: str) -> List[ParsedEvent]:
+        """Runs every triggered parser over the line and returns the events they produced."""
+        candidates = self.candidates(line)
+        if not candidates:
+            return []
+
+        events = []
+        clock = time.perf_counter_ns
+        for parser in candidates:
+            start = clock()
+            match = parser.pattern.search(line)
+            value = parser.handler(match, line) if match else None
+            parser.time_ns += clock() - start
+            parser.checks += 1
+            if value is not None:
+                parser.hits += 1
+                events.append(ParsedEvent(parser.name, value))
+        return events
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            p.name: {'checks': p.checks, 'hits': p.hits, 'time_ms': p.time_ns / 1e6}
+            for p in self.parsers
+        }
+
+    def reset_stats(self):
+        for p in self.parsers:
+            p.checks = p.hits = p.time_ns = 0
@@ -1,15 +1,38 @@
 import time
-import re
+from collections import Counter
 from Wingman.core.input_receiver import InputReceiver
-# Ensure parse_group_status is imported from your parser refactor
-from Wingman.core.parser import parse_xp_message, parse_group_status
+from Wingman.core.parser import build_default_registry, GroupBlockParser, LINE_GROUP_HEADER, LINE_XP
+from Wingman.core.rates import RollingRates, DEFAULT_WINDOWS
+from Wingman.core.timeseries import XPTimeSeries
+from Wingman.core.group_history import GroupHistory
+from Wingman.core.journal import REC_XP, REC_GROUP, REC_PAUSE, REC_RESUME, REC_SNAPSHOT
+
+# A group listing nothing has followed for this long is taken to be complete
+GROUP_BLOCK_TIMEOUT = 1.0
+
+
+def format_duration(seconds):
+    """HH:MM:SS for a number of seconds."""
+    elapsed = int(seconds)
+    hours = elapsed // 3600
+    minutes = (elapsed % 3600) // 60
+    seconds = elapsed % 60
+    return f"{hours:02}:{minutes:02}:{seconds:02}"
 
 
 class GameSession:
-    def __init__(self, receiver: InputReceiver):
+    def __init__(self, receiver: InputReceiver, clock=time.time, verbose=True, journal=None,
+                 rate_windows=DEFAULT_WINDOWS, publisher=None):
         self.receiver = receiver
+        # Optional SessionJournal: every state change is appended so a crash loses nothing
+        self.journal = journal
+        # Optional push.EventPublisher: the same state changes, pushed to overlays as they happen
+        self.publisher = publisher
+        # Source of "now"; replay swaps in a clock driven by the log's own timestamps
+        self.clock = clock
+        self.verbose = verbose  # Print a debug line per XP gain
         self.total_xp = 0
-        self.start_time = time.time()
+        self.start_time = self.clock()
 
         # --- PAUSE STATE ---
         self.pause_start_time = None  # Timestamp of when we hit "Pause"
@@ -17,6 +40,29 @@ class GameSession:
 
         # New: Store the latest snapshot of group members
         self.latest_group_data = []
+        # Bumped whenever latest_group_data changes, so the GUI can skip redrawing an unchanged group
+        self.group_version = 0
+        # Numeric vitals per member over time (bounded), for trends
+        self.group_history = GroupHistory()
+        # Collects a group listing's rows; latest_group_data only ever gets complete listings
+        self.group_block = GroupBlockParser()
+
+        # Every event parser (built-in and registered later) runs through this.
+        # Member rows aren't in it: group_block reads them, and only right after a header
+        self.parsers = build_default_registry(group_rows=False)
+        # How many of each other event kind (deaths, damage, loot, ...) we've seen
+        self.event_counts = Counter()
+
+        # --- Out-of-band data (telnet GMCP / MSDP) ---
+        self.oob_latest = {}  # e.g. "Char.Vitals" -> the most recent payload
+        self.oob_handlers = {}  # name -> handler(session, data), for packages worth acting on
+        self.lines_processed = 0
+
+        # XP/hr over the last few minutes as well as the lifetime average
+        self.rate_windows = tuple(rate_windows)
+        self.rolling = RollingRates(self.rate_windows)
+        # XP over active time for the graph (seconds / minutes / hours, fixed memory)
+        self.xp_series = XPTimeSeries()
 
     # --- NEW: Time Calculation Helper ---
     def get_active_duration(self):
@@ -24,7 +70,7 @@ class GameSession:
         Returns the number of seconds the session has been 'active'.
         Formula: (Now - Start) - (Total Time Spent Paused)
         """
-        now = time.time()
+        now = self.clock()
 
         # If we are currently paused, we "freeze" the end time at the moment we paused.
         if self.pause_start_time:
@@ -40,14 +86,16 @@ class GameSession:
     def pause_clock(self):
         """Freezes the timer."""
         if self.pause_start_time is None:
-            self.pause_start_time = time.time()
+            self.pause_start_time = self.clock()
+            self._record(REC_PAUSE)
 
     def resume_clock(self):
         """Unfreezes the timer and adds the elapsed time to the deduction total."""
         if self.pause_start_time:
-            time_spent_paused = time.time() - self.pause_start_time
+            time_spent_paused = self.clock() - self.pause_start_time
             self.total_paused_duration += time_spent_paused
             self.pause_start_time = None
+            self._record(REC_RESUME)
 
     def get_xp_per_hour(self):
         if self.total_xp == 0: return 0
@@ -59,69 +107,183 @@ class GameSession:
         hours = elapsed_seconds / 3600
         return int(self.total_xp / hours)
 
+    def get_rolling_xp_per_hour(self):
+        """{window seconds: XP/hr over that much recent active time}. Paused time doesn't count."""
+        return self.rolling.per_hour(self.get_active_duration())
+
+    def get_xp_series(self, step, count):
+        """(newest bucket index, XP per `step` seconds for the last `count` steps) on active time."""
+        return self.xp_series.series(step, count, self.get_active_duration())
+
     def reset(self):
         self.total_xp = 0
-        self.start_time = time.time()
+        self.start_time = self.clock()
         self.latest_group_data = []
+        self.group_version += 1
+        self.group_history = GroupHistory()
+        self.group_block = GroupBlockParser()
+        self.event_counts.clear()
+        self.oob_latest = {}
+        self.rolling = RollingRates(self.rate_windows)
+        self.xp_series = XPTimeSeries()
 
         # Reset pause data so we don't start with negative time or stuck pauses
         self.pause_start_time = None
         self.total_paused_duration = 0
 
+        # Nothing before a reset matters any more: compact the journal to a fresh snapshot
+        self.write_snapshot()
+
     def get_duration_str(self):
         # Use our new helper so the visual clock stops ticking when paused
-        elapsed = int(self.get_active_duration())
-
-        hours = elapsed // 3600
-        minutes = (elapsed % 3600) // 60
-        seconds = elapsed % 60
-        return f"{hours:02}:{minutes:02}:{seconds:02}"
+        return format_duration(self.get_active_duration())
 
     def get_latest_group_data(self):
         """Returns the current list of party members for the GUI."""
         return self.latest_group_data
 
-    def process_queue(self):
+    def process_queue(self, max_lines=None):
         """
         Pops items, calculates XP, and parses Group stats.
+        Pulls up to max_lines in one batch (everything queued if None).
         Returns a list of text logs for the GUI.
         """
         logs = []
+        block = self.group_block
+        now = self.clock()
 
-        # Process everything currently in the stack
-        while True:
-            line = self.receiver.remove_from_top()
-            if line is None:
-                break
+        # A listing that ended last batch with nothing after it: it's been long enough, take it as is
+        if block.active and now - block.last_line_at >= GROUP_BLOCK_TIMEOUT:
+            self._commit_group(block.finish(), now)
 
+        # Structured data first: it's cheap and needs no regex
+        for event in self.receiver.drain_oob():
+            self._apply_oob(event)
+
+        # Process everything currently in the stack
+        lines = self.receiver.drain(max_lines)
+        self.lines_processed += len(lines)
+        for line in lines:
             # --- Logic 1: Group Detection ---
-            # If we see "Someone's group:", we assume a fresh list is coming.
-            # We clear the current data so we don't hold onto stale members.
-
-            # OLD:
-            # if "group:" in line and re.search(r"^\S+'s group:", line):
-
-            # NEW: Remove the '^' to allow timestamps before the name
-            if "group:" in line and re.search(r"\S+'s group:", line):
-                self.latest_group_data = []
-
-            # Check for member rows in this line
-            found_members = parse_group_status(line)
-            if found_members:
-                # Add found members to our "dashboard" list
-                self.latest_group_data.extend(found_members)
-
-            # --- Logic 2: XP Detection ---
-            xp_gain = parse_xp_message(line)
-
-            if xp_gain > 0:
-                # Optional: You could check if self.pause_start_time is None here
-                # if you want to ignore XP gained while paused, though the UI
-                # usually stops calling process_queue anyway.
-                print(f"DEBUG: XP FOUND: {xp_gain}")
-                self.total_xp += xp_gain
-                timestamp = time.strftime("%H:%M:%S", time.localtime())
-                log_entry = f"[{timestamp}] +{xp_gain:,} XP"
-                logs.append(log_entry)
-
-        return logs
\ No newline at end of file
+            # Inside a listing, rows go to the block; the first line that isn't one ends it
+            if block.active:
+                if block.feed(line, now):
+                    continue
+                self._commit_group(block.finish(), now)
+
+            # One pass per line: the registry only runs parsers whose trigger is present
+            for kind, value in self.parsers.dispatch(line):
+
+                # "Someone's group:" opens a listing; the current group stays up until it's complete
+                if kind == LINE_GROUP_HEADER:
+                    block.start(value, now)
+
+                # --- Logic 2: XP Detection ---
+                elif kind == LINE_XP:
+                    self._add_xp(value, logs)
+
+                else:
+                    self.event_counts[kind] += 1
+
+        if self.journal is not None:
+            self.journal.poll()
+            if self.journal.snapshot_due():
+                self.write_snapshot()
+
+        return logs
+
+    def _apply_oob(self, event):
+        self.oob_latest[event.name] = event.data
+        self.event_counts[event.protocol] += 1
+        handler = self.oob_handlers.get(event.name)
+        if handler is not None:
+            handler(self, event.data)
+
+    def _commit_group(self, members, now):
+        self.latest_group_data = members
+        self.group_version += 1
+        self.group_history.record(members, now - self.start_time)
+        self._record(REC_GROUP, members)  # Every listing, even if several complete in one batch
+
+    def flush_group(self):
+        """Commits a listing still being read (e.g. at the end of a replay, where nothing follows it)."""
+        if self.group_block.active:
+            self._commit_group(self.group_block.finish(), self.clock())
+
+    def _add_xp(self, xp_gain, logs):
+        # Optional: You could check if self.pause_start_time is None here
+        # if you want to ignore XP gained while paused, though the UI
+        # usually stops calling process_queue anyway.
+        if self.verbose:
+            print(f"DEBUG: XP FOUND: {xp_gain}")
+        self.total_xp += xp_gain
+        active = self.get_active_duration()
+        self.rolling.add(xp_gain, active)
+        self.xp_series.add(xp_gain, active)
+        self._record(REC_XP, xp_gain)
+        timestamp = time.strftime("%H:%M:%S", time.localtime(self.clock()))
+        log_entry = f"[{timestamp}] +{xp_gain:,} XP"
+        logs.append(log_entry)
+
+    # --- Persistence ---
+    def _record(self, kind, *fields):
+        if self.journal is not None:
+            self.journal.record(kind, self.clock(), *fields)
+        if self.publisher is not None:
+            self.publisher.publish(kind, self.clock(), self.total_xp, *fields)
+
+    def get_state(self):
+        """Everything needed to rebuild the session, as plain JSON-able data."""
+        return {
+            'total_xp': self.total_xp,
+            'start_time': self.start_time,
+            'pause_start_time': self.pause_start_time,
+            'total_paused_duration': self.total_paused_duration,
+            'group': self.latest_group_data,
+            'events': dict(self.event_counts),
+        }
+
+    def load_state(self, state):
+        self.total_xp = state['total_xp']
+        self.start_time = state['start_time']
+        self.pause_start_time = state['pause_start_time']
+        self.total_paused_duration = state['total_paused_duration']
+        self.latest_group_data = state['group']
+        self.group_version += 1
+        self.event_counts = Counter(state['events'])
+
+    def write_snapshot(self):
+        if self.journal is not None:
+            self.journal.write_snapshot(self.clock(), self.get_state())
+
+    def resume_from_journal(self):
+        """
+        Rebuilds the session from its journal (last snapshot + the events after it).
+        Time Wingman wasn't running counts as paused, so XP/hr isn't diluted by the downtime.
+        Returns False if there was nothing to resume.
+        """
+        records = self.journal.read()
+        for kind, timestamp, *fields in records:
+            self._apply_record(kind, timestamp, fields)
+
+        if records:
+            if self.pause_start_time is None:
+                self.total_paused_duration += max(0, self.clock() - records[-1][1])
+            else:
+                self.resume_clock()
+        self.write_snapshot()
+        return bool(records)
+
+    def _apply_record(self, kind, timestamp, fields):
+        if kind == REC_SNAPSHOT:
+            self.load_state(fields[0])
+        elif kind == REC_XP:
+            self.total_xp += fields[0]
+        elif kind == REC_GROUP:
+            self.latest_group_data = fields[0]
+            self.group_version += 1
+        elif kind == REC_PAUSE:
+            self.pause_start_time = timestamp
+        elif kind == REC_RESUME and self.pause_start_time is not None:
+            self.total_paused_duration += timestamp - self.pause_start_time
+            self.pause_start_time = None
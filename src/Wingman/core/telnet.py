@@ -0,0 +1,296 @@
+import json
+import zlib
+from typing import Any, Callable, List, NamedTuple, Optional
+
+# --- Telnet commands (RFC 854) ---
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250  # Subnegotiation begin
+GA = 249  # Go ahead: ends a prompt
+NOP = 241
+SE = 240  # Subnegotiation end
+EOR = 239  # End of record: ends a prompt (TELOPT_EOR)
+
+# --- Options we look inside ---
+MSDP = 69  # Mud Server Data Protocol
+MCCP2 = 86  # Mud Client Compression Protocol v2: everything after IAC SB 86 IAC SE is zlib
+GMCP = 201  # Generic Mud Communication Protocol
+
+# MSDP markers inside a subnegotiation
+MSDP_VAR = 1
+MSDP_VAL = 2
+MSDP_TABLE_OPEN = 3
+MSDP_TABLE_CLOSE = 4
+MSDP_ARRAY_OPEN = 5
+MSDP_ARRAY_CLOSE = 6
+
+_IAC_BYTE = bytes([IAC])
+_MCCP2_START = bytes([IAC, SB, MCCP2])
+
+# A subnegotiation longer than this never got its IAC SE (capture started inside it, or the
+# segment holding it was lost): give up on it rather than swallow the game text that follows
+MAX_SUBNEGOTIATION = 64 * 1024
+
+# Decoder states
+_DATA, _COMMAND, _OPTION, _SB_OPTION, _SB_DATA, _SB_IAC = range(6)
+
+
+class OobEvent(NamedTuple):
+    """Structured out-of-band data: e.g. ("gmcp", "Char.Vitals", {"hp": 100, ...})."""
+    protocol: str
+    name: str
+    data: Any
+
+
+class TelnetDecoder:
+    """
+    Streaming telnet filter between TCP payloads and line splitting.
+
+    feed() returns only the text bytes: negotiation (IAC WILL/DO/...) and
+    other commands are dropped, IAC IAC becomes a literal 0xFF, and prompt
+    terminators (GA / EOR) become newlines so a prompt is a line of its own.
+    Subnegotiation payloads are collected whole, across any number of
+    chunks, and passed to on_subnegotiation(option, payload). If the server
+    starts MCCP2 compression the rest of the stream is inflated first.
+
+    Chunks with no IAC byte (the vast majority) are returned as they are.
+
+    If a compressed stream can't be inflated (a lost segment), nothing more
+    is passed on until the server restarts compression with IAC SB MCCP2:
+    the bytes in between are zlib data, not text.
+    """
+
+    def __init__(self, on_subnegotiation: Optional[Callable[[int, bytes], None]] = None, prompt_newline=True):
+        self.on_subnegotiation = on_subnegotiation
+        self.prompt_newline = prompt_newline
+
+        # --- Counters ---
+        self.commands = 0
+        self.subnegotiations = 0
+        self.compression_errors = 0
+        self.oversized = 0  # Subnegotiations given up on at MAX_SUBNEGOTIATION bytes
+        self.discarded_bytes = 0  # Undecodable compressed bytes dropped while waiting for a restart
+
+        self.reset()
+
+    def reset(self):
+        """Forget any half-read command (new connection)."""
+        self._state = _DATA
+        self._sb_option = 0
+        self._sb_data = bytearray()
+        self._inflate = None
+        self._skipping = False  # Dropping undecodable compressed data until the next IAC SB MCCP2
+        self._skip_tail = b""  # Last bytes of the previous chunk, in case the marker is split
+
+    def resync(self):
+        """
+        Some of the stream was lost (reassembly skipped a gap): drop any
+        half-read command, and if we were inflating, skip to the next
+        compression restart instead of reading zlib data as text.
+        """
+        compressed = self._inflate is not None or self._skipping
+        self.reset()
+        self._skipping = compressed
+
+    def feed(self, data) -> bytes:
+        if self._inflate is not None:
+            return self._feed_compressed(data)
+        if self._skipping:
+            return self._skip_to_compression(data)
+        # `IAC in data` (an int) works for bytes and memoryview payloads alike
+        if self._state == _DATA and IAC not in data:
+            return data  # Fast path: plain text
+        return self._parse(bytes(data))
+
+    def _feed_compressed(self, data) -> bytes:
+        inflate = self._inflate
+        try:
+            plain = inflate.decompress(data)
+        except zlib.error:
+            # Joined mid-stream or lost a segment: the rest can't be inflated, and isn't text either
+            self.compression_errors += 1
+            self._inflate = None
+            self._skipping = True
+            return self._skip_to_compression(data)
+        out = self._parse(plain) if plain else b""
+        if inflate.eof:  # Server ended compression: what follows is plain again
+            self._inflate = None
+            rest = inflate.unused_data
+            if rest:
+                out += self.feed(rest)
+        return out
+
+    def _skip_to_compression(self, data) -> bytes:
+        data = self._skip_tail + bytes(data)
+        start = data.find(_MCCP2_START)
+        if start == -1:
+            keep = len(_MCCP2_START) - 1
+            self._skip_tail = data[-keep:]
+            self.discarded_bytes += len(data) - len(self._skip_tail)
+            return b""
+        self.discarded_bytes += start
+        self._skipping = False
+        self._skip_tail = b""
+        self._state = _DATA
+        return self._parse(data[start:])
+
+    def _parse(self, data: bytes) -> bytes:
+        out = bytearray()
+        pos = 0
+        end = len(data)
+        state = self._state
+        while pos < end:
+            if state == _DATA:
+                iac = data.find(_IAC_BYTE, pos)
+                if iac == -1:
+                    out += data[pos:]
+                    break
+                out += data[pos:iac]
+                pos = iac + 1
+                state = _COMMAND
+                continue
+            if state == _SB_DATA:
+                iac = data.find(_IAC_BYTE, pos)
+                if (iac if iac != -1 else end) - pos > MAX_SUBNEGOTIATION - len(self._sb_data):
+                    # Never terminated: drop it and read on from here as text
+                    self._sb_data.clear()
+                    self.oversized += 1
+                    state = _DATA
+                    continue
+                if iac == -1:
+                    self._sb_data += data[pos:]
+                    break
+                self._sb_data += data[pos:iac]
+                pos = iac + 1
+                state = _SB_IAC
+                continue
+
+            byte = data[pos]
+            pos += 1
+            if state == _COMMAND:
+                if byte == IAC:
+                    out.append(IAC)  # Escaped 0xFF
+                    state = _DATA
+                elif byte in (WILL, WONT, DO, DONT):
+                    state = _OPTION
+                elif byte == SB:
+                    state = _SB_OPTION
+                else:
+                    if byte in (GA, EOR) and self.prompt_newline:
+                        out += b"\n"
+                    self.commands += 1
+                    state = _DATA
+            elif state == _OPTION:
+                self.commands += 1  # Negotiation: nothing for us to do, we only listen
+                state = _DATA
+            elif state == _SB_OPTION:
+                self._sb_option = byte
+                self._sb_data.clear()
+                state = _SB_DATA
+            elif state == _SB_IAC:
+                if byte == IAC:
+                    self._sb_data.append(IAC)
+                    state = _SB_DATA
+                elif byte == SE:
+                    state = _DATA
+                    if self._end_subnegotiation():
+                        # Compression starts right after IAC SE
+                        self._state = state
+                        out += self._feed_compressed(data[pos:])
+                        return bytes(out)
+                else:
+                    state = _SB_DATA  # Malformed; keep collecting
+        self._state = state
+        return bytes(out)
+
+    def _end_subnegotiation(self) -> bool:
+        """Handles a finished IAC SB ... IAC SE. True if it switched compression on."""
+        option = self._sb_option
+        payload = bytes(self._sb_data)
+        self._sb_data.clear()
+        self.subnegotiations += 1
+        if option == MCCP2:
+            self._inflate = zlib.decompressobj()
+            return True
+        if self.on_subnegotiation is not None:
+            self.on_subnegotiation(option, payload)
+        return False
+
+
+# --- Out-of-band payload parsers ---
+
+def parse_gmcp(payload: bytes) -> OobEvent:
+    """b'Char.Vitals {"hp": 100}' -> OobEvent("gmcp", "Char.Vitals", {"hp": 100})."""
+    text = payload.decode('utf-8', errors='replace')
+    name, _, body = text.partition(' ')
+    data = None
+    if body.strip():
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = body  # Not JSON: hand over the raw text
+    return OobEvent("gmcp", name, data)
+
+
+def parse_msdp(payload: bytes) -> List[OobEvent]:
+    """One OobEvent per top-level VAR, with tables as dicts and arrays as lists."""
+    values, _ = _msdp_table(payload, 0, closing=None)
+    return [OobEvent("msdp", name, value) for name, value in values.items()]
+
+
+def _msdp_table(data, pos, closing):
+    table = {}
+    repeated = set()  # Names given several VALs in a row: collected into a list
+    name = None
+    while pos < len(data):
+        byte = data[pos]
+        if byte == closing:
+            return table, pos + 1
+        if byte == MSDP_VAR:
+            name, pos = _msdp_string(data, pos + 1)
+        elif byte == MSDP_VAL:
+            value, pos = _msdp_value(data, pos + 1)
+            if name is None:
+                continue
+            if name not in table:
+                table[name] = value
+            else:
+                if name not in repeated:
+                    table[name] = [table[name]]
+                    repeated.add(name)
+                table[name].append(value)
+        else:
+            pos += 1
+    return table, pos
+
+
+def _msdp_array(data, pos):
+    items = []
+    while pos < len(data):
+        byte = data[pos]
+        if byte == MSDP_ARRAY_CLOSE:
+            return items, pos + 1
+        if byte == MSDP_VAL:
+            value, pos = _msdp_value(data, pos + 1)
+            items.append(value)
+        else:
+            pos += 1
+    return items, pos
+
+
+def _msdp_value(data, pos):
+    if pos < len(data) and data[pos] == MSDP_TABLE_OPEN:
+        return _msdp_table(data, pos + 1, closing=MSDP_TABLE_CLOSE)
+    if pos < len(data) and data[pos] == MSDP_ARRAY_OPEN:
+        return _msdp_array(data, pos + 1)
+    return _msdp_string(data, pos)
+
+
+def _msdp_string(data, pos):
+    start = pos
+    while pos < len(data) and data[pos] > MSDP_ARRAY_CLOSE:
+        pos += 1
+    return data[start:pos].decode('utf-8', errors='replace'), pos
@@ -0,0 +1,87 @@
+from array import array
+from typing import List, Tuple
+
+# (seconds per bucket, buckets kept): 10 min of seconds, a day of minutes, 30 days of hours
+DEFAULT_TIERS = ((1, 600), (60, 1440), (3600, 720))
+
+
+class SeriesTier:
+    """XP summed into fixed-width buckets, in a ring that forgets the oldest bucket as time moves on."""
+    __slots__ = ('resolution', '_slots', '_head')
+
+    def __init__(self, resolution: int, size: int):
+        self.resolution = resolution
+        self._slots = array('q', bytes(8 * size))
+        self._head = 0  # Absolute bucket index (t // resolution) of the newest slot
+
+    @property
+    def span(self) -> int:
+        return self.resolution * len(self._slots)
+
+    def _advance(self, index: int):
+        gap = index - self._head
+        if gap <= 0:
+            return
+        slots = self._slots
+        size = len(slots)
+        if gap >= size:
+            slots[:] = array('q', bytes(8 * size))
+        else:
+            for i in range(self._head + 1, index + 1):
+                slots[i % size] = 0
+        self._head = index
+
+    def add(self, amount: int, t: float):
+        index = int(t // self.resolution)
+        self._advance(index)
+        size = len(self._slots)
+        if self._head - index < size:
+            self._slots[index % size] += amount
+
+    def values(self, first: int, last: int) -> List[int]:
+        """Bucket sums for absolute indexes first..last (0 where nothing is kept)."""
+        self._advance(last)
+        slots = self._slots
+        size = len(slots)
+        oldest = self._head - size + 1
+        return [slots[i % size] if oldest <= i <= self._head else 0 for i in range(first, last + 1)]
+
+
+class XPTimeSeries:
+    """
+    XP gained over (active) time at several resolutions at once. Every gain
+    goes into every tier, so each keeps its own downsampled copy and memory
+    is fixed by the tier sizes however long the session runs.
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = [SeriesTier(resolution, size) for resolution, size in sorted(tiers)]
+
+    def add(self, amount: int, t: float):
+        for tier in self.tiers:
+            tier.add(amount, t)
+
+    def _tier_for(self, step: int, count: int) -> SeriesTier:
+        # The finest tier that divides the step evenly and still reaches back far enough
+        for tier in self.tiers:
+            if step % tier.resolution == 0 and tier.span >= step * count:
+                return tier
+        usable = [tier for tier in self.tiers if step % tier.resolution == 0]
+        if not usable:
+            raise ValueError(f"step {step}s is not a multiple of any tier resolution")
+        return usable[-1]
+
+    def series(self, step: int, count: int, t: float) -> Tuple[int, List[int]]:
+        """
+        The last `count` buckets of `step` seconds up to time t, oldest first.
+        Returns (index of the newest bucket, i.e. t // step, values); the
+        newest bucket is still filling up.
+        """
+        tier = self._tier_for(step, count)
+        factor = step // tier.resolution
+        end = int(t // step)
+        first = (end - count + 1) * factor
+        raw = tier.values(first, (end + 1) * factor - 1)
+        if factor == 1:
+            return end, raw
+        return end, [sum(raw[i:i + factor]) for i in range(0, len(raw), factor)]
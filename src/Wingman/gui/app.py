@@ -1,14 +1,57 @@
 import tkinter as tk
-import time
 import ctypes
-from tkinter import ttk
+import os
+from time import perf_counter_ns
+from tkinter import messagebox, ttk
 from Wingman.core.session import GameSession
+from Wingman.core.pipeline import ProcessingWorker
+from Wingman.core.rates import window_label
+from Wingman.core.ansi import AnsiStyler
+from Wingman.core.latency import PipelineLatency, STAGE_GUI_APPLY, STAGE_END_TO_END
+from Wingman.core.profiler import SamplingProfiler, DEFAULT_DURATION
+from Wingman.gui.widgets import Sparkline, StyledText, LatencyPanel
+
+CLOCK_INTERVAL_MS = 1000  # Duration / XP-hr labels; the only timer, and it stops while paused
+
+# Sent by the processing worker when it has published a snapshot we haven't read yet
+SNAPSHOT_READY_EVENT = "<<SnapshotReady>>"
+
+# Sent by the sampling profiler once it has stopped and written its files
+PROFILE_DONE_EVENT = "<<ProfileDone>>"
+PROFILE_DIR = "profiles"
+PROFILE_START_LABEL = f"Start Profiling ({DEFAULT_DURATION:g} s)"
+PROFILE_STOP_LABEL = "Stop Profiling"
+
+TREE_COLUMNS = ("cls", "lvl", "status", "name", "hp", "fat", "pwr", "trend")
+
+# XP graph views: (menu label, seconds per bar); each shows GRAPH_POINTS bars
+GRAPH_VIEWS = (("Graph: Last 10 min", 5), ("Graph: Last 2 hours", 60), ("Graph: Last 24 hours", 720))
 
 
 class XPTrackerApp:
-    def __init__(self, session: GameSession):
+    def __init__(self, session: GameSession, worker: ProcessingWorker = None):
         self.session = session
-        self.last_stat_update = 0
+        # All parsing happens on the worker's thread; the window only reads its snapshots
+        self.worker = worker or ProcessingWorker(session)
+        self.update_pending = False
+        self.clock_job = None
+
+        # Group table: snapshot group_version last drawn, and row key -> (item id, values shown)
+        self.rendered_group_version = None
+        self.rendered_paused = False
+        self.tree_rows = {}
+
+        # Coloured game output window (colour mode), None while it's closed
+        self.mirror_window = None
+        self.mirror = None
+
+        # Latency debug panel, and the capture stamp of the last snapshot timed end to end
+        self.latency_panel = None
+        self.measured_capture_ns = None
+
+        # Sampling profiler while one is running (or writing its files), and its menu entry
+        self.profiler = None
+        self.profile_menu_index = None
 
         # State
         self.dark_mode = False
@@ -16,7 +59,7 @@ class XPTrackerApp:
 
         self.root = tk.Tk()
         self.root.title("Wingman - 0.2.5")
-        self.root.geometry("500x350")
+        self.root.geometry("560x400")
 
         # 1. Initialize "Always on Top" variable
         self.var_always_on_top = tk.BooleanVar(value=True)
@@ -24,7 +67,10 @@ class XPTrackerApp:
 
         self.var_total_xp = tk.StringVar(value="Total XP: 0")
         self.var_xp_hr = tk.StringVar(value="XP/Hr: 0")
+        self.var_rolling = tk.StringVar(value="")
+        self.var_graph_step = tk.IntVar(value=GRAPH_VIEWS[0][1])
         self.var_duration = tk.StringVar(value="Time: 00:00:00")
+        self.var_mirror = tk.BooleanVar(value=False)
 
         self.style = ttk.Style()
         self.style.theme_use('clam')
@@ -32,7 +78,12 @@ class XPTrackerApp:
         self.setup_ui()
         self.apply_theme()
 
-        self.update_gui()
+        # No polling: the worker wakes us when it has something new
+        self.root.bind(SNAPSHOT_READY_EVENT, self.schedule_update)
+        self.worker.on_snapshot = self.signal_snapshot_ready
+        self.root.bind(PROFILE_DONE_EVENT, self.profiling_done)
+
+        self.update_clock()
 
     def setup_ui(self):
         main_frame = ttk.Frame(self.root, padding="10")
@@ -47,6 +98,7 @@ class XPTrackerApp:
         col1.pack(side=tk.LEFT, padx=5)
         ttk.Label(col1, textvariable=self.var_total_xp, font=("Segoe UI", 12, "bold")).pack(anchor="w")
         ttk.Label(col1, textvariable=self.var_xp_hr).pack(anchor="w")
+        ttk.Label(col1, textvariable=self.var_rolling, font=("Consolas", 9)).pack(anchor="w")
 
         # Column 2: Controls
         col2 = ttk.Frame(stats_frame)
@@ -76,17 +128,30 @@ class XPTrackerApp:
         self.menu_settings.add_separator()
 
         self.menu_settings.add_command(label="Toggle Dark Mode", command=self.toggle_theme)
+        self.menu_settings.add_checkbutton(label="Show Game Output (colour)", variable=self.var_mirror,
+                                           command=self.toggle_mirror)
+        self.menu_settings.add_separator()
+        for label, step in GRAPH_VIEWS:
+            self.menu_settings.add_radiobutton(label=label, variable=self.var_graph_step, value=step,
+                                               command=self.change_graph)
+        self.menu_settings.add_separator()
+        self.menu_settings.add_command(label="Latency Debug...", command=self.open_latency_panel)
+        self.menu_settings.add_command(label=PROFILE_START_LABEL, command=self.toggle_profiling)
+        self.profile_menu_index = self.menu_settings.index(tk.END)
         self.menu_settings.add_separator()
         self.menu_settings.add_command(label="Reset Stats", command=self.reset_stats)
 
         self.mb_settings["menu"] = self.menu_settings
 
+        # --- XP Graph ---
+        self.sparkline = Sparkline(main_frame, points=self.worker.graph_points, height=40)
+        self.sparkline.pack(fill=tk.X, pady=(0, 5))
+
         # --- Group Dashboard (Treeview) ---
         lbl_dash = ttk.Label(main_frame, text="Group Status:", font=("Segoe UI", 10, "bold"))
         lbl_dash.pack(anchor="w", pady=(5, 0))
 
-        columns = ("cls", "lvl", "status", "name", "hp", "fat", "pwr")
-        self.tree = ttk.Treeview(main_frame, columns=columns, show="headings", height=8)
+        self.tree = ttk.Treeview(main_frame, columns=TREE_COLUMNS, show="headings", height=8)
 
         self.tree.heading("cls", text="Class");
         self.tree.heading("lvl", text="Lvl")
@@ -95,6 +160,7 @@ class XPTrackerApp:
         self.tree.heading("hp", text="HP");
         self.tree.heading("fat", text="Fatigue")
         self.tree.heading("pwr", text="Power")
+        self.tree.heading("trend", text="Pwr Trend")
 
         self.tree.column("cls", width=50, anchor="center")
         self.tree.column("lvl", width=40, anchor="center")
@@ -103,6 +169,7 @@ class XPTrackerApp:
         self.tree.column("hp", width=80, anchor="center")
         self.tree.column("fat", width=80, anchor="center")
         self.tree.column("pwr", width=80, anchor="center")
+        self.tree.column("trend", width=70, anchor="w")
 
         self.tree.pack(fill=tk.BOTH, expand=True, pady=5)
 
@@ -116,10 +183,11 @@ class XPTrackerApp:
         self.paused = not self.paused
         if self.paused:
             self.btn_pause.config(text="Resume")
-            if hasattr(self.session, 'pause_clock'): self.session.pause_clock()
+            self.worker.pause()  # Lines keep queueing, unparsed, until resume
         else:
             self.btn_pause.config(text="Pause")
-            if hasattr(self.session, 'resume_clock'): self.session.resume_clock()
+            self.worker.resume()
+            self.update_clock()
 
     def toggle_theme(self):
         self.dark_mode = not self.dark_mode
@@ -146,6 +214,7 @@ class XPTrackerApp:
         self.style.configure("Treeview.Heading", background=bg_color, foreground=fg_color, relief="flat")
         self.style.configure("TMenubutton", background=bg_color, foreground=fg_color)
         self.menu_settings.config(bg=field_bg, fg=fg_color, activebackground=select_bg, activeforeground="white")
+        self.sparkline.set_colors(field_bg, select_bg)
 
     def set_windows_titlebar_color(self, use_dark: bool):
         try:
@@ -159,32 +228,189 @@ class XPTrackerApp:
         except Exception:
             pass
 
+    def toggle_mirror(self):
+        """
+        Colour mode on: the receiver keeps each line's colours (AnsiStyler) and a
+        window shows them. Off: back to plain stripping, nothing extra per line.
+        """
+        receiver = self.session.receiver
+        if self.var_mirror.get():
+            if self.mirror_window is not None:
+                return
+            receiver.mirror.clear()
+            receiver.styler = AnsiStyler()
+            self.mirror_window = tk.Toplevel(self.root)
+            self.mirror_window.title("Wingman - Game Output")
+            self.mirror_window.geometry("700x400")
+            self.mirror_window.protocol("WM_DELETE_WINDOW", self.close_mirror)
+            scrollbar = ttk.Scrollbar(self.mirror_window)
+            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            self.mirror = StyledText(self.mirror_window, max_lines=receiver.mirror.maxlen,
+                                     yscrollcommand=scrollbar.set)
+            self.mirror.pack(fill=tk.BOTH, expand=True)
+            scrollbar.config(command=self.mirror.yview)
+        elif self.mirror_window is not None:
+            receiver.styler = None
+            receiver.mirror.clear()
+            self.mirror_window.destroy()
+            self.mirror_window = None
+            self.mirror = None
+
+    def close_mirror(self):
+        self.var_mirror.set(False)
+        self.toggle_mirror()
+
+    def open_latency_panel(self):
+        if self.latency_panel is not None and self.latency_panel.winfo_exists():
+            self.latency_panel.lift()
+            return
+        receiver = self.session.receiver
+        if receiver.latency is None:
+            receiver.latency = PipelineLatency()  # Every stage finds it through the receiver
+        self.latency_panel = LatencyPanel(self.root, receiver.latency)
+
+    def toggle_profiling(self):
+        if self.profiler is not None:
+            self.profiler.stop(timeout=0)  # Don't block Tk on the file writing: PROFILE_DONE_EVENT follows
+            return
+        try:
+            self.profiler = SamplingProfiler(PROFILE_DIR, on_finish=self.signal_profile_done).start()
+        except OSError as e:  # Can't create the profiles folder: read-only install, no permission...
+            self.profiler = None
+            self.menu_settings.entryconfigure(self.profile_menu_index, label=PROFILE_START_LABEL)
+            messagebox.showerror("Wingman - Profiling Not Started",
+                                 f"Couldn't create {os.path.abspath(PROFILE_DIR)}:\n\n{e}", parent=self.root)
+            return
+        self.menu_settings.entryconfigure(self.profile_menu_index, label=PROFILE_STOP_LABEL)
+
+    def profiling_done(self, _event=None):
+        profiler, self.profiler = self.profiler, None
+        self.menu_settings.entryconfigure(self.profile_menu_index, label=PROFILE_START_LABEL)
+        if profiler is not None and profiler.error is not None:
+            messagebox.showerror("Wingman - Profile Not Saved",
+                                 f"Couldn't write the profile to {os.path.abspath(profiler.directory)}:\n\n"
+                                 f"{profiler.error}", parent=self.root)
+        elif profiler is not None and profiler.paths is not None:
+            collapsed, speedscope = profiler.paths
+            messagebox.showinfo("Wingman - Profile Saved",
+                                f"{profiler.samples:,} samples over {profiler.elapsed:.1f} s:\n\n"
+                                f"{os.path.abspath(collapsed)}\n{os.path.abspath(speedscope)}\n\n"
+                                "Open the .speedscope.json at speedscope.app, or feed the .collapsed file "
+                                "to flamegraph.pl.", parent=self.root)
+
+    def change_graph(self):
+        self.worker.set_graph(self.var_graph_step.get())
+
     def reset_stats(self):
-        self.session.reset()
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.worker.reset()
+        self._refresh_tree([])
+        self.var_total_xp.set("Total XP: 0")
+
+    # --- Wakeups ---
+    def signal_profile_done(self, _paths):
+        """Runs on the profiler thread once its files are written."""
+        try:
+            self.root.event_generate(PROFILE_DONE_EVENT, when="tail")
+        except (RuntimeError, tk.TclError):
+            pass  # Window already closed
+
+    def signal_snapshot_ready(self):
+        """Runs on the worker thread: posts a virtual event to the Tk loop."""
+        try:
+            self.root.event_generate(SNAPSHOT_READY_EVENT, when="tail")
+        except (RuntimeError, tk.TclError):
+            pass  # Window closing, or mainloop not running yet (update_clock will read the snapshot)
+
+    def schedule_update(self, _event=None):
+        """Coalesces wakeups: however many arrive, one update_gui runs once Tk is idle."""
+        if not self.update_pending:
+            self.update_pending = True
+            self.root.after_idle(self.update_gui)
 
     def update_gui(self):
-        self.root.after(100, self.update_gui)
-        if self.paused: return
-        self.session.process_queue()
-        group_data = self.session.get_latest_group_data()
-        if group_data: self._refresh_tree(group_data)
-        current_xp = self.session.total_xp
-        self.var_total_xp.set(f"Total XP: {current_xp:,}")
-        now = time.time()
-        if now - self.last_stat_update >= 1.0:
-            current_rate = self.session.get_xp_per_hour()
-            self.var_xp_hr.set(f"{current_rate:,} xp / hr")
-            self.var_duration.set(self.session.get_duration_str())
-            self.last_stat_update = now
+        """Draws the latest snapshot. Only reads: never parses, never touches the session."""
+        self.update_pending = False
+        latency = self.session.receiver.latency
+        if latency is None or not latency.enabled:
+            return self._apply_snapshot()
+
+        start = perf_counter_ns()
+        snapshot = self._apply_snapshot()
+        now = perf_counter_ns()
+        latency.record(STAGE_GUI_APPLY, now - start)
+        if snapshot.capture_ns is not None and snapshot.capture_ns != self.measured_capture_ns:
+            self.measured_capture_ns = snapshot.capture_ns
+            latency.record(STAGE_END_TO_END, now - snapshot.capture_ns)
+        return snapshot
+
+    def _apply_snapshot(self):
+        snapshot = self.worker.snapshot()
+        if snapshot.group_version != self.rendered_group_version:
+            self._refresh_tree(snapshot.group)  # Always a complete listing (or empty after a reset)
+            self.rendered_group_version = snapshot.group_version
+        self.var_total_xp.set(f"Total XP: {snapshot.total_xp:,}")
+        self.sparkline.update_series(snapshot.graph_step, snapshot.graph_end, snapshot.graph)
+        if snapshot.paused != self.rendered_paused:
+            self._draw_clock(snapshot)  # Show where the clock stopped (or restarted)
+        if self.mirror is not None:
+            self.mirror.append(self.session.receiver.drain_mirror())
+        return snapshot
+
+    def update_clock(self):
+        if self.clock_job is not None:
+            self.root.after_cancel(self.clock_job)
+            self.clock_job = None
+        self._draw_clock(self.update_gui())
+        if not self.paused:
+            self.clock_job = self.root.after(CLOCK_INTERVAL_MS, self.update_clock)
+            self.worker.refresh()  # Rolling rates decay even when nothing is happening
+
+    def _draw_clock(self, snapshot):
+        now = self.session.clock()
+        self.var_xp_hr.set(f"{snapshot.xp_per_hour_at(now):,} xp / hr")
+        self.var_duration.set(snapshot.duration_str_at(now))
+        self.var_rolling.set("  ".join(f"{window_label(window)}: {rate:,}"
+                                       for window, rate in snapshot.rolling_rates.items()))
+        self.rendered_paused = snapshot.paused
 
     def _refresh_tree(self, members):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for m in members:
-            values = (m['cls'], m['lvl'], m['status'], m['name'], m['hp'], m['fat'], m['pwr'])
-            self.tree.insert("", tk.END, values=values)
+        """
+        Brings the table in line with members, touching only what changed:
+        rows are keyed by member name, so an HP tick rewrites one cell
+        instead of deleting and re-inserting every row.
+        """
+        tree = self.tree
+        old_rows = self.tree_rows
+        new_rows = {}
+
+        for index, m in enumerate(members):
+            key = m['name']
+            while key in new_rows:  # Two members with the same name: keep both
+                key += "'"
+            values = tuple(str(m.get(col, "")) for col in TREE_COLUMNS)
+
+            row = old_rows.pop(key, None)
+            if row is None:
+                item = tree.insert("", index, values=values)
+            else:
+                item, shown = row
+                for col, old, new in zip(TREE_COLUMNS, shown, values):
+                    if old != new:
+                        tree.set(item, col, new)
+                if tree.index(item) != index:
+                    tree.move(item, "", index)
+            new_rows[key] = (item, values)
+
+        # Whoever is left has gone from the group
+        for item, _ in old_rows.values():
+            tree.delete(item)
+        self.tree_rows = new_rows
 
     def run(self):
-        self.root.mainloop()
\ No newline at end of file
+        self.worker.start()
+        try:
+            self.root.mainloop()
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()  # Closed mid-profile: still write what was sampled
+            self.worker.stop()
\ No newline at end of file
@@ -0,0 +1,257 @@
+import math
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import filedialog, ttk
+from collections import OrderedDict, deque
+
+
+def nice_ceiling(value):
+    """Smallest 1/2/5 x 10^n that is >= value (graph scales that don't jump on every new peak)."""
+    if value <= 0:
+        return 1
+    magnitude = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if value <= step * magnitude:
+            return step * magnitude
+    return 10 * magnitude
+
+
+class Sparkline(tk.Canvas):
+    """
+    Bar graph of XP per time bucket, newest on the right.
+
+    update_series() redraws incrementally: when time moves on, the existing
+    bars are shifted left with one canvas move, the ones that fell off are
+    deleted, and only the new (and still filling) buckets are drawn. The
+    whole graph is only redrawn when the scale or the view changes.
+    """
+
+    def __init__(self, master, points=120, height=40, bar_color="#4a90d9", **kwargs):
+        super().__init__(master, height=height, highlightthickness=0, **kwargs)
+        self.points = points
+        self.bar_color = bar_color
+
+        self._bars = deque()  # Canvas item per bucket, oldest first
+        self._values = deque()
+        self._step = None
+        self._end = None  # Absolute index of the newest bucket drawn
+        self._scale = 1
+        self._dx = 1.0
+
+        # --- Counters ---
+        self.full_redraws = 0
+        self.bars_updated = 0
+
+        self.bind("<Configure>", self._on_resize)
+
+    def set_colors(self, background, bar_color):
+        self.configure(bg=background)
+        self.bar_color = bar_color
+        self.itemconfigure("bar", fill=bar_color)
+
+    def _coords(self, position, value):
+        height = self.winfo_height()
+        x = position * self._dx
+        top = height - (value / self._scale) * (height - 2)
+        return x, top, x + max(1.0, self._dx - 1), height
+
+    def _new_bar(self, position, value):
+        return self.create_rectangle(*self._coords(position, value), fill=self.bar_color, width=0, tags="bar")
+
+    def update_series(self, step, end, values):
+        values = list(values[-self.points:])
+        peak = max(values, default=0)
+        if (self._end is None or step != self._step or not self._end <= end < self._end + len(values)
+                or peak > self._scale or nice_ceiling(peak) * 4 < self._scale or len(values) != len(self._values)):
+            self._redraw(step, end, values)
+            return
+
+        shift = end - self._end
+        if shift:
+            self.move("bar", -shift * self._dx, 0)
+            for _ in range(shift):
+                self.delete(self._bars.popleft())
+                self._values.popleft()
+            first_new = len(values) - shift
+            for position in range(first_new, len(values)):
+                self._bars.append(self._new_bar(position, values[position]))
+                self._values.append(values[position])
+                self.bars_updated += 1
+
+        # Only the buckets from the previous newest one onwards can have changed
+        for position in range(max(0, len(values) - shift - 1), len(values)):
+            if self._values[position] != values[position]:
+                self._values[position] = values[position]
+                self.coords(self._bars[position], *self._coords(position, values[position]))
+                self.bars_updated += 1
+        self._end = end
+
+    def _redraw(self, step, end, values):
+        self.delete("bar")
+        self._step = step
+        self._end = end
+        self._scale = nice_ceiling(max(values, default=0))
+        self._dx = max(1, self.winfo_width()) / max(1, len(values))
+        self._values = deque(values)
+        self._bars = deque(self._new_bar(position, value) for position, value in enumerate(values))
+        self.full_redraws += 1
+
+    def _on_resize(self, _event):
+        if self._end is not None:
+            self._redraw(self._step, self._end, list(self._values))
+
+
+# xterm's 16 basic colours; 16-255 are computed (6x6x6 cube, then a grey ramp)
+ANSI_PALETTE = ("#000000", "#cd0000", "#00cd00", "#cdcd00", "#0000ee", "#cd00cd", "#00cdcd", "#e5e5e5",
+                "#7f7f7f", "#ff0000", "#00ff00", "#ffff00", "#5c5cff", "#ff00ff", "#00ffff", "#ffffff")
+_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+
+def palette_colour(colour):
+    """Style colour (palette index or '#rrggbb') -> Tk colour."""
+    if isinstance(colour, str):
+        return colour
+    if colour < 16:
+        return ANSI_PALETTE[colour]
+    if colour < 232:
+        colour -= 16
+        r, g, b = _CUBE_LEVELS[colour // 36], _CUBE_LEVELS[colour // 6 % 6], _CUBE_LEVELS[colour % 6]
+    else:
+        r = g = b = 8 + (colour - 232) * 10
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+class StyledText(tk.Text):
+    """
+    Read-only, coloured game output. Each distinct ansi.Style becomes one
+    Tk tag the first time it's seen, and a batch of StyledLines goes in
+    with a single insert. Only the newest max_lines are kept, and only the
+    max_tags most recently used tags: older ones are deleted from Tk (text
+    still drawn in one goes back to the default colours).
+    """
+
+    def __init__(self, master, max_lines=1000, max_tags=512, foreground="#c0c0c0", background="#000000",
+                 **kwargs):
+        super().__init__(master, wrap="word", fg=foreground, bg=background, state="disabled", **kwargs)
+        self.max_lines = max_lines
+        self.max_tags = max_tags
+        self.foreground = foreground
+        self.background = background
+        self.lines = 0
+        self._tags = OrderedDict()  # Style -> tag name, least recently used first
+        self._next_tag = 0
+
+        base = tkfont.nametofont("TkFixedFont")
+        self.configure(font=base)
+        self._fonts = {}  # (bold, italic) -> font
+        for bold in (False, True):
+            for italic in (False, True):
+                font = base.copy()
+                font.configure(weight="bold" if bold else "normal", slant="italic" if italic else "roman")
+                self._fonts[bold, italic] = font
+
+    def _tag(self, style):
+        tag = self._tags.get(style)
+        if tag is not None:
+            self._tags.move_to_end(style)
+        else:
+            tag = self._tags[style] = f"style{self._next_tag}"
+            self._next_tag += 1
+            fg, bg = style.fg, style.bg
+            if style.bold and isinstance(fg, int) and fg < 8:
+                fg += 8  # Bold shows as the bright colour, like most MUD clients
+            fg = palette_colour(fg) if fg is not None else self.foreground
+            bg = palette_colour(bg) if bg is not None else None
+            if style.reverse:
+                fg, bg = bg or self.background, fg
+            options = {"foreground": fg, "font": self._fonts[style.bold, style.italic]}
+            if bg is not None:
+                options["background"] = bg
+            if style.underline:
+                options["underline"] = True
+            self.tag_configure(tag, **options)
+        return tag
+
+    def append(self, lines):
+        """Adds StyledLines at the bottom (following along if the view was already there)."""
+        if not lines:
+            return
+        lines = lines[-self.max_lines:]
+        args = []
+        for text, spans in lines:
+            pos = 0
+            for start, end, style in spans:
+                if start > pos:
+                    args += (text[pos:start], ())
+                args += (text[start:end], self._tag(style))
+                pos = end
+            args += (text[pos:] + "\n", ())
+
+        following = self.yview()[1] >= 1.0
+        self.configure(state="normal")
+        self.insert("end", *args)
+        self.lines += len(lines)
+        excess = self.lines - self.max_lines
+        if excess > 0:
+            self.delete("1.0", f"{excess + 1}.0")
+            self.lines -= excess
+        self.configure(state="disabled")
+        if following:
+            self.see("end")
+        # Evict after inserting, so a tag this batch still refers to isn't deleted first
+        while len(self._tags) > self.max_tags:
+            self.tag_delete(self._tags.popitem(last=False)[1])
+
+
+class LatencyPanel(tk.Toplevel):
+    """
+    Debug window for a latency.PipelineLatency: switches timing on and off,
+    shows the per-stage percentiles (refreshed every second while open),
+    and resets or dumps the histograms to a JSON file.
+    """
+
+    def __init__(self, master, latency, refresh_ms=1000):
+        super().__init__(master)
+        self.latency = latency
+        self.refresh_ms = refresh_ms
+        self.title("Wingman - Pipeline Latency (µs)")
+        self.geometry("620x240")
+
+        self.var_enabled = tk.BooleanVar(value=latency.enabled)
+        controls = ttk.Frame(self, padding=5)
+        controls.pack(fill=tk.X)
+        ttk.Checkbutton(controls, text="Record timings", variable=self.var_enabled,
+                        command=self.toggle).pack(side=tk.LEFT)
+        ttk.Button(controls, text="Dump to File...", command=self.dump).pack(side=tk.RIGHT)
+        ttk.Button(controls, text="Reset", command=self.reset).pack(side=tk.RIGHT, padx=5)
+
+        self.text = tk.Text(self, height=9, wrap="none", font="TkFixedFont")
+        self.text.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        self._job = None
+        self.bind("<Destroy>", self._on_destroy)
+        self.refresh()
+
+    def toggle(self):
+        self.latency.enabled = self.var_enabled.get()
+
+    def reset(self):
+        self.latency.reset()
+        self.refresh()
+
+    def dump(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json", initialfile="wingman_latency.json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            self.latency.dump(path)
+
+    def refresh(self):
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("end", self.latency.report())
+        self.text.configure(state="disabled")
+        self._job = self.after(self.refresh_ms, self.refresh)
+
+    def _on_destroy(self, event):
+        if event.widget is self and self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
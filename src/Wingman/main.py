@@ -1,18 +1,119 @@
+import argparse
 import threading
+import time
 from Wingman.core.input_receiver import InputReceiver
 from Wingman.core.session import GameSession
 from Wingman.core.network_listener import NetworkListener
-from Wingman.gui.app import XPTrackerApp
+from Wingman.core.journal import SessionJournal
+from Wingman.core.raw_capture import RawLineCapture
+from Wingman.core.pipeline import ProcessingWorker
+from Wingman.core.exporter import MetricsExporter, DEFAULT_HOST, DEFAULT_PORT
+from Wingman.core.push import EventPublisher
+
+DEFAULT_JOURNAL = "wingman_journal.jsonl"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="Wingman")
+    parser.add_argument("--journal", metavar="PATH",
+                        help=f"Record the session to an event journal (default with --resume: {DEFAULT_JOURNAL})")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the session saved in the journal instead of starting fresh")
+    parser.add_argument("--capture-raw", metavar="DIR",
+                        help="Save every received line, unmodified, to rotating files in DIR")
+    parser.add_argument("--capture-gzip", action="store_true", help="gzip-compress the --capture-raw files")
+    parser.add_argument("--headless", action="store_true",
+                        help="No window: track in the background and serve metrics over HTTP (see --http-port)")
+    parser.add_argument("--http-port", type=int, metavar="PORT",
+                        help=f"Serve /metrics (Prometheus) and /metrics.json on PORT (default with --headless: "
+                             f"{DEFAULT_PORT})")
+    parser.add_argument("--http-host", default=DEFAULT_HOST, metavar="ADDR",
+                        help=f"Address for --http-port to listen on (default: {DEFAULT_HOST}, this machine only)")
+    parser.add_argument("--push-port", type=int, metavar="PORT",
+                        help="Push XP / group / pause events to WebSocket clients on ws://127.0.0.1:PORT/")
+    parser.add_argument("--push-udp", metavar="HOST:PORT",
+                        help="Also send each event as one UDP datagram to HOST:PORT (e.g. a multicast group)")
+    return parser.parse_args(argv)
+
+
+def parse_host_port(text):
+    host, _, port = text.rpartition(":")
+    return host, int(port)
+
+
+def run_headless(worker):
+    """Parses in the background until Ctrl+C; the exporter is the only way to see the numbers."""
+    worker.start()
+    try:
+        while True:
+            time.sleep(1)
+            worker.refresh()  # Keep durations and rolling rates current while idle
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.stop()
+
 
 if __name__ == "__main__":
+    args = parse_args()
+
+    raw_capture = None
+    if args.capture_raw:
+        raw_capture = RawLineCapture(args.capture_raw, compress=args.capture_gzip).start()
+
     # Create the SHARED receiver
-    shared_receiver = InputReceiver()
+    shared_receiver = InputReceiver(raw_capture=raw_capture)
+
+    journal = None
+    if args.journal or args.resume:
+        journal = SessionJournal(args.journal or DEFAULT_JOURNAL)
+
+    publisher = None
+    if args.push_port is not None or args.push_udp:
+        udp_target = parse_host_port(args.push_udp) if args.push_udp else None
+        try:
+            publisher = EventPublisher(port=args.push_port, udp_target=udp_target).start()
+        except OSError as e:
+            print(f"Could not start pushing events: {e}")
+        else:
+            if args.push_port is not None:
+                host, port = publisher.address
+                print(f"Pushing events to WebSocket clients on ws://{host}:{port}/")
 
     # Pass it to both
     listener = NetworkListener(shared_receiver)
-    session = GameSession(shared_receiver)
+    session = GameSession(shared_receiver, journal=journal, publisher=publisher)
+
+    if journal is not None:
+        if args.resume and session.resume_from_journal():
+            print(f"Resumed session from {journal.path}: {session.total_xp:,} XP, {session.get_duration_str()} active")
+        else:
+            session.write_snapshot()  # Start a fresh journal
+
+    worker = ProcessingWorker(session)
+
+    exporter = None
+    http_port = args.http_port if args.http_port is not None else (DEFAULT_PORT if args.headless else None)
+    if http_port is not None:
+        exporter = MetricsExporter(worker, args.http_host, http_port).start()
+        host, port = exporter.address
+        print(f"Serving metrics on http://{host}:{port}/metrics and /metrics.json")
 
-    # Start app
-    app = XPTrackerApp(session)
     listener.start()
-    app.run()
\ No newline at end of file
+    try:
+        if args.headless:
+            run_headless(worker)
+        else:
+            # Imported here so headless mode runs without Tk installed
+            from Wingman.gui.app import XPTrackerApp
+            XPTrackerApp(session, worker).run()
+    finally:
+        if exporter is not None:
+            exporter.stop()
+        if publisher is not None:
+            publisher.stop()
+        if journal is not None:
+            session.write_snapshot()
+            journal.close()
+        if raw_capture is not None:
+            raw_capture.close()
@@ -0,0 +1,225 @@
+"""
+Offline replay: streams saved MUD text logs or pcap captures through
+InputReceiver -> GameSession without the GUI, then prints a summary.
+
+    python -m Wingman.replay session.log
+    python -m Wingman.replay --speed realtime capture.pcap
+"""
+import argparse
+import gzip
+import mmap
+import os
+import re
+import time
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.line_splitter import LineSplitter
+from Wingman.core.pcap_reader import iter_segments
+from Wingman.core.rates import window_label
+from Wingman.core.session import GameSession
+
+CHUNK_SIZE = 1 << 20  # Read files 1 MB at a time
+MMAP_THRESHOLD = 64 << 20  # Files at least this big are memory-mapped instead of read()
+BATCH_LINES = 50_000  # Lines queued before GameSession gets to process them
+
+PCAP_MAGICS = (b"\xd4\xc3\xb2\xa1", b"\xa1\xb2\xc3\xd4", b"\x4d\x3c\xb2\xa1", b"\xa1\xb2\x3c\x4d",
+               b"\x0a\x0d\x0d\x0a")
+
+# "<10:00:00> ..." prefix written by the client's timestamp option
+TIMESTAMP_PATTERN = re.compile(r"<(\d{1,2}):(\d{2}):(\d{2})>")
+
+
+class ReplayClock:
+    """A settable clock so GameSession measures time on the log's timeline, not ours."""
+
+    def __init__(self):
+        self.now = None
+
+    def __call__(self):
+        return self.now if self.now is not None else time.time()
+
+
+class Pacer:
+    """Sleeps so events come out at `speed` times the rate they were recorded (None = no pacing)."""
+
+    def __init__(self, speed=None):
+        self.speed = speed
+        self._origin = None  # (log time, wall time) of the first paced event
+
+    def wait_until(self, log_time):
+        if self.speed is None:
+            return
+        if self._origin is None:
+            self._origin = (log_time, time.monotonic())
+            return
+        due = self._origin[1] + (log_time - self._origin[0]) / self.speed
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yields the file's bytes in large chunks, memory-mapping big files."""
+    if path.endswith(".gz"):  # e.g. --capture-gzip raw captures
+        with gzip.open(path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+        return
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in range(0, size, chunk_size):
+                    yield mm[offset:offset + chunk_size]
+        else:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+
+def is_pcap(path):
+    with open(path, 'rb') as f:
+        return f.read(4) in PCAP_MAGICS
+
+
+class Replayer:
+    def __init__(self, speed=None, server=None, port=None, batch_lines=BATCH_LINES):
+        self.clock = ReplayClock()
+        self.pacer = Pacer(speed)
+        self.server = server
+        self.port = port
+        self.batch_lines = batch_lines
+
+        # Large enough that we never drop lines between batches
+        self.receiver = InputReceiver(max_size=batch_lines * 4)
+        self.session = GameSession(self.receiver, clock=self.clock, verbose=False)
+        self.logs = []
+
+        # Text timestamps have no date: anchor them to today and count midnight rollovers
+        self._day_offset = time.mktime(time.localtime()[:3] + (0, 0, 0, 0, 0, -1))
+        self._last_stamp = None
+        self.wall_seconds = 0.0
+
+    # --- Clock ---
+    def advance_clock(self, timestamp):
+        if self.clock.now is None:
+            # First timestamp of the replay: the session starts here
+            self.session.start_time = timestamp
+        elif int(timestamp) != int(self.clock.now) and self.receiver.depth:
+            self._process()  # Queued lines happened at the old time (matters for rolling rates)
+        self.clock.now = timestamp
+        self.pacer.wait_until(timestamp)
+
+    def _stamp_from_line(self, line):
+        if not line.startswith('<'):
+            return None
+        match = TIMESTAMP_PATTERN.match(line)
+        if not match:
+            return None
+        h, m, s = (int(g) for g in match.groups())
+        stamp = h * 3600 + m * 60 + s + self._day_offset
+        if self._last_stamp is not None and stamp < self._last_stamp - 12 * 3600:
+            self._day_offset += 86400
+            stamp += 86400
+        self._last_stamp = stamp
+        return stamp
+
+    # --- Input formats ---
+    def replay_text(self, path):
+        splitter = LineSplitter()
+        for chunk in read_chunks(path):
+            for line in splitter.feed(chunk):
+                self._text_line(line)
+            self._process()
+        if splitter.pending:
+            self._text_line(splitter.pending.decode('utf-8', errors='replace'))
+
+    def _text_line(self, line):
+        stamp = self._stamp_from_line(line)
+        if stamp is not None:
+            self.advance_clock(stamp)
+            if self.pacer.speed is not None:
+                self._process()  # Paced: hand lines over as they "arrive"
+        self.receiver.receive(line)
+        if self.receiver.depth >= self.batch_lines:
+            self._process()
+
+    def replay_pcap(self, path):
+        # Imported here so text-only replays don't pay for loading scapy
+        from Wingman.core.network_listener import NetworkListener
+
+        listener = NetworkListener(self.receiver)
+        if self.server:
+            listener.target_ip = self.server
+        if self.port:
+            listener.target_port = self.port
+
+        # Stream records straight out of the memory-mapped file: no scapy packets
+        for timestamp, segment in iter_segments(path, listener.target_ip, listener.target_port):
+            self.advance_clock(timestamp)
+            listener.segment_callback(segment)
+            if self.pacer.speed is not None or self.receiver.depth >= self.batch_lines:
+                self._process()
+
+    def _process(self):
+        self.logs.extend(self.session.process_queue())
+
+    def run(self, paths):
+        start = time.perf_counter()
+        for path in paths:
+            if is_pcap(path):
+                self.replay_pcap(path)
+            else:
+                self.replay_text(path)
+            self._process()
+        self.session.flush_group()  # A group listing right at the end has nothing after it to close it
+        self.wall_seconds = time.perf_counter() - start
+
+    def summary(self):
+        session = self.session
+        lines = self.receiver.received
+        out = [
+            f"Lines:      {lines:,}",
+            f"Total XP:   {session.total_xp:,} ({len(self.logs):,} gains)",
+        ]
+        if self.clock.now is not None:
+            out.append(f"Duration:   {session.get_duration_str()} (log time)")
+            out.append(f"XP/hr:      {session.get_xp_per_hour():,}")
+            out.append("Final rate: " + ", ".join(f"{window_label(w)} {rate:,}/hr"
+                                                  for w, rate in session.get_rolling_xp_per_hour().items()))
+        else:
+            out.append("XP/hr:      n/a (no timestamps in input)")
+        if session.event_counts:
+            out.append("Events:     " + ", ".join(f"{k}={v:,}" for k, v in sorted(session.event_counts.items())))
+        rate = lines / self.wall_seconds if self.wall_seconds > 0 else 0.0
+        out.append(f"Throughput: {rate:,.0f} lines/sec ({self.wall_seconds:.2f}s wall)")
+        return "\n".join(out)
+
+
+def parse_speed(value):
+    if value == "max":
+        return None
+    if value == "realtime":
+        return 1.0
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive")
+    return speed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Wingman.replay",
+                                     description="Replay saved logs or pcaps through the XP pipeline.")
+    parser.add_argument("files", nargs="+", help="MUD text logs and/or pcap/pcapng captures")
+    parser.add_argument("--speed", type=parse_speed, default=None, metavar="max|realtime|FACTOR",
+                        help="max (default) runs as fast as possible; realtime or a factor paces by timestamps")
+    parser.add_argument("--server", help="Game server IP in pcaps (default: NetworkListener's)")
+    parser.add_argument("--port", type=int, help="Game server port in pcaps")
+    args = parser.parse_args(argv)
+
+    replayer = Replayer(speed=args.speed, server=args.server, port=args.port)
+    replayer.run(args.files)
+    print(replayer.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+import pytest
+from Wingman.core.ansi import strip_ansi, AnsiStyler, Style, Span, DEFAULT_STYLE
+from Wingman.bench.synthetic import mixed_log_lines, colourize
+
+
+@pytest.mark.parametrize("dirty, clean", [
+    ("\x1b[31mA greater mummy attacks you!\x1b[0m", "A greater mummy attacks you!"),
+    ("\x1b[1;33;40mYou gain\x1b[0m 100 experience.", "You gain 100 experience."),
+    ("\x1b[2J\x1b[HThe Great Hall", "The Great Hall"),  # Clear screen, cursor home
+    ("HP: 100\x1b[K", "HP: 100"),  # Erase to end of line
+    ("\x1b[?25lHidden cursor", "Hidden cursor"),  # Private mode
+    ("\x1b]0;Wingman - Earthquack\x07Prompt>", "Prompt>"),  # OSC ended by BEL
+    ("\x1b]2;Title\x1b\\Prompt>", "Prompt>"),  # OSC ended by ST
+    ("\x1b(BPlain charset", "Plain charset"),
+    ("save\x1b7 and restore\x1b8", "save and restore"),
+    ("cut off\x1b[1;3", "cut off"),  # Incomplete at the end of a line
+    ("lone escape\x1b", "lone escape"),
+])
+def test_strips_escape_sequences(dirty, clean):
+    assert strip_ansi(dirty) == clean
+
+
+def test_plain_lines_are_returned_as_is():
+    line = "You gain 100 experience points. [Lvl 40]"
+    assert strip_ansi(line) is line
+
+
+RED_BOLD = Style(fg=1, bold=True)
+
+
+def test_styler_gives_plain_text_and_spans():
+    styler = AnsiStyler()
+    line = styler.parse("\x1b[1;31mA greater mummy\x1b[0m attacks you for \x1b[33m12\x1b[0m damage!\x1b[K")
+    assert line.text == "A greater mummy attacks you for 12 damage!"
+    assert line.spans == (Span(0, 15, RED_BOLD), Span(32, 34, Style(fg=3)))
+    assert styler.style is DEFAULT_STYLE
+
+
+def test_styler_style_carries_across_lines_until_reset():
+    styler = AnsiStyler()
+    styler.parse("\x1b[32mYou say,")
+    assert styler.parse("'hello'").spans == (Span(0, 7, Style(fg=2)),)
+    styler.reset()
+    assert styler.parse("plain").spans == ()
+
+
+def test_styler_extended_colours_and_attributes():
+    styler = AnsiStyler()
+    line = styler.parse("\x1b[38;5;196;48;2;16;32;48;4ma\x1b[24;39mb\x1b[0m")
+    assert line.spans == (Span(0, 1, Style(fg=196, bg="#102030", underline=True)),
+                          Span(1, 2, Style(bg="#102030")))
+
+
+def test_styler_reuses_style_and_span_objects():
+    styler = AnsiStyler()
+    first = styler.parse("\x1b[1;31mHit!\x1b[0m")
+    second = styler.parse("\x1b[31;1mHit!\x1b[0m")  # Same style, spelled differently
+    assert second.spans[0] is first.spans[0]
+    assert styler.parse("no colour").spans is styler.parse("none here").spans
+
+
+def test_styler_text_matches_strip_ansi():
+    lines = colourize(mixed_log_lines(2000))
+    styler = AnsiStyler()
+    assert [styler.parse(line).text for line in lines] == [strip_ansi(line) for line in lines]
+    assert styler.styles < 20  # A handful of distinct styles, however many lines
+
+
+def test_styler_style_cache_is_bounded():
+    # A gradient: every line in a 24-bit colour never seen before
+    lines = [f"\x1b[38;2;{i % 256};{i // 256 % 256};0mRainbow {i}\x1b[0m" for i in range(200)]
+    bounded = AnsiStyler(max_cached=16)
+    unbounded = AnsiStyler(max_cached=1000)
+    for line in lines:
+        assert bounded.parse(line) == unbounded.parse(line)
+        assert bounded.styles <= 16
+    assert unbounded.styles == 201
+
+    # Mid-line, the style in force survives the cache being emptied
+    styler = AnsiStyler(max_cached=2)
+    line = styler.parse("\x1b[31mred \x1b[1mbold \x1b[4munder\x1b[0m")
+    assert line.spans == (Span(0, 4, Style(fg=1)), Span(4, 9, Style(fg=1, bold=True)),
+                          Span(9, 14, Style(fg=1, bold=True, underline=True)))
@@ -0,0 +1,59 @@
+import json
+from scapy.all import Ether
+from Wingman.bench.suite import SuiteConfig, STAGES, run_suite, compare
+from Wingman.bench.synthetic import TrafficMix, mud_traffic, traffic_segments, build_frame
+from Wingman.core.ansi import ESC, strip_ansi
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.network_listener import NetworkListener
+
+
+def test_traffic_is_deterministic_and_follows_the_mix():
+    assert mud_traffic(500, seed=3) == mud_traffic(500, seed=3)
+    assert mud_traffic(500, seed=3) != mud_traffic(500, seed=4)
+
+    plain = mud_traffic(5000, TrafficMix(xp=0.5, group_every=0, colour=0))
+    assert not any(ESC in line for line in plain)
+    assert not any("'s group:" in line for line in plain)
+    assert 0.45 < sum("experience points" in line for line in plain) / len(plain) < 0.55
+
+    busy = mud_traffic(5000, TrafficMix(group_every=50, colour=1.0))
+    assert all(ESC in line for line in busy)
+    assert sum("'s group:" in strip_ansi(line) for line in busy) > 50
+
+
+def test_segments_split_the_stream_within_the_chunk_sizes():
+    lines = mud_traffic(2000)
+    segments = traffic_segments(lines, TrafficMix(min_chunk=10, max_chunk=50))
+    assert all(len(payload) <= 50 for _seq, payload in segments)
+    assert b"".join(payload for _seq, payload in segments) == ("\r\n".join(lines) + "\r\n").encode()
+
+
+def test_packets_deliver_the_same_lines_as_direct_receive():
+    lines = mud_traffic(1000)
+    direct = InputReceiver()
+    for line in lines:
+        direct.receive(line)
+    captured = InputReceiver()
+    listener = NetworkListener(captured)
+    for seq, payload in traffic_segments(lines):
+        listener.packet_callback(Ether(build_frame(payload, seq)))
+    assert list(captured.stack) == list(direct.stack)
+
+
+def test_suite_results_are_json_with_every_stage():
+    data = json.loads(json.dumps(run_suite(SuiteConfig(lines=2000, rounds=1, batch=50), label="test")))
+    assert set(data['results']) == set(STAGES)
+    assert data['label'] == "test"
+    assert data['config']['lines'] == 2000 and data['config']['colour'] == TrafficMix().colour
+    for row in data['results'].values():
+        assert row['calls'] > 0 and row['lines_per_sec'] > 0
+        assert row['p50_us'] <= row['p99_us'] <= row['max_us']
+    assert data['results']['process_queue']['calls'] == -(-data['results']['process_queue']['lines'] // 50)
+
+
+def test_compare_flags_slower_stages():
+    def result(lines_per_sec, p99):
+        return {'config': {}, 'results': {'receive': {'lines_per_sec': lines_per_sec, 'p99_us': p99}}}
+    assert compare(result(1000, 2.0), result(950, 2.1), threshold=10) == []
+    assert compare(result(1000, 2.0), result(800, 2.0), threshold=10) == ['receive']
+    assert compare(result(1000, 2.0), result(1000, 3.0), threshold=10) == ['receive']
@@ -0,0 +1,136 @@
+import threading
+import time
+import pytest
+from scapy.all import Ether, IP, IPv6, TCP, UDP, raw, conf
+from scapy.layers.l2 import CookedLinux
+from Wingman.core.capture import (
+    build_bpf_filter, parse_frame, DLT_LINUX_SLL, DLT_RAW, DLT_IPV4, TCP_SYN, TCP_ACK
+)
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core import network_listener
+from Wingman.core.network_listener import NetworkListener
+
+SERVER = '18.119.153.121'
+
+
+def make_frame(payload=b"", src=SERVER, sport=4000, seq=1000, flags="PA"):
+    return raw(Ether() / IP(src=src, dst="10.0.0.2") / TCP(sport=sport, dport=50123, seq=seq, flags=flags) / payload)
+
+
+def test_bpf_filter_is_precise():
+    assert build_bpf_filter(SERVER, 4000) == f"tcp and src host {SERVER} and src port 4000"
+
+
+def test_parse_ethernet_frame():
+    seg = parse_frame(make_frame(b"You gain 100 XP.\n", seq=4242))
+
+    assert seg.src == SERVER
+    assert seg.sport == 4000
+    assert seg.dst == "10.0.0.2"
+    assert seg.dport == 50123
+    assert seg.seq == 4242
+    assert bytes(seg.payload) == b"You gain 100 XP.\n"
+
+
+def test_parse_trims_ethernet_padding():
+    # Minimum-size Ethernet frames are zero padded past the IP length
+    frame = make_frame(b"hi") + b"\x00" * 10
+    assert bytes(parse_frame(frame).payload) == b"hi"
+
+
+def test_parse_flags_only_segment():
+    seg = parse_frame(make_frame(flags="SA"))
+    assert seg.flags == TCP_SYN | TCP_ACK
+    assert len(seg.payload) == 0
+
+
+@pytest.mark.parametrize("frame,linktype", [
+    (raw(CookedLinux(proto=0x0800) / IP(src=SERVER) / TCP(sport=4000) / b"x"), DLT_LINUX_SLL),
+    (raw(IP(src=SERVER) / TCP(sport=4000) / b"x"), DLT_RAW),
+    (raw(IP(src=SERVER) / TCP(sport=4000) / b"x"), DLT_IPV4),
+], ids=["linux-cooked", "raw-ip", "ipv4"])
+def test_parse_other_link_types(frame, linktype):
+    seg = parse_frame(frame, linktype)
+    assert seg.src == SERVER
+    assert bytes(seg.payload) == b"x"
+
+
+def test_parse_rejects_non_tcp():
+    frame = raw(Ether() / IP(src=SERVER) / UDP(sport=4000) / b"x")
+    assert parse_frame(frame) is None
+    assert parse_frame(raw(IPv6() / TCP(sport=4000) / b"x"), conf.l2types.layer2num[IPv6]) is None
+
+
+def test_frame_callback_filters_and_counts():
+    receiver = InputReceiver()
+    listener = NetworkListener(receiver)
+
+    listener.frame_callback(make_frame(b"Wrong host.\n", src="1.2.3.4"))
+    listener.frame_callback(make_frame(b"Right host.\n"))
+
+    assert receiver.remove_from_top() == "Right host."
+    assert receiver.remove_from_top() is None
+    assert listener.stats.received == 2
+    assert listener.stats.handled == 1
+    assert listener.stats.ignored == 1
+    listener.frame_callback(make_frame(flags="A"))  # Flag-only segments go to reassembly too
+    assert listener.stats.handled == 2
+
+
+class SilentSocket:
+    """Stands in for the BPF capture socket on a quiet network: no frame ever arrives."""
+    closed = False
+
+    def select(self, sockets, remain):
+        time.sleep(remain)
+        return []
+
+    def recv_raw(self):
+        raise AssertionError("nothing was ready to read")
+
+    def close(self):
+        self.closed = True
+
+
+def test_raw_capture_loop_stops_without_traffic(monkeypatch):
+    sock = SilentSocket()
+    monkeypatch.setattr(conf, "L2listen", lambda **_kwargs: sock)
+    monkeypatch.setattr(network_listener, "STOP_POLL_SECONDS", 0.01)
+    listener = NetworkListener(InputReceiver(), stats_interval=None)
+    listener.is_running = True
+    thread = threading.Thread(target=listener._raw_capture_loop, daemon=True)
+    thread.start()
+
+    listener.stop()
+    thread.join(2)
+    assert not thread.is_alive()
+    assert sock.closed
+
+
+class OneFrameSocket(SilentSocket):
+    """A capture socket on a tun/VPN interface: scapy hands over bare IP frames."""
+
+    def __init__(self, listener, frame):
+        self.listener = listener
+        self.frames = [frame]
+
+    def select(self, sockets, remain):
+        return sockets if self.frames else super().select(sockets, remain)
+
+    def recv_raw(self):
+        frame = self.frames.pop()
+        self.listener.stop()
+        return IP, frame, None
+
+
+def test_raw_capture_loop_reads_bare_ip_frames(monkeypatch):
+    receiver = InputReceiver()
+    listener = NetworkListener(receiver, stats_interval=None)
+    frame = raw(IP(src=SERVER, dst="10.0.0.2") / TCP(sport=4000, dport=50123, flags="PA") / b"On the tunnel.\n")
+    monkeypatch.setattr(conf, "L2listen", lambda **_kwargs: OneFrameSocket(listener, frame))
+    listener.is_running = True
+    listener._raw_capture_loop()
+
+    assert conf.l2types.layer2num[IP] == DLT_IPV4
+    assert receiver.remove_from_top() == "On the tunnel."
+    assert listener.stats.handled == 1
@@ -1,6 +1,7 @@
 import pytest
 from Wingman.core.parser import parse_xp_message
 from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.line_splitter import LineSplitter
 
 
 # --- TEST 1: The XP Parser ---
@@ -56,18 +57,15 @@ def test_receiver_stack_order():
 
 class MockNetworkListenerLogic:
     def __init__(self):
-        self._buffer = ""
+        self.splitter = LineSplitter()
         self.output_lines = []
 
     def process_chunk(self, chunk_text):
         """
         This mirrors the logic inside your packet_callback
         """
-        self._buffer += chunk_text
-
-        # While there is a newline in the buffer, peel off lines
-        while '\n' in self._buffer:
-            line, self._buffer = self._buffer.split('\n', 1)
+        # Peel off every line the chunk completed
+        for line in self.splitter.feed(chunk_text.encode('utf-8')):
             # Simulate 'cleaning' and sending to receiver
             if line.strip():
                 self.output_lines.append(line.strip())
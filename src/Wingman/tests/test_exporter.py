@@ -0,0 +1,91 @@
+import json
+import urllib.error
+import urllib.request
+import pytest
+from Wingman.core.exporter import MetricsExporter, render_prometheus, snapshot_to_dict
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.pipeline import ProcessingWorker
+from Wingman.core.session import GameSession
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def worker():
+    session = GameSession(InputReceiver(), clock=FakeClock(), verbose=False)
+    return ProcessingWorker(session)
+
+
+def feed(worker, lines, seconds=0):
+    worker.session.clock.now += seconds
+    for line in lines:
+        worker.session.receiver.receive(line)
+    worker.step()
+
+
+GROUP = [
+    "Earthquack's group:",
+    "[Orc  40] B Earthquack 227/ 394 (57%) 100/100 (100%) 30/ 60 (50%)",
+    "Earthquack says, 'ready'",
+]
+
+
+def test_prometheus_text(worker):
+    feed(worker, ["You gain 100 (+50) experience points."] + GROUP, seconds=60)
+    text = render_prometheus(worker.peek(), lines_per_second=4.0)
+
+    assert "# TYPE wingman_xp_total counter\nwingman_xp_total 150\n" in text
+    assert "wingman_xp_per_hour 9000\n" in text
+    assert 'wingman_xp_per_hour_window{window="5m"}' in text
+    assert 'wingman_member_hp{name="Earthquack",cls="Orc"} 227\n' in text
+    assert 'wingman_member_pwr_max{name="Earthquack",cls="Orc"} 60\n' in text
+    assert "wingman_lines_processed_total 4\n" in text
+    assert "wingman_lines_per_second 4.0\n" in text
+    assert "wingman_queue_depth 0\n" in text
+    assert text.endswith("\n")
+
+
+def test_json(worker):
+    feed(worker, GROUP, seconds=10)
+    data = json.loads(json.dumps(snapshot_to_dict(worker.peek())))
+    assert data['duration'] == "00:00:10"
+    assert data['group'][0]['name'] == "Earthquack"
+    assert data['group'][0]['vitals'] == {"hp": 227, "hp_max": 394, "fat": 100, "fat_max": 100,
+                                          "pwr": 30, "pwr_max": 60}
+    assert data['pipeline']['lines_processed'] == 3
+
+
+def test_renders_once_per_snapshot_and_computes_line_rate(worker):
+    exporter = MetricsExporter(worker)
+    first = exporter.render()
+    assert exporter.render()[0] is first[0]  # Served from cache
+    assert exporter.renders == 1
+
+    feed(worker, ["line"] * 20, seconds=2)
+    exporter.render()
+    assert exporter.renders == 2
+    assert json.loads(exporter.render()[1])['pipeline']['lines_per_second'] == 10.0
+
+
+def test_serves_over_http(worker):
+    feed(worker, ["You gain 100 experience points."], seconds=1)
+    exporter = MetricsExporter(worker, port=0).start()
+    try:
+        host, port = exporter.address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            assert response.headers['Content-Type'].startswith("text/plain; version=0.0.4")
+            assert b"wingman_xp_total 100\n" in response.read()
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics.json", timeout=5) as response:
+            assert json.load(response)['total_xp'] == 100
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"http://{host}:{port}/other", timeout=5)
+        assert error.value.code == 404
+        assert exporter.requests == 2
+    finally:
+        exporter.stop()
@@ -0,0 +1,57 @@
+from Wingman.core.group_history import GroupHistory, MemberHistory, parse_vital
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.parser import LINE_GROUP_ROW, classify_line, parse_group_status
+from Wingman.core.session import GameSession
+
+
+def row(name, hp=100, pwr=50):
+    return {'cls': "Orc", 'lvl': "40", 'status': "B", 'name': name, 'vitals': (hp, 100, 80, 100, pwr, 100)}
+
+
+def test_parse_vital():
+    assert parse_vital("227/ 394") == (227, 394)
+    assert parse_vital(" 37/  69") == (37, 69)
+
+
+def test_parsed_rows_carry_numeric_vitals():
+    line = "[Kenku          58]  B        Quacamole            360/ 510 ( 70%)    479/ 510 ( 93%)     37/  69 ( 53%)  "
+    kind, member = classify_line(line)
+    assert kind == LINE_GROUP_ROW
+    assert member['vitals'] == (360, 510, 479, 510, 37, 69)
+    assert 'vitals' not in parse_group_status(line)[0]
+
+
+def test_history_keeps_changes_in_order_and_is_bounded():
+    history = MemberHistory("Healer", capacity=4)
+    for t, pwr in enumerate([100, 100, 90, 70, 50, 30, 10]):
+        history.append(t, (1, 1, 1, 1, pwr, 100))
+
+    assert history.count == 4
+    assert history.series("pwr") == [70, 50, 30, 10]  # Unchanged repeat (t=1) wasn't stored
+    assert history.sample_times() == [3, 4, 5, 6]
+    assert history.series("pwr", last=2) == [30, 10]
+    assert history.percent_series("pwr", last=2) == [30, 10]
+    assert history.trend("pwr") == "▅▄▃▁"
+    assert history.latest() == (1, 1, 1, 1, 10, 100)
+
+
+def test_group_history_tracks_members_and_forgets_the_oldest():
+    history = GroupHistory(capacity=10, max_members=2)
+    history.record([row("A"), row("B")], 0)
+    history.record([row("A", pwr=20), row("C")], 5)
+
+    assert set(history.members) == {"A", "C"}  # B was seen longest ago
+    assert history.get("A").series("pwr") == [50, 20]
+    assert history.trend("A") == "▄▂"
+    assert history.trend("nobody") == ""
+    assert history.nbytes() > 0
+
+
+def test_session_records_group_listings():
+    session = GameSession(InputReceiver(), verbose=False)
+    for hp in (100, 60):
+        session.receiver.receive("<10:00:00> Earthquack's group:")
+        session.receiver.receive(f"[Orc  40] B Earthquack {hp}/100 (100%) 100/100 (100%) 100/100 (100%)")
+        session.receiver.receive("Earthquack says, 'ready'")
+        session.process_queue()
+    assert session.group_history.get("Earthquack").series("hp") == [100, 60]
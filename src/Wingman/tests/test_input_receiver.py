@@ -1,5 +1,7 @@
+import threading
 import pytest
-from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.input_receiver import InputReceiver, DROP_OLDEST, DROP_NEWEST, BLOCK
+from Wingman.core.ansi import AnsiStyler, Style
 
 @pytest.fixture
 def receiver():
@@ -27,4 +29,87 @@ def test_stack_fifo_order(receiver):
     assert receiver.remove_from_top() == "First"
     assert receiver.remove_from_top() == "Second"
     assert receiver.remove_from_top() == "Third"
-    assert receiver.remove_from_top() is None
\ No newline at end of file
+    assert receiver.remove_from_top() is None
+
+def test_drain_batches_in_order(receiver):
+    for i in range(10):
+        receiver.receive(f"Line {i}")
+
+    assert receiver.drain(4) == ["Line 0", "Line 1", "Line 2", "Line 3"]
+    assert receiver.drain() == [f"Line {i}" for i in range(4, 10)]
+    assert receiver.drain() == []
+
+
+def test_drop_oldest_policy():
+    receiver = InputReceiver(max_size=3, overflow_policy=DROP_OLDEST)
+    for i in range(5):
+        receiver.receive(f"Line {i}")
+
+    assert receiver.drain() == ["Line 2", "Line 3", "Line 4"]
+    assert receiver.get_stats() == {'depth': 0, 'high_water': 3, 'received': 5, 'dropped': 2}
+
+
+def test_drop_newest_policy():
+    receiver = InputReceiver(max_size=3, overflow_policy=DROP_NEWEST)
+    for i in range(5):
+        receiver.receive(f"Line {i}")
+
+    assert receiver.drain() == ["Line 0", "Line 1", "Line 2"]
+    assert receiver.dropped == 2
+
+
+def test_block_policy_waits_for_consumer():
+    receiver = InputReceiver(max_size=1, overflow_policy=BLOCK, block_timeout=5)
+    receiver.receive("First")
+
+    producer = threading.Thread(target=receiver.receive, args=("Second",))
+    producer.start()
+    producer.join(0.05)
+    assert producer.is_alive()  # Still blocked on the full queue
+
+    assert receiver.remove_from_top() == "First"
+    producer.join(5)
+    assert receiver.remove_from_top() == "Second"
+    assert receiver.dropped == 0
+
+
+def test_block_policy_drops_after_timeout():
+    receiver = InputReceiver(max_size=1, overflow_policy=BLOCK, block_timeout=0.01)
+    receiver.receive("First")
+    receiver.receive("Second")
+
+    assert receiver.drain() == ["First"]
+    assert receiver.dropped == 1
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        InputReceiver(overflow_policy="explode")
+
+def test_wakeup_fires_once_per_drain():
+    calls = []
+    receiver = InputReceiver(on_new_line_callback=lambda: calls.append(receiver.depth))
+    for i in range(100):
+        receiver.receive(f"line {i}")
+    assert calls == [1]  # One wakeup for the whole burst
+
+    receiver.drain(10)
+    receiver.receive("more")
+    assert len(calls) == 2  # Draining re-arms it, even with lines left over
+    receiver.receive("and more")
+    assert len(calls) == 2
+    assert receiver.wakeups == 2
+
+
+def test_colour_mode_keeps_styled_lines_for_the_mirror():
+    receiver = InputReceiver(styler=AnsiStyler(), mirror_size=2)
+    receiver.receive("\x1b[31mA greater mummy attacks you!\x1b[0m")
+    receiver.receive("\x1b[2J")  # Nothing left after stripping: neither queued nor mirrored
+    receiver.receive("You gain 100 experience.")
+
+    # Parsers still get plain text
+    assert receiver.drain() == ["A greater mummy attacks you!", "You gain 100 experience."]
+    mirrored = receiver.drain_mirror()
+    assert [line.text for line in mirrored] == ["A greater mummy attacks you!", "You gain 100 experience."]
+    assert mirrored[0].spans[0].style == Style(fg=1)
+    assert receiver.drain_mirror() == []
@@ -0,0 +1,105 @@
+import json
+import pytest
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.journal import SessionJournal, REC_SNAPSHOT, REC_XP
+from Wingman.core.session import GameSession
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "journal.jsonl")
+
+
+def make_session(path, clock, **journal_args):
+    journal = SessionJournal(path, clock=clock, **journal_args)
+    return GameSession(InputReceiver(), clock=clock, verbose=False, journal=journal), journal
+
+
+def test_events_are_journaled_and_resumed(journal_path):
+    clock = FakeClock()
+    session, journal = make_session(journal_path, clock)
+    session.write_snapshot()
+
+    clock.now += 60
+    session.receiver.receive("You gain 100 (+50) experience points.")
+    session.receiver.receive("<10:00:00> Earthquack's group:")
+    session.receiver.receive("[Orc  40] B Earthquack 100/100 (100%) 100/100 (100%) 100/100 (100%)")
+    session.receiver.receive("Earthquack says, 'ready'")
+    session.process_queue()
+    clock.now += 30
+    session.pause_clock()
+    clock.now += 30
+    session.resume_clock()
+    journal.close()  # Simulated crash point: everything written so far is on disk
+
+    # Restart 10 minutes later
+    clock.now += 600
+    resumed, _ = make_session(journal_path, clock)
+    assert resumed.resume_from_journal()
+
+    assert resumed.total_xp == 150
+    assert [m['name'] for m in resumed.latest_group_data] == ["Earthquack"]
+    # 90s active before the crash; the pause and the downtime are excluded
+    assert resumed.get_active_duration() == pytest.approx(90)
+
+
+def test_flush_is_rate_limited(journal_path):
+    clock = FakeClock()
+    journal = SessionJournal(journal_path, flush_interval_ms=500, clock=clock)
+
+    journal.record(REC_XP, 1.0, 10)
+    journal.record(REC_XP, 2.0, 20)
+    assert journal.read() == []  # Still buffered
+
+    clock.now += 0.5
+    journal.poll()
+    assert journal.read() == [[REC_XP, 1.0, 10], [REC_XP, 2.0, 20]]
+
+
+def test_snapshot_compacts_journal(journal_path):
+    clock = FakeClock()
+    session, journal = make_session(journal_path, clock, snapshot_every=3)
+    session.write_snapshot()
+
+    for _ in range(5):
+        session.receiver.receive("You gain 10 experience points.")
+        session.process_queue()
+    journal.close()
+
+    records = journal.read()
+    # Snapshot after the 3rd gain replaced everything before it
+    assert records[0][0] == REC_SNAPSHOT
+    assert records[0][2]['total_xp'] == 30
+    assert [r[0] for r in records[1:]] == [REC_XP, REC_XP]
+
+
+def test_torn_last_line_is_ignored(journal_path):
+    with open(journal_path, 'w') as f:
+        f.write(json.dumps([REC_XP, 1.0, 10]) + "\n")
+        f.write('["xp",2.0,')  # Crash mid-write
+
+    clock = FakeClock()
+    session, _ = make_session(journal_path, clock)
+    assert session.resume_from_journal()
+    assert session.total_xp == 10
+
+
+def test_reset_starts_a_fresh_journal(journal_path):
+    clock = FakeClock()
+    session, journal = make_session(journal_path, clock)
+    session.receiver.receive("You gain 10 experience points.")
+    session.process_queue()
+
+    session.reset()
+    journal.close()
+    records = journal.read()
+    assert len(records) == 1
+    assert records[0][2]['total_xp'] == 0
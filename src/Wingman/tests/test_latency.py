@@ -0,0 +1,99 @@
+import json
+import random
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.latency import (LatencyHistogram, PipelineLatency, bucket_index, bucket_upper, BUCKETS,
+                                  STAGE_DECODE, STAGE_STRIP, STAGE_QUEUE_WAIT, STAGE_PARSE)
+from Wingman.core.network_listener import NetworkListener
+from Wingman.core.pipeline import ProcessingWorker
+from Wingman.core.session import GameSession
+
+
+def test_buckets_cover_every_value_within_a_few_percent():
+    indexes = [bucket_index(ns) for ns in range(5000)]
+    assert indexes == sorted(indexes)
+    for ns in list(range(5000)) + [10 ** 6, 123_456_789, 3 * 10 ** 12]:
+        assert ns <= bucket_upper(bucket_index(ns)) <= ns * 1.04 + 1
+    assert bucket_index(10 ** 18) == BUCKETS - 1
+
+
+def test_percentiles():
+    histogram = LatencyHistogram()
+    values = list(range(1_000, 1_001_000, 1_000))  # 1 us .. 1 ms
+    random.Random(0).shuffle(values)
+    for value in values:
+        histogram.record(value)
+    assert histogram.count == 1000 and histogram.max == 1_000_000 and histogram.min == 1_000
+    assert abs(histogram.percentile(50) - 500_000) / 500_000 < 0.04
+    assert abs(histogram.percentile(99) - 990_000) / 990_000 < 0.04
+    assert histogram.percentile(100) == 1_000_000
+    assert histogram.summary()['mean_us'] == 500.5
+    histogram.reset()
+    assert histogram.percentile(50) == 0 and histogram.count == 0
+
+
+def test_dump(tmp_path):
+    latency = PipelineLatency(enabled=True)
+    latency.record(STAGE_PARSE, 2_000_000)
+    path = tmp_path / "latency.json"
+    latency.dump(str(path))
+    data = json.loads(path.read_text())
+    assert data['stages'][STAGE_PARSE]['count'] == 1
+    assert data['stages'][STAGE_PARSE]['max_us'] == 2000.0
+    assert sum(data['buckets_ns'][STAGE_PARSE].values()) == 1
+    assert "packet_to_pixel" in latency.report()
+
+
+def test_nothing_is_timed_while_disabled():
+    latency = PipelineLatency()
+    receiver = InputReceiver(latency=latency)
+    NetworkListener(receiver).handle_payload(b"You gain 100 experience points.\r\n")
+    assert receiver.drain() == ["You gain 100 experience points."]
+    assert not receiver.stamps
+    assert all(h.count == 0 for h in latency.histograms.values())
+
+
+def test_stages_are_timed_from_segment_to_parsed_batch():
+    latency = PipelineLatency(enabled=True)
+    receiver = InputReceiver(latency=latency)
+    listener = NetworkListener(receiver)
+    worker = ProcessingWorker(GameSession(receiver, verbose=False))
+
+    listener.handle_segment(listener.target_ip, listener.target_port, "10.0.0.2", 50123, 0, 0x18,
+                            b"You gain 100 experience points.\r\nA golden sphinx dies!\r\n")
+    arrived = receiver.capture_ns
+    assert arrived is not None
+    worker.step()
+
+    counts = {stage: h.count for stage, h in latency.histograms.items()}
+    assert counts[STAGE_DECODE] == 1
+    assert counts[STAGE_STRIP] == 2
+    assert counts[STAGE_QUEUE_WAIT] == 2
+    assert counts[STAGE_PARSE] == 1
+    assert worker.snapshot().capture_ns == arrived  # The GUI measures packet -> pixel from this
+
+
+def test_lines_queued_before_timing_started_are_not_stamped():
+    latency = PipelineLatency()
+    receiver = InputReceiver(latency=latency)
+    receiver.receive("old 1")
+    receiver.receive("old 2")
+    latency.enabled = True
+    receiver.receive("new 1")
+
+    assert receiver.drain(2) == ["old 1", "old 2"]
+    assert latency.histograms[STAGE_QUEUE_WAIT].count == 0
+    assert receiver.oldest_capture_ns is None
+    assert receiver.drain() == ["new 1"]
+    assert latency.histograms[STAGE_QUEUE_WAIT].count == 1
+    assert receiver.oldest_capture_ns is not None
+
+
+def test_stopping_timing_discards_stamps():
+    latency = PipelineLatency(enabled=True)
+    receiver = InputReceiver(latency=latency)
+    receiver.receive("timed")
+    latency.enabled = False
+    receiver.receive("untimed")
+    assert receiver.drain() == ["timed", "untimed"]
+    assert not receiver.stamps
+    assert latency.histograms[STAGE_QUEUE_WAIT].count == 0
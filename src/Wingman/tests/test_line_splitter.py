@@ -0,0 +1,42 @@
+from Wingman.core.line_splitter import LineSplitter
+
+
+def test_lines_split_across_chunks():
+    splitter = LineSplitter()
+    assert splitter.feed(b"You gain 1") == []
+    assert splitter.feed(b"00 XP.\r\nAnd die!\r") == ["You gain 100 XP."]
+    assert splitter.feed(b"\n") == ["And die!"]
+    assert splitter.pending == b""
+
+
+def test_many_lines_in_one_chunk():
+    splitter = LineSplitter()
+    data = b"".join(b"line %d\n" % i for i in range(1000))
+    lines = splitter.feed(data)
+    assert len(lines) == 1000
+    assert lines[-1] == "line 999"
+
+
+def test_multibyte_character_split_across_packets():
+    splitter = LineSplitter()
+    encoded = "Café ⚔ sword\n".encode('utf-8')
+    # Cut in the middle of the 3-byte crossed swords character
+    cut = encoded.index(b"\xe2") + 1
+    assert splitter.feed(encoded[:cut]) == []
+    assert splitter.feed(encoded[cut:]) == ["Café ⚔ sword"]
+
+
+def test_buffer_cap_force_splits_on_character_boundary():
+    splitter = LineSplitter(max_buffer=10)
+    lines = splitter.feed("aaaaaaaaaébbbb".encode('utf-8'))  # The 2-byte char straddles the cap
+
+    assert lines == ["aaaaaaaaa"]
+    assert splitter.pending == "ébbbb".encode('utf-8')
+    assert splitter.overflows == 1
+
+
+def test_reset_drops_partial_line():
+    splitter = LineSplitter()
+    splitter.feed(b"half a li")
+    splitter.reset()
+    assert splitter.feed(b"ne\n") == ["ne"]
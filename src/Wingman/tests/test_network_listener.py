@@ -2,17 +2,23 @@ import pytest
 from unittest.mock import MagicMock
 from Wingman.core.network_listener import NetworkListener
 from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.ansi import AnsiStyler
+from Wingman.core.capture import TCP_PSH, TCP_ACK, TCP_SYN, TCP_RST
 from scapy.all import IP, TCP
 
 
 # Helper class to mock Scapy packet behavior cleanly
 class MockPacket:
-    def __init__(self, src_ip, sport, payload):
+    def __init__(self, src_ip, sport, payload, seq=1000, flags=TCP_PSH | TCP_ACK, dport=50123):
         self.ip_layer = MagicMock()
         self.ip_layer.src = src_ip
+        self.ip_layer.dst = "10.0.0.2"
 
         self.tcp_layer = MagicMock()
         self.tcp_layer.sport = sport
+        self.tcp_layer.dport = dport
+        self.tcp_layer.seq = seq
+        self.tcp_layer.flags = flags
         self.tcp_layer.payload = payload
 
     def __contains__(self, item):
@@ -33,7 +39,7 @@ def listener_stack():
     receiver = InputReceiver()
     listener = NetworkListener(receiver)
     # Ensure buffer is empty
-    listener._buffer = ""
+    listener.splitter.reset()
     return listener, receiver
 
 
@@ -48,15 +54,15 @@ def test_packet_callback_buffers_split_lines(listener_stack):
 
     # Receiver should be empty, buffer should hold data
     assert receiver.remove_from_top() is None
-    assert listener._buffer == "You gain 1"
+    assert listener.splitter.pending == b"You gain 1"
 
     # Packet 2: "00 XP.\n" (Completes the line)
-    pkt2 = MockPacket(target_ip, target_port, b"00 XP.\n")
+    pkt2 = MockPacket(target_ip, target_port, b"00 XP.\n", seq=1010)
     listener.packet_callback(pkt2)
 
     # Now receiver should have the line
     assert receiver.remove_from_top() == "You gain 100 XP."
-    assert listener._buffer == ""  # Buffer should be cleared
+    assert listener.splitter.pending == b""  # Buffer should be cleared
 
 
 def test_ignores_wrong_ip(listener_stack):
@@ -80,3 +86,88 @@ def test_clean_payload_decoding(listener_stack):
     listener.packet_callback(pkt)
 
     assert receiver.remove_from_top() == "Testing output."
+
+
+def drain(receiver):
+    lines = []
+    while (line := receiver.remove_from_top()) is not None:
+        lines.append(line)
+    return lines
+
+
+def test_reorders_out_of_order_segments(listener_stack):
+    listener, receiver = listener_stack
+    ip, port = listener.target_ip, listener.target_port
+
+    listener.packet_callback(MockPacket(ip, port, b"Line 1\n", seq=100))
+    # Line 3 overtakes Line 2 on the wire
+    listener.packet_callback(MockPacket(ip, port, b"Line 3\n", seq=114))
+    assert drain(receiver) == ["Line 1"]
+
+    listener.packet_callback(MockPacket(ip, port, b"Line 2\n", seq=107))
+    assert drain(receiver) == ["Line 2", "Line 3"]
+
+
+def test_drops_retransmits_and_trims_overlaps(listener_stack):
+    listener, receiver = listener_stack
+    ip, port = listener.target_ip, listener.target_port
+
+    listener.packet_callback(MockPacket(ip, port, b"You gain 100 XP.\n", seq=0))
+    # Exact retransmit must not double count XP
+    listener.packet_callback(MockPacket(ip, port, b"You gain 100 XP.\n", seq=0))
+    # Retransmit re-segmented to overlap old and new data
+    listener.packet_callback(MockPacket(ip, port, b"XP.\nNext line\n", seq=13))
+
+    assert drain(receiver) == ["You gain 100 XP.", "Next line"]
+    assert listener.reassembler.get_stats()['duplicates'] == 1
+
+
+def test_reconnect_discards_partial_line(listener_stack):
+    listener, receiver = listener_stack
+    ip, port = listener.target_ip, listener.target_port
+
+    listener.packet_callback(MockPacket(ip, port, b"", seq=500, flags=TCP_SYN | TCP_ACK))
+    listener.packet_callback(MockPacket(ip, port, b"half a li", seq=501))
+    listener.packet_callback(MockPacket(ip, port, b"", seq=510, flags=TCP_RST))
+
+    # Reconnect on a new local port with a new initial sequence number
+    listener.packet_callback(MockPacket(ip, port, b"", seq=9000, flags=TCP_SYN | TCP_ACK, dport=50124))
+    listener.packet_callback(MockPacket(ip, port, b"Welcome back!\n", seq=9001, dport=50124))
+
+    assert drain(receiver) == ["Welcome back!"]
+
+
+class ListCapture(list):
+    """Stands in for RawLineCapture: keeps what it's given."""
+    put = list.append
+
+
+def test_escape_codes_stripped_once_after_raw_capture(listener_stack):
+    listener, receiver = listener_stack
+    receiver.raw_capture = captured = ListCapture()
+
+    listener.handle_payload(b"\x1b[2J\x1b[H\r\n\x1b[1;32mYou gain 100 experience.\x1b[0m\x1b[K\r\n")
+
+    # The screen clear was nothing but escapes: no blank line is queued for it
+    assert drain(receiver) == ["You gain 100 experience."]
+    assert captured == ["\x1b[2J\x1b[H", "\x1b[1;32mYou gain 100 experience.\x1b[0m\x1b[K"]
+
+
+class StylerSwitchedOff(InputReceiver):
+    """The Tk thread turns colour mode off right after the listener first looks at the styler."""
+
+    @property
+    def styler(self):
+        styler, self._styler = self._styler, None
+        return styler
+
+    @styler.setter
+    def styler(self, value):
+        self._styler = value
+
+
+def test_stream_reset_survives_colour_mode_switching_off():
+    receiver = StylerSwitchedOff(styler=AnsiStyler())
+    listener = NetworkListener(receiver)
+    listener._on_stream_reset(None)  # Used to raise AttributeError: NoneType has no reset()
+    assert receiver.styler is None
@@ -1,5 +1,9 @@
 import pytest
-from Wingman.core.parser import parse_xp_message, parse_group_status
+from Wingman.core.parser import (
+    parse_xp_message, parse_group_status, classify_line, build_default_registry,
+    LINE_XP, LINE_GROUP_HEADER, LINE_GROUP_ROW, LINE_DEATH, LINE_DAMAGE_TAKEN, LINE_DAMAGE_DEALT,
+    LINE_LOOT, LINE_SPELL
+)
 
 
 class TestXPParser:
@@ -116,3 +120,41 @@ class TestGroupParser:
         actual = parse_group_status(input)[0]['status']
 
         assert actual == expected
+
+
+class TestClassifyLine:
+    @pytest.mark.parametrize("line,kind,value", argvalues=[
+        ("You gain 17325 (+43312) experience points.", LINE_XP, 60637),
+        ("YOU GAIN 10 EXPERIENCE POINTS.", LINE_XP, 10),
+        ("<10:00:00> Earthquack's group:", LINE_GROUP_HEADER, "Earthquack"),
+        ("The sphinx glares at you.", None, None),
+        ("Your experience is unchanged.", None, None),
+        ("[ Class         Lvl] Status      Name                 Hits                Fat                Power", None, None),
+    ], ids=["xp", "xp-uppercase", "group-header", "noise", "experience-without-gain", "column-header"])
+    def test_line_kinds(self, line, kind, value):
+        assert classify_line(line) == (kind, value)
+
+    def test_group_row_matches_parse_group_status(self):
+        line = "[Kenku          58]  B        Quacamole            360/ 510 ( 70%)    479/ 510 ( 93%)     37/  69 ( 53%)  "
+        kind, member = classify_line(line)
+        assert kind == LINE_GROUP_ROW
+        assert member.pop('vitals') == (360, 510, 479, 510, 37, 69)
+        assert member == parse_group_status(line)[0]  # The legacy rows are unchanged
+
+    def test_pets_are_not_members(self):
+        line = "[Mob            20]           a war dog            100/ 100 (100%)    100/ 100 (100%)      0/   0 (  0%)"
+        assert classify_line(line) == (None, None)
+
+
+class TestDefaultEventParsers:
+    @pytest.mark.parametrize("line,kind,value", argvalues=[
+        ("A golden sphinx dies!", LINE_DEATH, "A golden sphinx"),
+        ("<10:00:00> A high priest of Ghict dies!", LINE_DEATH, "A high priest of Ghict"),
+        ("A golden sphinx attacks you for 69 damage!", LINE_DAMAGE_TAKEN, {'source': "A golden sphinx", 'amount': 69}),
+        ("You hit the dragon for 150 damage.", LINE_DAMAGE_DEALT, {'target': "the dragon", 'amount': 150}),
+        ("You get a gold coin from the corpse of a sphinx.", LINE_LOOT,
+         {'item': "a gold coin", 'source': "the corpse of a sphinx"}),
+        ("You cast Icicle Rain.", LINE_SPELL, {'spell': "Icicle Rain", 'target': None}),
+    ], ids=["death", "death-timestamped", "damage-taken", "damage-dealt", "loot", "spell"])
+    def test_event_kinds(self, line, kind, value):
+        assert build_default_registry().dispatch(line) == [(kind, value)]
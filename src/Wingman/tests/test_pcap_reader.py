@@ -0,0 +1,73 @@
+import pytest
+from scapy.all import Ether, IP, TCP, UDP, wrpcap, wrpcapng
+from Wingman.core.pcap_reader import iter_frames, iter_segments, PcapFormatError
+from Wingman.core.capture import DLT_EN10MB
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.network_listener import NetworkListener
+
+SERVER = '18.119.153.121'
+
+
+def game_packets():
+    packets = [
+        Ether() / IP(src=SERVER, dst="10.0.0.2") / TCP(sport=4000, dport=50000, seq=101, flags="PA") / b"You gain 1",
+        Ether() / IP(src="1.2.3.4", dst="10.0.0.2") / TCP(sport=80, dport=50001, seq=5, flags="PA") / b"other",
+        Ether() / IP(src="10.0.0.2", dst=SERVER) / UDP(sport=5000, dport=4000) / b"udp",
+        Ether() / IP(src=SERVER, dst="10.0.0.2") / TCP(sport=4000, dport=50000, seq=111, flags="PA") / b"00 XP.\r\n",
+    ]
+    for i, packet in enumerate(packets):
+        packet.time = 1700000000.25 + i
+    return packets
+
+
+@pytest.fixture(params=["pcap", "pcap-nano", "pcapng"])
+def capture(request, tmp_path):
+    path = str(tmp_path / "capture.cap")
+    if request.param == "pcap":
+        wrpcap(path, game_packets())
+    elif request.param == "pcap-nano":
+        wrpcap(path, game_packets(), nano=True)
+    else:
+        wrpcapng(path, game_packets())
+    return path
+
+
+def test_iter_frames(capture):
+    frames = list(iter_frames(capture))
+
+    assert len(frames) == 4
+    timestamp, linktype, frame = frames[0]
+    assert timestamp == pytest.approx(1700000000.25)
+    assert linktype == DLT_EN10MB
+    assert bytes(frame) == bytes(game_packets()[0])
+
+
+def test_iter_segments_filters_server(capture):
+    segments = list(iter_segments(capture, SERVER, 4000))
+
+    assert [bytes(seg.payload) for _, seg in segments] == [b"You gain 1", b"00 XP.\r\n"]
+    assert all(isinstance(seg.payload, memoryview) for _, seg in segments)
+
+
+def test_segments_feed_listener(capture):
+    receiver = InputReceiver()
+    listener = NetworkListener(receiver)
+    for _, segment in iter_segments(capture):
+        listener.segment_callback(segment)
+
+    assert receiver.drain() == ["You gain 100 XP."]
+    assert listener.stats.ignored == 1  # The UDP packet never becomes a segment
+
+
+def test_truncated_last_record_is_skipped(tmp_path):
+    path = tmp_path / "partial.pcap"
+    wrpcap(str(path), game_packets())
+    path.write_bytes(path.read_bytes()[:-5])
+    assert len(list(iter_frames(str(path)))) == 3
+
+
+def test_rejects_non_pcap(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("You gain 100 experience points. This is not a capture.\n")
+    with pytest.raises(PcapFormatError):
+        list(iter_frames(str(path)))
@@ -0,0 +1,101 @@
+import time
+import pytest
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.pipeline import ProcessingWorker
+from Wingman.core.session import GameSession
+
+XP_LINE = "You gain 100 (+50) experience points."
+GROUP_LINES = [
+    "<10:00:00> Earthquack's group:",
+    "[Orc  40] B Earthquack 100/100 (100%) 100/100 (100%) 100/100 (100%)",
+    "Earthquack says, 'ready'",
+]
+
+
+@pytest.fixture
+def worker():
+    session = GameSession(InputReceiver(), verbose=False)
+    return ProcessingWorker(session, batch_lines=10)
+
+
+def test_step_publishes_a_read_only_snapshot(worker):
+    for line in [XP_LINE] + GROUP_LINES:
+        worker.session.receiver.receive(line)
+    worker.step()
+
+    snapshot = worker.snapshot()
+    assert snapshot.total_xp == 150
+    assert snapshot.lines_processed == 4
+    assert snapshot.group[0]['name'] == "Earthquack"
+    with pytest.raises(TypeError):
+        snapshot.group[0]['hp'] = "0/100"
+    with pytest.raises(AttributeError):
+        snapshot.total_xp = 0
+
+    # Later batches publish new snapshots; ones already handed out don't change
+    worker.session.receiver.receive(XP_LINE)
+    worker.step()
+    assert snapshot.total_xp == 150
+    assert worker.snapshot().total_xp == 300
+    assert worker.snapshot().group is snapshot.group  # Unchanged group isn't copied again
+
+
+def test_thread_parses_everything_and_wakes_reader_once(worker):
+    wakeups = []
+    worker.on_snapshot = lambda: wakeups.append(1)
+    worker.start()
+    try:
+        for _ in range(95):
+            worker.session.receiver.receive(XP_LINE)
+        deadline = time.monotonic() + 5
+        while worker._snapshot.lines_processed < 95 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(wakeups) == 1  # Reader hasn't called snapshot() yet: no pile-up of wakeups
+    finally:
+        worker.stop()
+
+    assert worker.snapshot().total_xp == 95 * 150
+    assert worker.batches >= 10  # batch_lines=10
+
+
+def test_pause_holds_lines_until_resume(worker):
+    worker.pause()
+    worker._run_commands()
+    worker.session.receiver.receive(XP_LINE)
+    worker.step()
+    assert worker.snapshot().paused
+    assert worker.snapshot().total_xp == 0
+    assert worker.session.receiver.depth == 1
+
+    worker.resume()
+    worker._run_commands()
+    worker.step()
+    assert not worker.snapshot().paused
+    assert worker.snapshot().total_xp == 150
+
+
+def test_snapshot_clock_extrapolates_and_freezes_when_paused(worker):
+    session = worker.session
+    session.clock = lambda: 1000.0
+    session.start_time = 1000.0 - 3600
+    session.total_xp = 7200
+    worker.step()
+
+    snapshot = worker.snapshot()
+    assert snapshot.xp_per_hour_at(1000.0) == 7200
+    assert snapshot.duration_str_at(1000.0 + 3600) == "02:00:00"
+
+    session.pause_clock()
+    worker.step()
+    assert worker.snapshot().duration_str_at(99999.0) == "01:00:00"
+
+
+def test_snapshot_carries_the_selected_graph(worker):
+    assert worker.snapshot().graph_step == 5 and len(worker.snapshot().graph) == 120
+    worker.set_graph(60, 30)
+    worker._run_commands()
+    worker.session.receiver.receive(XP_LINE)
+    worker.step()
+    snapshot = worker.snapshot()
+    assert snapshot.graph_step == 60 and len(snapshot.graph) == 30
+    assert snapshot.graph[-1] == 150
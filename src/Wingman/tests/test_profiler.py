@@ -0,0 +1,74 @@
+import json
+import threading
+from Wingman.core.profiler import SamplingProfiler, frame_label
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+def test_samples_every_thread_and_writes_both_formats(tmp_path):
+    stop = threading.Event()
+    busy = threading.Thread(target=spin, args=(stop,), name="Busy", daemon=True)
+    busy.start()
+    done = []
+    profiler = SamplingProfiler(str(tmp_path), interval=0.001, duration=10,
+                                on_finish=done.append).start()
+    while profiler.samples < 20 and profiler.running:
+        stop.wait(0.01)
+    profiler.stop()
+    stop.set()
+    busy.join()
+
+    assert not profiler.running
+    assert done == [profiler.paths]
+    collapsed, speedscope = profiler.paths
+
+    with open(collapsed, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    busy_lines = [line for line in lines if line.startswith("Busy;")]
+    assert busy_lines and all(f";{frame_label(spin.__code__)}" in line for line in busy_lines)
+    assert not any(line.startswith("SamplingProfiler;") for line in lines)
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in busy_lines) == profiler.samples
+
+    with open(speedscope, encoding="utf-8") as f:
+        data = json.load(f)
+    frames = data['shared']['frames']
+    profile = next(p for p in data['profiles'] if p['name'] == "Busy")
+    assert profile['type'] == "sampled" and len(profile['samples']) == len(profile['weights'])
+    assert all(0 <= index < len(frames) for stack in profile['samples'] for index in stack)
+    assert all("spin" in [frames[index]['name'] for index in stack] for stack in profile['samples'])
+
+
+def test_stops_by_itself_after_the_window(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), interval=0.001, duration=0.05).start()
+    profiler._thread.join(5)
+    assert not profiler.running
+    assert profiler.paths is not None and profiler.samples > 0
+    assert 0.05 <= profiler.elapsed < 5
+
+
+def test_collapsed_lists_the_most_sampled_stacks_first():
+    profiler = SamplingProfiler()
+    outer, inner = test_collapsed_lists_the_most_sampled_stacks_first.__code__, spin.__code__
+    profiler.stacks[("Main;Thread", (outer,))] = 2
+    profiler.stacks[("Main;Thread", (outer, inner))] = 5
+    assert profiler.collapsed().splitlines() == [
+        f"Main:Thread;{frame_label(outer)};{frame_label(inner)} 5",
+        f"Main:Thread;{frame_label(outer)} 2",
+    ]
+
+
+def test_on_finish_is_called_even_if_writing_fails(tmp_path):
+    done = []
+    profiler = SamplingProfiler(str(tmp_path), interval=0.001, duration=0.02, on_finish=done.append)
+
+    def disk_full():
+        raise OSError(28, "No space left on device")
+    profiler.write = disk_full
+    profiler.start()
+    profiler._thread.join(5)
+
+    assert done == [None]
+    assert profiler.paths is None and isinstance(profiler.error, OSError)
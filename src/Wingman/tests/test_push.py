@@ -0,0 +1,158 @@
+import json
+import socket
+import struct
+import time
+import pytest
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.push import (EventPublisher, Subscriber, encode_event, websocket_accept, websocket_frame)
+from Wingman.core.session import GameSession
+
+GROUP_LINES = [
+    "Earthquack's group:",
+    "[Orc  40] B Earthquack 227/ 394 (57%) 100/100 (100%) 30/ 60 (50%)",
+    "Earthquack says, 'ready'",
+]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+# --- Local client stand-in: a blocking-socket WebSocket client ---
+
+def ws_connect(host, port):
+    sock = socket.create_connection((host, port), timeout=5)
+    sock.sendall(b"GET / HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                 b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n")
+    response = b""
+    while not response.endswith(b"\r\n\r\n"):
+        response += sock.recv(1)
+    assert response.startswith(b"HTTP/1.1 101")
+    assert b"Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=" in response
+    return sock
+
+
+def recv_exactly(sock, count):
+    data = b""
+    while len(data) < count:
+        chunk = sock.recv(count - len(data))
+        assert chunk, "connection closed"
+        data += chunk
+    return data
+
+
+def ws_read(sock):
+    first, second = recv_exactly(sock, 2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", recv_exactly(sock, 2))
+    return first & 0x0F, recv_exactly(sock, length)
+
+
+def test_encoding_is_compact_and_carries_the_total():
+    assert encode_event("xp", 1000.25, 1250, (150,)) == b'["xp",1000.25,1250,150]'
+    member = {'name': "Big", 'cls': "Kenku", 'lvl': "70", 'status': "", 'vitals': (1, 2, 3, 4, 5, 6)}
+    assert json.loads(encode_event("group", 1, 0, ([member],))) == ["group", 1, 0,
+                                                                   [["Big", "Kenku", 70, "", 1, 2, 3, 4, 5, 6]]]
+
+
+def test_websocket_helpers():
+    assert websocket_accept("dGhlIHNhbXBsZSBub25jZQ==") == "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+    assert websocket_frame(b"hi") == b"\x81\x02hi"
+    assert websocket_frame(b"x" * 300)[:4] == b"\x81\x7e\x01\x2c"
+
+
+def test_session_events_reach_websocket_and_udp_subscribers():
+    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    udp.bind(("127.0.0.1", 0))
+    udp.settimeout(5)
+    publisher = EventPublisher(port=0, udp_target=udp.getsockname()).start()
+    try:
+        client = ws_connect(*publisher.address)
+        wait_for(lambda: len(publisher.subscribers) == 1)
+
+        session = GameSession(InputReceiver(), clock=lambda: 1000.0, verbose=False, publisher=publisher)
+        for line in ["You gain 100 (+50) experience points."] + GROUP_LINES:
+            session.receiver.receive(line)
+        session.process_queue()
+        session.pause_clock()
+
+        messages = [json.loads(ws_read(client)[1]) for _ in range(3)]
+        assert messages[0] == ["xp", 1000.0, 150, 150]
+        assert messages[1][0] == "group" and messages[1][3][0][:3] == ["Earthquack", "Orc", 40]
+        assert messages[2] == ["pause", 1000.0, 150]
+        assert json.loads(udp.recvfrom(65536)[0]) == messages[0]
+
+        # A client that connects later starts with the current group
+        late = ws_connect(*publisher.address)
+        assert json.loads(ws_read(late)[1]) == messages[1]
+
+        # Ping / close from the client
+        client.sendall(b"\x89\x80" + b"\x00" * 4)  # Masked, empty ping
+        assert ws_read(client) == (0xA, b"")
+        client.sendall(b"\x88\x82" + b"\x00" * 4 + b"\x03\xe8")
+        assert ws_read(client) == (0x8, b"\x03\xe8")
+        wait_for(lambda: len(publisher.subscribers) == 1)
+        client.close()
+        late.close()
+    finally:
+        publisher.stop()
+        udp.close()
+
+
+def test_start_raises_when_the_port_is_taken():
+    taken = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    taken.bind(("127.0.0.1", 0))
+    taken.listen(1)
+    try:
+        publisher = EventPublisher(port=taken.getsockname()[1])
+        with pytest.raises(OSError):
+            publisher.start()
+        assert publisher._thread is None and publisher._loop is None
+        publisher.publish("xp", 1000.0, 100, 100)  # Dropped, not an error
+        publisher.stop()
+    finally:
+        taken.close()
+
+
+def test_slow_subscriber_is_thinned_then_dropped():
+    subscriber = Subscriber(None, max_pending=3, stall_timeout=5.0)
+    for i in range(5):
+        assert subscriber.offer(b"%d" % i, now=100.0)
+    assert list(subscriber.pending) == [b"2", b"3", b"4"]  # Oldest dropped first
+    assert subscriber.dropped == 2
+    assert subscriber.offer(b"5", now=104.0)
+    assert not subscriber.offer(b"6", now=105.0)  # Full for STALL_TIMEOUT: give up on it
+
+
+class FakeWriter:
+    def __init__(self):
+        self.aborted = False
+        self.transport = self
+
+    def get_extra_info(self, _name):
+        return None
+
+    def abort(self):
+        self.aborted = True
+
+
+def test_stuck_subscriber_does_not_hold_up_the_others():
+    now = [0.0]
+    publisher = EventPublisher(port=None, clock=lambda: now[0])
+    stuck = Subscriber(FakeWriter(), max_pending=1, stall_timeout=1.0)
+    healthy = Subscriber(FakeWriter(), max_pending=100)
+    publisher.subscribers = {stuck, healthy}
+
+    for second in range(3):
+        now[0] = float(second)
+        publisher._inbox.append(("xp", second, second * 10, (10,)))
+        publisher._dispatch()
+        healthy.pending.clear()  # This one keeps up
+
+    assert publisher.subscribers == {healthy}
+    assert stuck.writer.aborted and publisher.disconnected == 1
+    assert publisher.published == 3
@@ -0,0 +1,66 @@
+import pytest
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.rates import RollingRate, RollingRates, window_label
+from Wingman.core.session import GameSession
+
+
+def test_rate_over_a_full_window():
+    rate = RollingRate(300, buckets=60)
+    for t in range(0, 600, 10):
+        rate.add(100, t)  # 10 XP/s = 36,000 XP/hr
+    assert rate.per_hour(600) == pytest.approx(36_000, rel=0.03)
+    assert rate.total(600) == pytest.approx(300 * 10, rel=0.05)  # Oldest bucket already expired
+
+
+def test_old_xp_falls_out_of_the_window():
+    rate = RollingRate(300, buckets=60)
+    rate.add(5000, 10)
+    assert rate.total(200) == 5000
+    assert rate.total(320) == 0
+    assert rate.per_hour(320) == 0
+
+
+def test_long_idle_gap_clears_every_bucket():
+    rate = RollingRate(60, buckets=6)
+    for t in range(60):
+        rate.add(1, t)
+    rate.add(7, 10_000)
+    assert rate.total(10_000) == 7
+
+
+def test_early_session_rate_uses_elapsed_time_not_the_full_window():
+    rate = RollingRate(3600)
+    rate.add(1000, 30)
+    assert rate.per_hour(60) == 60_000  # 1000 XP in the first minute
+
+
+def test_window_labels():
+    assert [window_label(w) for w in (300, 900, 3600, 45)] == ["5m", "15m", "1h", "45s"]
+
+
+def test_session_rolling_rates_skip_pauses():
+    clock = type("Clock", (), {"now": 0.0, "__call__": lambda self: self.now})()
+    session = GameSession(InputReceiver(), clock=clock, verbose=False)
+    assert set(session.get_rolling_xp_per_hour()) == {300, 900, 3600}
+
+    clock.now = 60
+    session.receiver.receive("You gain 500 experience points.")
+    session.process_queue()
+    session.pause_clock()
+    clock.now = 60 + 2 * 3600  # Two hours AFK while paused
+    session.resume_clock()
+
+    rates = session.get_rolling_xp_per_hour()
+    assert rates[300] == 30_000  # 500 XP over 60 active seconds
+    assert rates[3600] == 30_000
+
+    session.reset()
+    assert session.get_rolling_xp_per_hour()[300] == 0
+
+
+def test_multiple_windows_are_fed_together():
+    rates = RollingRates((60, 600), buckets=10)
+    rates.add(60, 5)
+    rates.add(60, 100)
+    # The 60 s window (6 s buckets) covers 9 full buckets + 2 s of the current one
+    assert rates.per_hour(110) == {60: int(60 * 3600 / 56), 600: int(120 * 3600 / 110)}
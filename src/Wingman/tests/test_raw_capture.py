@@ -0,0 +1,115 @@
+import errno
+import gzip
+import os
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.raw_capture import RawLineCapture, _STOP
+from Wingman.replay import Replayer
+
+
+def test_lines_are_written_unmodified(tmp_path):
+    capture = RawLineCapture(str(tmp_path)).start()
+    receiver = InputReceiver(raw_capture=capture)
+    receiver.receive("\x1b[32mYou gain 100 (+50) experience points.\x1b[0m")
+    receiver.receive("Hello")
+    capture.close()
+
+    with open(capture.path_for(), encoding='utf-8') as f:
+        assert f.read() == "\x1b[32mYou gain 100 (+50) experience points.\x1b[0m\nHello\n"
+    assert capture.written == 2
+    # The queue still gets the cleaned line
+    assert receiver.drain() == ["You gain 100 (+50) experience points.", "Hello"]
+
+
+def test_files_rotate_and_old_ones_are_removed(tmp_path):
+    capture = RawLineCapture(str(tmp_path), max_bytes=100, backups=2)
+    for i in range(4):
+        capture._write([f"batch {i} " + "x" * 100])  # Each batch fills a file
+    capture._write(["current"])
+    capture._file.close()
+
+    assert sorted(os.listdir(tmp_path)) == ["wingman_raw.1.log", "wingman_raw.2.log", "wingman_raw.log"]
+    with open(capture.path_for(1), encoding='utf-8') as f:
+        assert f.read().startswith("batch 3")
+    with open(capture.path_for(2), encoding='utf-8') as f:
+        assert f.read().startswith("batch 2")
+
+
+def test_rotation_counts_encoded_bytes(tmp_path):
+    capture = RawLineCapture(str(tmp_path), max_bytes=100)
+    capture._write(["é" * 60])  # 60 characters, 121 bytes with the newline
+    assert sorted(os.listdir(tmp_path)) == ["wingman_raw.1.log"]
+
+
+def test_reopened_gzip_file_keeps_its_size(tmp_path):
+    first = RawLineCapture(str(tmp_path), max_bytes=1000, compress=True)
+    first._write(["x" * 600])
+    first._file.close()
+
+    second = RawLineCapture(str(tmp_path), max_bytes=1000, compress=True)
+    second._write(["y" * 600])  # 1202 uncompressed bytes in all: past max_bytes
+    assert sorted(os.listdir(tmp_path)) == ["wingman_raw.1.log.gz"]
+
+
+def test_lines_queued_after_stop_do_not_kill_the_writer(tmp_path):
+    capture = RawLineCapture(str(tmp_path))
+    capture.put("before")
+    capture._queue.put(_STOP)
+    capture.put("after")  # Raced in behind close()
+    capture.start()
+    capture._thread.join(5)
+    assert not capture._thread.is_alive()
+    with open(capture.path_for(), encoding='utf-8') as f:
+        assert f.read() == "before\nafter\n"
+
+
+class FullDisk:
+    def write(self, text):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    def close(self):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+
+def test_write_error_stops_the_capture(tmp_path, capsys):
+    capture = RawLineCapture(str(tmp_path))
+    capture._open = lambda: setattr(capture, "_file", FullDisk())
+    capture.start()
+    capture.put("You gain 100 experience points.")
+    capture._thread.join(2)
+
+    assert not capture._thread.is_alive()
+    assert capture.error.errno == errno.ENOSPC
+    assert "No space left on device" in capsys.readouterr().out
+    capture.put("Later line")
+    assert capture.dropped == 2 and capture.written == 0
+    capture.close()  # Nothing left to wait for
+
+
+def test_gzip_capture_replays(tmp_path):
+    capture = RawLineCapture(str(tmp_path), compress=True).start()
+    receiver = InputReceiver(raw_capture=capture)
+    receiver.receive("<10:00:00> You gain 100 (+50) experience points.")
+    receiver.receive("<10:30:00> You gain 200 (+50) experience points.")
+    capture.close()
+
+    path = capture.path_for()
+    assert path.endswith(".log.gz")
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert len(f.read().splitlines()) == 2
+
+    replayer = Replayer()
+    replayer.run([path])
+    assert replayer.session.total_xp == 400
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    capture = RawLineCapture(str(tmp_path), max_queue=3)  # Writer never started
+    for i in range(10):
+        capture.put(f"line {i}")
+    assert capture.dropped == 7
+
+
+def test_receiver_does_not_touch_stack_log(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    InputReceiver()
+    assert os.listdir(tmp_path) == []
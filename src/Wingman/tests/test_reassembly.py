@@ -0,0 +1,91 @@
+import pytest
+from Wingman.core.reassembly import StreamReassembler, TcpReassembler, seq_delta
+from Wingman.core.capture import TCP_SYN, TCP_ACK, TCP_FIN, TCP_PSH
+
+FLOW = ("18.119.153.121", 4000, "10.0.0.2", 50123)
+
+
+@pytest.fixture
+def collected():
+    chunks = []
+    resets = []
+    reassembler = TcpReassembler(on_data=lambda key, chunk: chunks.append(chunk),
+                                 on_reset=resets.append, max_pending=4)
+    return reassembler, chunks, resets
+
+
+def test_seq_delta_wraps():
+    assert seq_delta(5, 0xFFFFFFFE) == 7
+    assert seq_delta(0xFFFFFFFE, 5) == -7
+
+
+def test_stream_across_sequence_wraparound(collected):
+    reassembler, chunks, _ = collected
+    reassembler.feed(FLOW, 0xFFFFFFFD, TCP_PSH | TCP_ACK, b"abcd")
+    reassembler.feed(FLOW, 0x00000001, TCP_PSH | TCP_ACK, b"efgh")
+    assert b"".join(chunks) == b"abcdefgh"
+
+
+def test_skips_gap_when_pending_store_is_full(collected):
+    reassembler, chunks, _ = collected
+    reassembler.feed(FLOW, 0, TCP_ACK, b"aa")
+    # Segment at seq 2 is lost; five later ones exceed max_pending=4
+    for i in range(5):
+        reassembler.feed(FLOW, 4 + 2 * i, TCP_ACK, b"cc")
+
+    assert b"".join(chunks) == b"aa" + b"cc" * 5
+    assert reassembler.get_stats()['gaps'] == 1
+
+
+def test_fin_closes_flow_after_last_byte(collected):
+    reassembler, chunks, resets = collected
+    reassembler.feed(FLOW, 100, TCP_SYN | TCP_ACK, b"")
+    reassembler.feed(FLOW, 105, TCP_FIN | TCP_ACK, b"tail")  # FIN arrives before the data it follows
+    assert FLOW in reassembler.flows
+
+    reassembler.feed(FLOW, 101, TCP_ACK, b"head")
+    assert b"".join(chunks) == b"headtail"
+    assert FLOW not in reassembler.flows
+    assert resets == [FLOW, FLOW]  # Opened, then closed
+
+
+def test_retransmit_after_fin_is_not_delivered_again(collected):
+    reassembler, chunks, resets = collected
+    line = b"You gain 100 experience.\n"
+    reassembler.feed(FLOW, 100, TCP_PSH | TCP_ACK, line)
+    reassembler.feed(FLOW, 100 + len(line), TCP_FIN | TCP_ACK, b"")
+    assert FLOW not in reassembler.flows
+
+    reassembler.feed(FLOW, 100, TCP_PSH | TCP_ACK, line)  # Our ACK was lost: the server sends it again
+    reassembler.feed(FLOW, 100 + len(line), TCP_FIN | TCP_ACK, b"")  # And the FIN
+    assert chunks == [line]
+    assert FLOW not in reassembler.flows
+    assert reassembler.get_stats()['duplicates'] == 2
+
+    # A new connection on the same 4-tuple starts with a SYN and is followed as usual
+    reassembler.feed(FLOW, 5000, TCP_SYN | TCP_ACK, b"")
+    reassembler.feed(FLOW, 5001, TCP_PSH | TCP_ACK, b"again")
+    assert chunks == [line, b"again"]
+
+
+def test_retransmitted_syn_does_not_reset_stream():
+    stream_chunks = []
+    reassembler = TcpReassembler(on_data=lambda key, chunk: stream_chunks.append(chunk))
+    reassembler.feed(FLOW, 100, TCP_SYN | TCP_ACK, b"")
+    reassembler.feed(FLOW, 101, TCP_ACK, b"data")
+    reassembler.feed(FLOW, 100, TCP_SYN | TCP_ACK, b"")
+    reassembler.feed(FLOW, 105, TCP_ACK, b"more")
+
+    assert b"".join(stream_chunks) == b"datamore"
+    assert reassembler.resets == 1
+
+
+def test_stream_reassembler_holds_out_of_order():
+    out = []
+    stream = StreamReassembler()
+    stream.feed(0, b"one ", out.append)
+    stream.feed(8, b"three", out.append)
+    assert out == [b"one "]
+    stream.feed(4, b"two ", out.append)
+    assert out == [b"one ", b"two ", b"three"]
+    assert stream.out_of_order == 1
@@ -0,0 +1,67 @@
+import re
+import pytest
+from Wingman.core.registry import ParserRegistry, trie_regex
+
+
+@pytest.fixture
+def registry():
+    reg = ParserRegistry()
+    reg.register("heal", "heals you", r"(?P<who>\w+) heals you for (?P<amount>\d+)")
+    reg.register("flee", "flee", r"You flee (?P<dir>\w+)", lambda m, _: m.group('dir'))
+    return reg
+
+
+def test_trie_regex_matches_every_word():
+    words = ["you get", "you gain", "you", "dies!"]
+    pattern = re.compile(trie_regex(words))
+    for word in words:
+        assert pattern.fullmatch(word)
+    assert pattern.findall("you gain and you get") == ["you gain", "you get"]
+
+
+def test_dispatch_only_runs_triggered_parsers(registry):
+    assert registry.dispatch("Bob heals you for 40.") == [("heal", {'who': "Bob", 'amount': "40"})]
+    assert registry.dispatch("You FLEE north!") == []  # Trigger is case-insensitive, the pattern isn't
+    assert registry.dispatch("You flee north!") == [("flee", "north")]
+
+    stats = registry.get_stats()
+    assert stats['heal'] == {'checks': 1, 'hits': 1, 'time_ms': stats['heal']['time_ms']}
+    assert stats['flee']['checks'] == 2
+    assert stats['flee']['hits'] == 1
+
+
+def test_line_with_several_triggers(registry):
+    events = registry.dispatch("Bob heals you for 5 as you flee west")
+    assert [kind for kind, _ in events] == ["heal"]  # "You flee" pattern is case-sensitive
+
+    events = registry.dispatch("You flee west while Bob heals you for 5")
+    assert [kind for kind, _ in events] == ["heal", "flee"]  # Registration order
+
+
+def test_trigger_contained_in_another(registry):
+    registry.register("flee_fail", "flee but fail", r"try to flee but fail")
+    # Only the longer trigger is reported by the scanner, the shorter must still run
+    events = registry.dispatch("You try to flee but fail. You flee south")
+    assert [kind for kind, _ in events] == ["flee", "flee_fail"]
+
+
+def test_overlapping_triggers_fall_back_to_exact_scan():
+    reg = ParserRegistry()
+    reg.register("a", "abc", r"abc")
+    reg.register("b", "cde", r"cde")
+    assert [kind for kind, _ in reg.dispatch("xxabcdexx")] == ["a", "b"]
+
+
+def test_parser_without_trigger_sees_every_line(registry):
+    registry.register("any", None, r"^(\w+)", lambda m, _: m.group(1))
+    assert registry.dispatch("Hello there") == [("any", "Hello")]
+
+
+def test_duplicate_names_rejected(registry):
+    with pytest.raises(ValueError):
+        registry.register("heal", "x", "x")
+
+
+def test_unregister(registry):
+    registry.unregister("heal")
+    assert registry.dispatch("Bob heals you for 40.") == []
@@ -0,0 +1,68 @@
+import pytest
+from scapy.all import Ether, IP, TCP, wrpcap
+from Wingman.replay import Replayer, main, parse_speed
+
+SERVER = '18.119.153.121'
+
+LOG = """<10:00:00> You enter the Sphinx's lair.
+<10:00:05> A golden sphinx dies!
+<10:00:05> You gain 17325 (+43312) experience points.
+<10:30:00> A high priest of Ghict dies!
+<10:30:00> You gain 20625 (+51562) experience points.
+"""
+
+
+@pytest.fixture
+def text_log(tmp_path):
+    path = tmp_path / "session.log"
+    path.write_text(LOG)
+    return str(path)
+
+
+def test_text_log_totals_use_log_time(text_log):
+    replayer = Replayer()
+    replayer.run([text_log])
+
+    assert replayer.session.total_xp == 132824
+    assert replayer.session.event_counts['death'] == 2
+    assert replayer.session.get_active_duration() == 1800
+    # 132,824 XP over half an hour of log time
+    assert replayer.session.get_xp_per_hour() == 265648
+
+
+def test_text_log_midnight_rollover(tmp_path):
+    path = tmp_path / "late.log"
+    path.write_text("<23:59:00> You gain 100 experience points.\n<00:01:00> You gain 100 experience points.\n")
+    replayer = Replayer()
+    replayer.run([str(path)])
+    assert replayer.session.get_active_duration() == 120
+
+
+def test_pcap_replay(tmp_path):
+    payload = b"You gain 150 experience points.\r\nYou gain 50 experience points.\r\n"
+    packets = [
+        Ether() / IP(src=SERVER, dst="10.0.0.2") / TCP(sport=4000, dport=50000, seq=1, flags="PA") / payload[:20],
+        Ether() / IP(src=SERVER, dst="10.0.0.2") / TCP(sport=4000, dport=50000, seq=21, flags="PA") / payload[20:],
+    ]
+    packets[0].time, packets[1].time = 1000.0, 1060.0
+    path = str(tmp_path / "capture.pcap")
+    wrpcap(path, packets)
+
+    replayer = Replayer()
+    replayer.run([path])
+    assert replayer.session.total_xp == 200
+    assert replayer.session.get_active_duration() == 60
+
+
+def test_main_prints_summary(text_log, capsys):
+    assert main([text_log]) == 0
+    out = capsys.readouterr().out
+    assert "Total XP:   132,824" in out
+    assert "XP/hr:      265,648" in out
+    assert "lines/sec" in out
+
+
+def test_parse_speed():
+    assert parse_speed("max") is None
+    assert parse_speed("realtime") == 1.0
+    assert parse_speed("4") == 4.0
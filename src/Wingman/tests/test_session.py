@@ -14,10 +14,9 @@ def session():
 
 def test_process_queue_calculates_xp(session):
     sess, mock_receiver = session
-    mock_receiver.remove_from_top.side_effect = [
+    mock_receiver.drain.return_value = [
         "You gain 1000 experience points.",
         "Garbage line.",
-        None
     ]
     logs = sess.process_queue()
     assert sess.total_xp == 1000
@@ -51,12 +50,12 @@ def test_group_data_flow(session):
     sess.latest_group_data = [{'name': 'StaleUser'}]
 
     # 2. Mock incoming game text
-    mock_receiver.remove_from_top.side_effect = [
+    mock_receiver.drain.return_value = [
         "<10:00:00> Earthquack's group:",
         # Changed status to valid 'B'
         "[Orc  40] B Earthquack 100/100 (100%) 100/100 (100%) 100/100 (100%)",
         "[Elf  50] B Legolas    200/200 (100%) 200/200 (100%) 200/200 (100%)",
-        None
+        "<10:00:01> Legolas says, 'ready'",  # First line after the listing: the group is complete
     ]
 
     # 3. Process
@@ -69,4 +68,97 @@ def test_group_data_flow(session):
     # and new users weren't added. Now it should pass.
     assert len(data) == 2
     assert data[0]['name'] == 'Earthquack'
-    assert data[1]['name'] == 'Legolas'
\ No newline at end of file
+    assert data[1]['name'] == 'Legolas'
+
+
+def test_process_queue_respects_batch_limit():
+    receiver = InputReceiver()
+    sess = GameSession(receiver)
+    for _ in range(5):
+        receiver.receive("You gain 10 experience points.")
+
+    sess.process_queue(max_lines=3)
+    assert sess.total_xp == 30
+    sess.process_queue()
+    assert sess.total_xp == 50
+
+
+def test_group_version_only_changes_with_the_group(session):
+    sess, mock_receiver = session
+    start = sess.group_version
+
+    mock_receiver.drain.return_value = ["You gain 1000 experience points."]
+    sess.process_queue()
+    assert sess.group_version == start  # Nothing for the GUI to redraw
+
+    mock_receiver.drain.return_value = [
+        "<10:00:00> Earthquack's group:",
+        "[Orc  40] B Earthquack 100/100 (100%) 100/100 (100%) 100/100 (100%)",
+        "You gain 1000 experience points.",
+    ]
+    sess.process_queue()
+    assert sess.group_version > start
+
+    version = sess.group_version
+    sess.reset()
+    assert sess.group_version > version
+
+
+def test_group_split_across_batches_is_published_whole():
+    receiver = InputReceiver()
+    sess = GameSession(receiver, verbose=False)
+    sess.latest_group_data = [{'name': 'OldMember'}]
+
+    receiver.receive("<10:00:00> Earthquack's group:")
+    receiver.receive("[ Class         Lvl] Status      Name                 Hits                Fat                Power")
+    receiver.receive("[Orc  40] B Earthquack 100/100 (100%) 100/100 (100%) 100/100 (100%)")
+    sess.process_queue()
+    assert sess.latest_group_data == [{'name': 'OldMember'}]  # Listing not finished: old group stays up
+
+    receiver.receive("[Elf  50] B Legolas    200/200 (100%) 200/200 (100%) 200/200 (100%)")
+    receiver.receive("[Mob  10] Fido 10/10 (100%) 10/10 (100%) 10/10 (100%)")
+    receiver.receive("You gain 1000 experience points.")
+    sess.process_queue()
+    assert [m['name'] for m in sess.latest_group_data] == ['Earthquack', 'Legolas']
+    assert sess.total_xp == 1000  # The line that ended the listing is still parsed
+
+
+def test_stray_rows_outside_a_listing_are_ignored():
+    receiver = InputReceiver()
+    sess = GameSession(receiver, verbose=False)
+    receiver.receive("[Orc  40] B Intruder 100/100 (100%) 100/100 (100%) 100/100 (100%)")
+    sess.process_queue()
+    assert sess.latest_group_data == []
+    assert sess.group_version == 0
+
+
+def test_listing_with_nothing_after_it_times_out():
+    clock = type("Clock", (), {"now": 0.0, "__call__": lambda self: self.now})()
+    receiver = InputReceiver()
+    sess = GameSession(receiver, clock=clock, verbose=False)
+    receiver.receive("<10:00:00> Earthquack's group:")
+    receiver.receive("[Orc  40] B Earthquack 100/100 (100%) 100/100 (100%) 100/100 (100%)")
+    sess.process_queue()
+    assert sess.latest_group_data == []
+
+    clock.now += 2
+    sess.process_queue()  # e.g. the worker's once-a-second refresh
+    assert [m['name'] for m in sess.latest_group_data] == ['Earthquack']
+
+
+def test_every_group_listing_in_a_batch_is_published():
+    publisher = MagicMock()
+    sess = GameSession(InputReceiver(), verbose=False, publisher=publisher)
+    for line in ["Earthquack's group:",
+                 "[Orc  40] B Earthquack 227/ 394 (57%) 100/100 (100%) 30/ 60 (50%)",
+                 "You gain 100 experience points.",
+                 "Earthquack's group:",
+                 "[Orc  40] B Earthquack 200/ 394 (50%) 100/100 (100%) 30/ 60 (50%)",
+                 "Earthquack says, 'ready'"]:
+        sess.receiver.receive(line)
+    sess.process_queue()
+
+    published = [(call.args[0], call.args[3:]) for call in publisher.publish.call_args_list]
+    assert [kind for kind, _fields in published] == ["group", "xp", "group"]
+    assert published[0][1][0][0]['vitals'][0] == 227
+    assert published[2][1][0][0]['vitals'][0] == 200
@@ -0,0 +1,156 @@
+import zlib
+from Wingman.core import telnet
+from Wingman.core.capture import TCP_ACK, TCP_PSH
+from Wingman.core.input_receiver import InputReceiver
+from Wingman.core.network_listener import NetworkListener
+from Wingman.core.session import GameSession
+from Wingman.core.telnet import (TelnetDecoder, OobEvent, parse_gmcp, parse_msdp, IAC, WILL, DO, SB, SE, GA,
+                                 GMCP, MCCP2, MSDP_VAR, MSDP_VAL, MSDP_TABLE_OPEN, MSDP_TABLE_CLOSE,
+                                 MSDP_ARRAY_OPEN, MSDP_ARRAY_CLOSE)
+
+
+def sb(option, payload: bytes) -> bytes:
+    return bytes([IAC, SB, option]) + payload.replace(b"\xff", b"\xff\xff") + bytes([IAC, SE])
+
+
+def test_plain_text_passes_through_untouched():
+    decoder = TelnetDecoder()
+    data = memoryview(b"You gain 100 experience points.\r\n")
+    assert decoder.feed(data) is data
+
+
+def test_negotiation_is_stripped_and_escapes_unescaped():
+    decoder = TelnetDecoder()
+    data = bytes([IAC, WILL, GMCP]) + b"Hello" + bytes([IAC, DO, 24]) + b" \xff\xff!" + bytes([IAC, GA])
+    assert decoder.feed(data) == b"Hello \xff!\n"
+    assert decoder.commands == 3
+
+
+def test_commands_split_across_chunks():
+    decoder = TelnetDecoder()
+    events = []
+    decoder.on_subnegotiation = lambda option, payload: events.append((option, payload))
+    stream = b"a" + bytes([IAC, WILL, GMCP]) + b"b" + sb(GMCP, b'Char.Vitals {"hp": 5}') + b"c"
+    out = b"".join(decoder.feed(stream[i:i + 1]) for i in range(len(stream)))
+    assert out == b"abc"
+    assert events == [(GMCP, b'Char.Vitals {"hp": 5}')]
+
+
+def test_gmcp_payloads():
+    assert parse_gmcp(b'Char.Vitals {"hp": 100, "maxhp": 120}') == OobEvent("gmcp", "Char.Vitals",
+                                                                             {"hp": 100, "maxhp": 120})
+    assert parse_gmcp(b"Core.Ping") == OobEvent("gmcp", "Core.Ping", None)
+    assert parse_gmcp(b"Comm.Say not json").data == "not json"
+
+
+def test_msdp_values_tables_and_arrays():
+    payload = (bytes([MSDP_VAR]) + b"HEALTH" + bytes([MSDP_VAL]) + b"100"
+               + bytes([MSDP_VAR]) + b"GROUP" + bytes([MSDP_VAL, MSDP_TABLE_OPEN])
+               + bytes([MSDP_VAR]) + b"leader" + bytes([MSDP_VAL]) + b"Earthquack"
+               + bytes([MSDP_TABLE_CLOSE])
+               + bytes([MSDP_VAR]) + b"ROOMS" + bytes([MSDP_VAL, MSDP_ARRAY_OPEN, MSDP_VAL]) + b"1"
+               + bytes([MSDP_VAL]) + b"2" + bytes([MSDP_ARRAY_CLOSE]))
+    assert parse_msdp(payload) == [
+        OobEvent("msdp", "HEALTH", "100"),
+        OobEvent("msdp", "GROUP", {"leader": "Earthquack"}),
+        OobEvent("msdp", "ROOMS", ["1", "2"]),
+    ]
+
+
+def test_mccp2_compressed_stream_is_inflated():
+    decoder = TelnetDecoder()
+    compressor = zlib.compressobj()
+    body = compressor.compress(b"You gain 5 experience points.\r\n" + sb(GMCP, b"Core.Ping"))
+    body += compressor.flush(zlib.Z_SYNC_FLUSH)
+    events = []
+    decoder.on_subnegotiation = lambda option, payload: events.append(payload)
+
+    out = decoder.feed(b"before\r\n" + sb(MCCP2, b"") + body[:10])
+    out += decoder.feed(body[10:])
+    assert out == b"before\r\nYou gain 5 experience points.\r\n"
+    assert events == [b"Core.Ping"]
+
+    # Server ends compression: plain text follows in the same packet
+    assert decoder.feed(compressor.flush() + b"plain again\r\n") == b"plain again\r\n"
+
+
+def test_listener_sends_clean_lines_and_oob_events_to_the_session():
+    receiver = InputReceiver()
+    listener = NetworkListener(receiver)
+    session = GameSession(receiver, verbose=False)
+
+    listener.handle_payload(bytes([IAC, WILL, GMCP]) + b"You gain 100 experience points.\r\n"
+                            + sb(GMCP, b'Char.Vitals {"hp": 90}') + b"prompt>" + bytes([IAC, GA]))
+    assert list(receiver.stack) == ["You gain 100 experience points.", "prompt>"]
+
+    seen = []
+    session.oob_handlers["Char.Vitals"] = lambda sess, data: seen.append(data["hp"])
+    session.process_queue()
+    assert session.total_xp == 100
+    assert session.oob_latest == {"Char.Vitals": {"hp": 90}}
+    assert session.event_counts["gmcp"] == 1
+    assert seen == [90]
+
+
+def test_unterminated_subnegotiation_gives_the_text_back(monkeypatch):
+    monkeypatch.setattr(telnet, "MAX_SUBNEGOTIATION", 16)
+    decoder = TelnetDecoder()
+    assert decoder.feed(b"hi\xff\xfa\xc9Char") == b"hi"  # IAC SB GMCP, and the IAC SE never comes
+    assert decoder.feed(b"lots of game text\r\nYou gain 100 experience.\r\n") == \
+        b"lots of game text\r\nYou gain 100 experience.\r\n"
+    assert decoder.oversized == 1
+    assert len(decoder._sb_data) == 0
+
+
+def test_unterminated_subnegotiation_at_the_default_limit():
+    decoder = TelnetDecoder()
+    decoder.feed(bytes([IAC, SB, GMCP]) + b"Char")
+    text = b"You hit the golden sphinx for 10 damage.\r\n" * 2000  # ~84 KB without an IAC SE
+    assert decoder.feed(text) == text
+    assert decoder.feed(b"You gain 100 experience.\r\n") == b"You gain 100 experience.\r\n"
+
+
+def test_resync_after_lost_bytes():
+    decoder = TelnetDecoder()
+    decoder.feed(bytes([IAC, SB, GMCP]) + b"Char.Vi")
+    decoder.resync()  # The segment with the rest and the IAC SE was skipped
+    assert decoder.feed(b"You gain 5 experience.\r\n") == b"You gain 5 experience.\r\n"
+
+
+def test_broken_compression_is_dropped_until_it_restarts():
+    decoder = TelnetDecoder()
+    compressor = zlib.compressobj()
+    body = compressor.compress(b"You gain 5 experience points.\r\n") + compressor.flush(zlib.Z_SYNC_FLUSH)
+    assert decoder.feed(sb(MCCP2, b"") + body) == b"You gain 5 experience points.\r\n"
+
+    # A segment was lost: what arrives next can't be inflated, and mustn't be read as text
+    assert decoder.feed(b"\x8f\x00garbage\xff\x17zlib") == b""
+    assert decoder.feed(b"more \x00\x01 garbage") == b""
+    assert decoder.compression_errors == 1
+
+    # The server restarts compression (the marker split across chunks): decoding carries on
+    restart = zlib.compressobj()
+    body = restart.compress(b"You gain 7 experience points.\r\n") + restart.flush(zlib.Z_SYNC_FLUSH)
+    marker = sb(MCCP2, b"")
+    assert decoder.feed(b"junk" + marker[:2]) == b""
+    assert decoder.feed(marker[2:] + body) == b"You gain 7 experience points.\r\n"
+
+
+def test_reassembly_gap_resyncs_the_decoder():
+    receiver = InputReceiver()
+    listener = NetworkListener(receiver)
+    listener.reassembler.max_pending = 2
+    flow = (listener.target_ip, listener.target_port, "10.0.0.2", 50123)
+    segments = [b"hi\r\n" + bytes([IAC, SB, GMCP]) + b"Char",  # seq 1000
+                b'.Vitals {"hp": 1}' + bytes([IAC, SE]),  # lost
+                b"You gain 100 experience.\r\n",
+                b"You gain 200 experience.\r\n",
+                b"You gain 300 experience.\r\n"]
+    seq = 1000
+    for index, payload in enumerate(segments):
+        if index != 1:
+            listener.handle_segment(*flow, seq, TCP_PSH | TCP_ACK, payload)
+        seq += len(payload)
+    assert listener.reassembler.get_stats()['gaps'] == 1
+    assert list(receiver.stack) == ["hi", "You gain 100 experience.", "You gain 200 experience.",
+                                    "You gain 300 experience."]
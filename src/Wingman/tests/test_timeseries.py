@@ -0,0 +1,46 @@
+import pytest
+from Wingman.core.timeseries import SeriesTier, XPTimeSeries
+
+
+def test_series_at_each_resolution():
+    series = XPTimeSeries()
+    series.add(100, 0.5)
+    series.add(50, 3)
+    series.add(10, 65)
+
+    end, values = series.series(1, 5, 4)
+    assert end == 4 and values == [100, 0, 0, 50, 0]
+
+    end, values = series.series(60, 2, 70)
+    assert end == 1 and values == [150, 10]
+
+    end, values = series.series(3600, 1, 70)
+    assert values == [160]
+
+
+def test_coarser_steps_are_summed_from_the_finest_tier_that_reaches():
+    series = XPTimeSeries()
+    for t in range(0, 600):
+        series.add(1, t)
+    assert series.series(5, 120, 599) == (119, [5] * 120)  # 10 min of 5 s bars: per-second tier
+    end, values = series.series(720, 120, 599)  # 24 h of 12 min bars: per-minute tier
+    assert end == 0 and values[-1] == 600 and sum(values) == 600
+
+
+def test_old_data_survives_only_in_coarser_tiers():
+    series = XPTimeSeries()
+    series.add(500, 10)
+    later = 2 * 3600
+    assert series.tiers[0].values(10, 10) == [500]
+    assert series.series(1, 600, later)[1] == [0] * 600  # Per-second history is gone...
+    assert series.series(60, 121, later)[1][0] == 500  # ...but the minute tier still has it
+    assert series.series(3600, 3, later)[1] == [500, 0, 0]
+
+
+def test_memory_is_fixed_by_tier_sizes():
+    tier = SeriesTier(1, 10)
+    for t in range(100_000):
+        tier.add(1, t)
+    assert len(tier._slots) == 10
+    assert tier.values(99_990, 99_999) == [1] * 10
+